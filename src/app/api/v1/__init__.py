@@ -1,8 +1,16 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from ...core.utils.rate_limit import rate_limit
+from .batch import router as batch_router
+from .carrier_webhooks import router as carrier_webhooks_router
 from .shipments import router as shipments_router
 from .warehouses import router as warehouses_router
+from .webhook_subscriptions import router as webhook_subscriptions_router
 
 router = APIRouter(prefix="/v1")
-router.include_router(warehouses_router)
-router.include_router(shipments_router)
+# Carrier webhooks are pushed by a few carrier hosts at their own pace, so they are not limited per client
+router.include_router(warehouses_router, dependencies=[Depends(rate_limit)])
+router.include_router(shipments_router, dependencies=[Depends(rate_limit)])
+router.include_router(carrier_webhooks_router)
+router.include_router(webhook_subscriptions_router, dependencies=[Depends(rate_limit)])
+router.include_router(batch_router, dependencies=[Depends(rate_limit)])
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import logging
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import APIRouter, Request
+from starlette.types import Message
+
+from ...core.config import settings
+from ...core.db.database import local_session, shared_session
+from ...core.exceptions.http_exceptions import BadRequestException
+from ...schemas.batch import BatchOperation, BatchRequest, BatchResponse, BatchResult
+
+router = APIRouter(tags=["batch"], prefix="/batch")
+
+# Headers of the batch request that sub-requests must not inherit, since each has its own body. Sub-responses are
+# embedded in the batch's JSON, so they are never compressed; the batch response itself still can be.
+_BODY_HEADERS = {b"accept-encoding", b"content-length", b"content-type", b"transfer-encoding"}
+
+
+async def _dispatch(request: Request, api_prefix: str, operation: BatchOperation) -> BatchResult:
+    """Run one operation through the application in-process, as if it had been its own HTTP request."""
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+    headers = [(name, value) for name, value in request.scope["headers"] if name not in _BODY_HEADERS]
+    if body:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+
+    path = api_prefix + operation.path
+    scope = {
+        **request.scope,
+        "method": operation.method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(operation.query or {}, doseq=True).encode(),
+        "headers": headers,
+        "state": dict(request.scope.get("state", {})),
+    }
+
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    status = 500
+    content_type = b""
+    chunks: list[bytes] = []
+
+    async def send(message: Message) -> None:
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await asyncio.wait_for(request.app(scope, receive, send), settings.BATCH_OPERATION_TIMEOUT_SECONDS)
+    except TimeoutError:
+        return BatchResult(id=operation.id, status=504, body={"detail": "Operation timed out"})
+    except Exception:
+        # The application already logged it and sent a 500; it only fails this operation, not the whole batch
+        logging.exception(f"Batch operation {operation.method} {operation.path} failed")
+        return BatchResult(id=operation.id, status=500, body={"detail": "Internal Server Error"})
+    finally:
+        disconnected.set()
+
+    content = b"".join(chunks)
+    result: Any = None
+    try:
+        if content:
+            result = json.loads(content) if content_type.startswith(b"application/json") else content.decode()
+    except ValueError:
+        logging.exception(f"Batch operation {operation.method} {operation.path} returned an undecodable body")
+        return BatchResult(id=operation.id, status=500, body={"detail": "Internal Server Error"})
+    return BatchResult(id=operation.id, status=status, body=result)
+
+
+async def _dispatch_reads(request: Request, api_prefix: str, operations: list[BatchOperation]) -> list[BatchResult]:
+    return list(await asyncio.gather(*(_dispatch(request, api_prefix, operation) for operation in operations)))
+
+
+async def _dispatch_write(request: Request, api_prefix: str, operation: BatchOperation) -> BatchResult:
+    """Run a write on the batch's shared session, committing it if it succeeded and rolling it back otherwise."""
+    db = shared_session.get()
+    result = await _dispatch(request, api_prefix, operation)
+    if db is not None and db.in_transaction():
+        if result.status >= 400:
+            await db.rollback()
+            return result
+        try:
+            await db.commit()
+        except Exception:
+            logging.exception(f"Batch operation {operation.method} {operation.path} failed to commit")
+            await db.rollback()
+            return BatchResult(id=operation.id, status=500, body={"detail": "Internal Server Error"})
+    return result
+
+
+@router.post(
+    "",
+    response_model=BatchResponse,
+    description=(
+        "Run several API operations in one request. Consecutive reads run concurrently; writes run one at a time, "
+        "in order, on a shared database session. Each operation gets its own result, in request order."
+    ),
+)
+async def run_batch(request: Request, batch: BatchRequest) -> BatchResponse:
+    if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise BadRequestException(f"Too many operations in one batch, maximum is {settings.BATCH_MAX_OPERATIONS}")
+
+    api_prefix = request.url.path.removesuffix(router.prefix)
+    for operation in batch.operations:
+        if operation.path.rstrip("/") == router.prefix:
+            raise BadRequestException("Batches cannot be nested")
+
+    results: list[BatchResult] = []
+    reads: list[BatchOperation] = []
+
+    async with local_session() as db:
+        for operation in batch.operations:
+            if operation.method == "GET":
+                reads.append(operation)
+                continue
+
+            # A write waits for the reads before it, so they never see its effects
+            if reads:
+                results += await _dispatch_reads(request, api_prefix, reads)
+                reads = []
+
+            token = shared_session.set(db)
+            try:
+                results.append(await _dispatch_write(request, api_prefix, operation))
+            finally:
+                shared_session.reset(token)
+
+        results += await _dispatch_reads(request, api_prefix, reads)
+
+    return BatchResponse(results=results)
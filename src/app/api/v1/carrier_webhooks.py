@@ -0,0 +1,59 @@
+import hmac
+from typing import Annotated
+
+from fastapi import APIRouter, Header
+
+from ...core.config import settings
+from ...core.exceptions.http_exceptions import (
+    BadRequestException,
+    ServiceUnavailableException,
+    UnauthorizedException,
+)
+from ...core.utils import queue
+from ...core.utils.pg_queue import PostgresJobQueue
+from ...schemas.tracking_event import CarrierTrackingEventBatch, CarrierWebhookAccepted
+
+router = APIRouter(tags=["carrier-webhooks"], prefix="/carrier-webhooks")
+
+
+@router.post(
+    "/tracking",
+    response_model=CarrierWebhookAccepted,
+    status_code=202,
+    description="Accept pushed carrier tracking events for asynchronous processing",
+)
+async def receive_tracking_events(
+    batch: CarrierTrackingEventBatch,
+    x_webhook_token: Annotated[str | None, Header()] = None,
+) -> CarrierWebhookAccepted:
+    if settings.CARRIER_WEBHOOK_TOKEN is not None:
+        expected_token = settings.CARRIER_WEBHOOK_TOKEN.get_secret_value()
+        if x_webhook_token is None or not hmac.compare_digest(x_webhook_token, expected_token):
+            raise UnauthorizedException("Invalid webhook token")
+
+    if len(batch.events) > settings.CARRIER_WEBHOOK_MAX_EVENTS_PER_REQUEST:
+        raise BadRequestException(
+            f"Too many events in one request, maximum is {settings.CARRIER_WEBHOOK_MAX_EVENTS_PER_REQUEST}"
+        )
+
+    if queue.pool is None:
+        raise ServiceUnavailableException("Queue pool not available")
+    if isinstance(queue.pool, PostgresJobQueue):
+        raise ServiceUnavailableException("Carrier webhooks need the ARQ (Redis) queue backend")
+
+    # The events are only appended here; the worker resolves tracking numbers and writes them in batches.
+    pipe = queue.pool.pipeline(transaction=False)
+    for event in batch.events:
+        pipe.xadd(
+            settings.CARRIER_EVENTS_STREAM,
+            {
+                "tracking_number": event.tracking_number,
+                "status": event.status.value,
+                "occurred_at": event.occurred_at.isoformat(),
+            },
+            maxlen=settings.CARRIER_EVENTS_STREAM_MAXLEN,
+            approximate=True,
+        )
+    await pipe.execute()
+
+    return CarrierWebhookAccepted(accepted=len(batch.events))
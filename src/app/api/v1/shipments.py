@@ -1,21 +1,30 @@
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastcrud import PaginatedListResponse, compute_offset, paginated_response
 from fastcrud.exceptions.http_exceptions import BadRequestException
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...core.config import settings
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import NotFoundException, ServiceUnavailableException
-from ...core.utils import queue
+from ...core.utils import cache, http_cache, queue
+from ...core.utils.pg_queue import PostgresJobQueue
+from ...core.utils.status_stream import status_broadcaster
 from ...crud.crud_shipments import crud_shipments
 from ...schemas.shipment import (
     Shipment,
     ShipmentCreate,
+    ShipmentIngestAccepted,
+    ShipmentIngestStatus,
     ShipmentRead,
     ShipmentReadDetailed,
+    ShipmentStatusRead,
     ShipmentUpdate,
 )
+from ...services.service_shipment_ingest import service_shipment_ingest
+from ...services.service_shipment_status import service_shipment_status
 from ...services.service_shipments import service_shipments
 
 router = APIRouter(tags=["shipments"], prefix="/shipments")
@@ -30,7 +39,11 @@ async def list_shipments(
     db: Annotated[AsyncSession, Depends(async_get_db)],
     page: int = 1,
     items_per_page: int = 10,
-) -> dict[str, Any]:
+) -> dict[str, Any] | Response:
+    if settings.LIST_ENTITY_CACHE_ENABLED and cache.client is not None:
+        body = await service_shipments.list_shipments_cached(db=db, page=page, items_per_page=items_per_page)
+        return Response(content=body, media_type="application/json")
+
     shipments_data = await crud_shipments.get_multi_detailed(
         db=db,
         offset=compute_offset(page, items_per_page),
@@ -59,12 +72,136 @@ async def create_shipment(
     return created
 
 
+@router.put(
+    "/by-reference/{external_reference}",
+    response_model=ShipmentRead,
+    responses={201: {"model": ShipmentRead, "description": "Shipment created"}},
+    description=(
+        "Create the shipment with this external reference, or update it if it exists; "
+        "resending an unchanged shipment writes nothing"
+    ),
+)
+async def upsert_shipment(
+    external_reference: Annotated[str, Path(max_length=100)],
+    shipment: ShipmentCreate,
+    response: Response,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> ShipmentRead:
+    shipment = shipment.model_copy(update={"external_reference": external_reference})
+    result, created = await service_shipments.upsert_shipment(db=db, shipment=shipment)
+    if created:
+        response.status_code = 201
+    return result
+
+
+@router.post(
+    "/pending",
+    response_model=ShipmentIngestAccepted,
+    status_code=202,
+    description="Validate a shipment and queue it to be created by the worker; poll the returned pending ID",
+)
+async def queue_shipment(shipment: ShipmentCreate) -> ShipmentIngestAccepted:
+    if queue.pool is None:
+        raise ServiceUnavailableException("Queue pool not available")
+    if isinstance(queue.pool, PostgresJobQueue):
+        raise ServiceUnavailableException("Queued shipment creation needs the ARQ (Redis) queue backend")
+
+    pending_id = await service_shipment_ingest.queue_shipment(redis=queue.pool, shipment=shipment)
+    return ShipmentIngestAccepted(pending_id=pending_id)
+
+
+@router.get(
+    "/pending/{pending_id}",
+    response_model=ShipmentIngestStatus,
+    description="Get the state of a queued shipment",
+)
+async def read_queued_shipment(pending_id: str) -> ShipmentIngestStatus:
+    if queue.pool is None or isinstance(queue.pool, PostgresJobQueue):
+        raise ServiceUnavailableException("Queue pool not available")
+
+    status = await service_shipment_ingest.get_status(redis=queue.pool, pending_id=pending_id)
+    if status is None:
+        raise NotFoundException("Queued shipment not found")
+    return status
+
+
+# Registered before "/{shipment_id}", which would otherwise match "/status" and "/events"
+@router.get(
+    "/status",
+    response_model=list[ShipmentStatusRead],
+    description="Get the current status of several shipments; unknown and deleted shipments are left out",
+)
+async def read_shipment_statuses(
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    ids: Annotated[list[int], Query(min_length=1, max_length=settings.SHIPMENT_STATUS_BULK_MAX_IDS)],
+) -> list[ShipmentStatusRead]:
+    return await service_shipment_status.get_statuses(db=db, shipment_ids=ids)
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    description=(
+        "Stream status changes of the given shipments, or of every shipment of a warehouse, as Server-Sent Events"
+    ),
+)
+async def stream_shipment_status_changes(
+    ids: Annotated[list[int] | None, Query(max_length=settings.STATUS_STREAM_MAX_SHIPMENT_IDS)] = None,
+    warehouse_id: int | None = None,
+) -> StreamingResponse:
+    if not ids and warehouse_id is None:
+        raise BadRequestException("Subscribe to at least one shipment id or a warehouse")
+    if not status_broadcaster.running:
+        raise ServiceUnavailableException("Status stream not available")
+
+    subscription = status_broadcaster.subscribe(ids or [], warehouse_id)
+    return StreamingResponse(
+        status_broadcaster.stream(subscription, settings.STATUS_STREAM_HEARTBEAT_SECONDS),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get(
+    "/{shipment_id}/status",
+    response_model=ShipmentStatusRead,
+    description="Get the current status of a shipment",
+)
+async def read_shipment_status(
+    shipment_id: int,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> ShipmentStatusRead:
+    statuses = await service_shipment_status.get_statuses(db=db, shipment_ids=[shipment_id])
+    if not statuses:
+        raise NotFoundException("Shipment not found")
+    return statuses[0]
+
+
 @router.get(
     "/{shipment_id}",
     response_model=ShipmentReadDetailed,
     description="Get a shipment by ID",
 )
+@http_cache.conditional(
+    key_prefix=settings.SHIPMENT_CACHE_KEY_PREFIX,
+    version=crud_shipments.get_version,
+    resource_id_name="shipment_id",
+    cache_control=f"public, max-age={settings.CLIENT_CACHE_MAX_AGE}",
+    not_found_cached=True,
+)
+@cache.cache(
+    key_prefix=settings.SHIPMENT_CACHE_KEY_PREFIX,
+    resource_id_name="shipment_id",
+    expiration=settings.DETAIL_CACHE_EXPIRATION_SECONDS,
+    tags=[f"{settings.WAREHOUSE_SHIPMENTS_CACHE_TAG}:{{warehouse_id}}"],
+    stale_while_revalidate=settings.DETAIL_CACHE_STALE_SECONDS,
+    lock_timeout=settings.DETAIL_CACHE_LOCK_TIMEOUT_SECONDS,
+    jitter=settings.DETAIL_CACHE_JITTER,
+    not_found_expiration=settings.NOT_FOUND_CACHE_EXPIRATION_SECONDS,
+    version=crud_shipments.get_version,
+)
 async def read_shipment(
+    request: Request,
     shipment_id: int,
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> ShipmentReadDetailed:
@@ -107,6 +244,8 @@ async def delete_shipment(
         db=db,
         id=shipment_id,
     )
+    await service_shipment_status.forget([shipment_id])
+    await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [shipment_id])
 
 
 @router.post(
@@ -133,4 +272,10 @@ async def update_shipment_tracking(
     if queue.pool is None:
         raise ServiceUnavailableException("Queue pool not available")
 
-    await queue.pool.enqueue_job("update_shipment_tracking_status", shipment_id)
+    # Not a scheduled update, so not deduplicated with them; the scheduled one is dropped once this one advances
+    await queue.pool.enqueue_job(
+        "update_shipment_tracking_status",
+        shipment_id,
+        shipment.status,
+        _queue_name=settings.REDIS_QUEUE_INTERACTIVE_NAME,
+    )
@@ -1,10 +1,12 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ...core.config import settings
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import NotFoundException
+from ...core.utils import cache, http_cache
 from ...crud.crud_warehouses import crud_warehouses
 from ...schemas.warehouse import WarehouseCreate, WarehouseRead, WarehouseReadDetailed, WarehouseUpdate
 from ...services.service_warehouses import service_warehouses
@@ -50,7 +52,23 @@ async def create_warehouse(
     response_model=WarehouseReadDetailed,
     description="Get a warehouse by ID",
 )
+@http_cache.conditional(
+    key_prefix=settings.WAREHOUSE_CACHE_KEY_PREFIX,
+    version=crud_warehouses.get_version,
+    resource_id_name="warehouse_id",
+    cache_control=f"public, max-age={settings.CLIENT_CACHE_MAX_AGE}",
+)
+@cache.cache(
+    key_prefix=settings.WAREHOUSE_CACHE_KEY_PREFIX,
+    resource_id_name="warehouse_id",
+    expiration=settings.DETAIL_CACHE_EXPIRATION_SECONDS,
+    stale_while_revalidate=settings.DETAIL_CACHE_STALE_SECONDS,
+    lock_timeout=settings.DETAIL_CACHE_LOCK_TIMEOUT_SECONDS,
+    jitter=settings.DETAIL_CACHE_JITTER,
+    version=crud_warehouses.get_version,
+)
 async def read_warehouse(
+    request: Request,
     warehouse_id: int,
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> WarehouseReadDetailed:
@@ -89,8 +107,7 @@ async def delete_warehouse(
     warehouse_id: int,
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ) -> None:
-    await crud_warehouses.delete(
+    await service_warehouses.delete_warehouse(
         db=db,
-        id=warehouse_id,
-        allow_multiple=False,
+        warehouse_id=warehouse_id,
     )
@@ -0,0 +1,113 @@
+from datetime import UTC, datetime
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ...core.db.database import async_get_db
+from ...core.exceptions.http_exceptions import NotFoundException
+from ...crud.crud_webhook_subscriptions import crud_webhook_subscriptions
+from ...schemas.webhook_subscription import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionRead,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionUpdateInternal,
+)
+
+router = APIRouter(tags=["webhook-subscriptions"], prefix="/webhook-subscriptions")
+
+_subscriptions_adapter = TypeAdapter(list[WebhookSubscriptionRead])
+
+
+@router.get(
+    "",
+    response_model=list[WebhookSubscriptionRead],
+    description="List all shipment status webhook subscriptions",
+)
+async def list_webhook_subscriptions(
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> list[WebhookSubscriptionRead]:
+    result = await crud_webhook_subscriptions.get_multi(
+        db=db,
+        limit=None,  # all
+        schema_to_select=WebhookSubscriptionRead,
+        is_deleted=False,
+    )
+    return _subscriptions_adapter.validate_python(result["data"])
+
+
+@router.post(
+    "",
+    response_model=WebhookSubscriptionRead,
+    status_code=201,
+    description="Subscribe a URL to shipment status changes",
+)
+async def create_webhook_subscription(
+    subscription: WebhookSubscriptionCreate,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> WebhookSubscriptionRead:
+    created = await crud_webhook_subscriptions.create(
+        db=db,
+        object=subscription,
+    )
+    return WebhookSubscriptionRead.model_validate(created, from_attributes=True)
+
+
+@router.get(
+    "/{subscription_id}",
+    response_model=WebhookSubscriptionRead,
+    description="Get a webhook subscription by ID",
+)
+async def read_webhook_subscription(
+    subscription_id: int,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> WebhookSubscriptionRead:
+    subscription = await crud_webhook_subscriptions.get(
+        db=db,
+        id=subscription_id,
+        is_deleted=False,
+        schema_to_select=WebhookSubscriptionRead,
+    )
+    if subscription is None:
+        raise NotFoundException("Webhook subscription not found")
+    return WebhookSubscriptionRead.model_validate(subscription)
+
+
+@router.put(
+    "/{subscription_id}",
+    status_code=204,
+    description="Update a webhook subscription",
+)
+async def update_webhook_subscription(
+    subscription_id: int,
+    subscription: WebhookSubscriptionUpdate,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> None:
+    exists = await crud_webhook_subscriptions.exists(db=db, id=subscription_id, is_deleted=False)
+    if not exists:
+        raise NotFoundException("Webhook subscription not found")
+
+    await crud_webhook_subscriptions.update(
+        db=db,
+        id=subscription_id,
+        object=WebhookSubscriptionUpdateInternal(
+            **subscription.model_dump(exclude_unset=True),
+            updated_at=datetime.now(UTC),
+        ),
+    )
+
+
+@router.delete(
+    "/{subscription_id}",
+    status_code=204,
+    description="Delete a webhook subscription",
+)
+async def delete_webhook_subscription(
+    subscription_id: int,
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> None:
+    await crud_webhook_subscriptions.delete(
+        db=db,
+        id=subscription_id,
+    )
@@ -1,5 +1,6 @@
 import os
 from enum import Enum
+from typing import Literal
 
 from pydantic import SecretStr, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -108,13 +109,64 @@ class RedisCacheSettings(BaseSettings):
     REDIS_CACHE_HOST: str = "localhost"
     REDIS_CACHE_PORT: int = 6379
 
+    # Hash of shipment id -> "<status>|<updated_at>", kept current by every status write for the status endpoints
+    SHIPMENT_STATUS_HASH: str = "shipments:status"
+    SHIPMENT_STATUS_BULK_MAX_IDS: int = 500
+    # Pub/sub channel carrying every status change to the API processes' live status streams
+    SHIPMENT_STATUS_CHANNEL: str = "shipments:status-changes"
+    # `cache` decorator entries of the shipment and warehouse detail reads, stored as `<prefix>:<id>`
+    SHIPMENT_CACHE_KEY_PREFIX: str = "shipment"
+    WAREHOUSE_CACHE_KEY_PREFIX: str = "warehouse"
+    # Tag set listing the cached shipments of a warehouse, `<prefix>:<warehouse_id>`, dropped when the warehouse changes
+    WAREHOUSE_SHIPMENTS_CACHE_TAG: str = "warehouse_shipments"
+    DETAIL_CACHE_EXPIRATION_SECONDS: int = 300
+    # Detail entries are served stale this much longer while one request refreshes them; concurrent misses across
+    # processes wait up to the lock timeout for one of them to load the entry; lifetimes get up to the jitter added
+    DETAIL_CACHE_STALE_SECONDS: int = 30
+    DETAIL_CACHE_LOCK_TIMEOUT_SECONDS: float = 2.0
+    DETAIL_CACHE_JITTER: float = 0.1
+    # Shipment IDs not found are remembered this long, so scans of absent IDs skip the database; creates invalidate them
+    NOT_FOUND_CACHE_EXPIRATION_SECONDS: int = 30
+    # List pages composed from the shipment detail entries: only the page's IDs are read from the database, plus the
+    # shipments missing from the cache
+    LIST_ENTITY_CACHE_ENABLED: bool = True
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def REDIS_CACHE_URL(self) -> str:
         return f"redis://{self.REDIS_CACHE_HOST}:{self.REDIS_CACHE_PORT}"
 
 
+class LocalCacheSettings(BaseSettings):
+    # In-process cache in front of the Redis cache; entries invalidated anywhere are announced on the channel
+    LOCAL_CACHE_ENABLED: bool = False
+    LOCAL_CACHE_MAX_ENTRIES: int = 10_000
+    LOCAL_CACHE_TTL_SECONDS: float = 10.0
+    LOCAL_CACHE_INVALIDATION_CHANNEL: str = "cache:invalidations"
+
+
+class CacheWarmupSettings(BaseSettings):
+    # Hot sets preloaded into the caches at startup, before the app reports itself initialized: "warehouses" (every
+    # warehouse detail), "recent_shipments" (details of the most recently updated shipments) and "shipment_statuses"
+    # (their entries in the status hash). Warm-up gives up after the budget; an empty list disables it
+    CACHE_WARMUP_SETS: list[str] = ["warehouses", "recent_shipments", "shipment_statuses"]
+    CACHE_WARMUP_RECENT_SHIPMENTS: int = 5000
+    CACHE_WARMUP_CHUNK_SIZE: int = 500
+    CACHE_WARMUP_CONCURRENCY: int = 4
+    CACHE_WARMUP_BUDGET_SECONDS: float = 15.0
+
+
+class WarehouseRegistrySettings(BaseSettings):
+    # Process-local registry of the warehouses, reloaded when a warehouse write bumps the version and announces it
+    WAREHOUSE_REGISTRY_ENABLED: bool = True
+    WAREHOUSE_REGISTRY_CHANNEL: str = "warehouses:changes"
+    WAREHOUSE_REGISTRY_VERSION_KEY: str = "warehouses:version"
+    # Startup waits this long for the first load; until then, existence checks read the database
+    WAREHOUSE_REGISTRY_LOAD_TIMEOUT_SECONDS: float = 5.0
+
+
 class ClientSideCacheSettings(BaseSettings):
+    # `Cache-Control` max-age of the detail reads, which clients then revalidate with their ETag / Last-Modified
     CLIENT_CACHE_MAX_AGE: int = 60
 
 
@@ -122,6 +174,121 @@ class RedisQueueSettings(BaseSettings):
     REDIS_QUEUE_HOST: str = "localhost"
     REDIS_QUEUE_PORT: int = 6379
 
+    # User-triggered refreshes get their own queue so a backlog of scheduled polls never delays them
+    REDIS_QUEUE_INTERACTIVE_NAME: str = "arq:queue:interactive"
+    REDIS_QUEUE_BACKGROUND_NAME: str = "arq:queue"
+
+
+class PostgresQueueSettings(BaseSettings):
+    # "arq" runs jobs through Redis; "postgres" keeps them in the `job` table instead
+    QUEUE_BACKEND: Literal["arq", "postgres"] = "arq"
+
+    PG_QUEUE_NOTIFY_CHANNEL: str = "job_enqueued"
+    PG_QUEUE_CLAIM_BATCH_SIZE: int = 50
+    PG_QUEUE_LEASE_SECONDS: int = 600
+    PG_QUEUE_MAX_TRIES: int = 5
+    PG_QUEUE_RETRY_DELAY_SECONDS: int = 5
+    PG_QUEUE_JOB_TIMEOUT_SECONDS: int = 300
+    # Upper bound on how long an idle worker waits without a notification before looking for due jobs
+    PG_QUEUE_MAX_IDLE_SECONDS: float = 60.0
+
+
+class WorkerCapacitySettings(BaseSettings):
+    WORKER_INTERACTIVE_MAX_JOBS: int = 20
+    WORKER_BACKGROUND_MAX_JOBS: int = 10
+    WORKER_JOB_COMPLETION_WAIT_SECONDS: int = 30
+
+    # How long ARQ keeps job results in Redis; per-function overrides win over the default. Tracking jobs only
+    # feed the outcome counters, so their results are not kept at all
+    WORKER_KEEP_RESULT_SECONDS: int = 3600
+    WORKER_KEEP_RESULT_SECONDS_BY_FUNCTION: dict[str, int] = {"update_shipment_tracking_status": 0}
+
+    # Job outcome counts, added to the Redis hash `<prefix><function>` every few seconds
+    WORKER_METRICS_KEY_PREFIX: str = "metrics:jobs:"
+    WORKER_METRICS_FLUSH_SECONDS: float = 5.0
+
+    # Write-behind buffer for job status updates, flushed as one statement per interval or batch
+    WORKER_STATUS_FLUSH_INTERVAL_MS: int = 5
+    WORKER_STATUS_FLUSH_MAX_ROWS: int = 200
+
+    # Supervisor mode: number of worker processes, defaults to the CPU count
+    WORKER_PROCESSES: int | None = None
+    WORKER_MIN_PROCESSES: int = 1
+    WORKER_MAX_PROCESSES: int | None = None
+    WORKER_SHUTDOWN_TIMEOUT_SECONDS: int = 45
+
+    # Supervisor autoscaling on ready-job backlog and the age of the oldest ready job
+    WORKER_AUTOSCALE: bool = False
+    WORKER_AUTOSCALE_INTERVAL_SECONDS: float = 5.0
+    WORKER_SCALE_UP_BACKLOG_PER_PROCESS: int = 500
+    WORKER_SCALE_UP_LATENCY_SECONDS: float = 5.0
+    WORKER_SCALE_DOWN_IDLE_CHECKS: int = 6
+
+
+class CarrierWebhookSettings(BaseSettings):
+    CARRIER_WEBHOOK_TOKEN: SecretStr | None = None
+    CARRIER_WEBHOOK_MAX_EVENTS_PER_REQUEST: int = 1000
+
+    # Redis Stream buffering inbound carrier events until the worker applies them
+    CARRIER_EVENTS_STREAM: str = "tracking:carrier-events"
+    CARRIER_EVENTS_STREAM_MAXLEN: int = 1_000_000
+    CARRIER_EVENTS_CONSUMER_GROUP: str = "tracking-updaters"
+    CARRIER_EVENTS_BATCH_SIZE: int = 500
+    CARRIER_EVENTS_BLOCK_MS: int = 100
+    CARRIER_EVENTS_CLAIM_IDLE_MS: int = 60_000
+    # Events of a batch failing this many times are moved to `<stream>:dead-letter`
+    CARRIER_EVENTS_MAX_DELIVERIES: int = 5
+
+
+class ShipmentIngestSettings(BaseSettings):
+    # Redis Stream of shipments accepted with 202 and waiting for the worker to insert them in batches
+    SHIPMENT_INGEST_STREAM: str = "shipments:ingest"
+    SHIPMENT_INGEST_STREAM_MAXLEN: int = 1_000_000
+    SHIPMENT_INGEST_CONSUMER_GROUP: str = "shipment-ingesters"
+    SHIPMENT_INGEST_BATCH_SIZE: int = 500
+    SHIPMENT_INGEST_BLOCK_MS: int = 100
+    SHIPMENT_INGEST_CLAIM_IDLE_MS: int = 60_000
+    # Shipments of a batch failing this many times are moved to `<stream>:dead-letter` and marked `failed`
+    SHIPMENT_INGEST_MAX_DELIVERIES: int = 5
+
+    # Per-pending-id state (`queued`, `created` or `failed`), kept this long for status lookups
+    SHIPMENT_INGEST_RESULT_KEY_PREFIX: str = "shipments:ingest:"
+    SHIPMENT_INGEST_RESULT_TTL_SECONDS: int = 86_400
+
+
+class WebhookDispatchSettings(BaseSettings):
+    # Redis Stream of shipment status changes waiting to be delivered to subscribers
+    WEBHOOK_EVENTS_STREAM: str = "webhooks:status-changes"
+    WEBHOOK_EVENTS_STREAM_MAXLEN: int = 1_000_000
+    WEBHOOK_DEAD_LETTER_STREAM: str = "webhooks:dead-letter"
+    # Sorted set of failed deliveries waiting for their next attempt, scored by when it is due (epoch ms)
+    WEBHOOK_RETRY_KEY: str = "webhooks:retries"
+    WEBHOOK_RETRY_POLL_SECONDS: float = 1.0
+    WEBHOOK_RETRY_BATCH_SIZE: int = 100
+    WEBHOOK_CONSUMER_GROUP: str = "webhook-dispatchers"
+    WEBHOOK_BATCH_SIZE: int = 200
+    WEBHOOK_BLOCK_MS: int = 200
+    WEBHOOK_CLAIM_IDLE_MS: int = 120_000
+
+    WEBHOOK_MAX_CONNECTIONS: int = 100
+    WEBHOOK_MAX_CONCURRENCY_PER_ENDPOINT: int = 4
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_BACKOFF_BASE_SECONDS: float = 0.5
+    WEBHOOK_SUBSCRIPTIONS_REFRESH_SECONDS: int = 30
+
+
+class StatusStreamSettings(BaseSettings):
+    # Events buffered per subscriber; a subscriber that falls this far behind is disconnected
+    STATUS_STREAM_CLIENT_BUFFER: int = 100
+    STATUS_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    STATUS_STREAM_MAX_SHIPMENT_IDS: int = 500
+
+
+class BatchSettings(BaseSettings):
+    BATCH_MAX_OPERATIONS: int = 50
+    BATCH_OPERATION_TIMEOUT_SECONDS: float = 30.0
+
 
 class RedisRateLimiterSettings(BaseSettings):
     REDIS_RATE_LIMIT_HOST: str = "localhost"
@@ -134,8 +301,15 @@ class RedisRateLimiterSettings(BaseSettings):
 
 
 class DefaultRateLimitSettings(BaseSettings):
-    DEFAULT_RATE_LIMIT_LIMIT: int = 10
-    DEFAULT_RATE_LIMIT_PERIOD: int = 3600
+    # Hits per client IP and route within a sliding period of seconds, for the routes without their own limit
+    RATE_LIMIT_ENABLED: bool = True
+    DEFAULT_RATE_LIMIT_LIMIT: int = 600
+    DEFAULT_RATE_LIMIT_PERIOD: int = 60
+    # Per-route limits as [limit, period], keyed by "<METHOD> <path template>", e.g. "POST /api/v1/batch"
+    RATE_LIMIT_ROUTES: dict[str, tuple[int, int]] = {
+        "POST /api/v1/shipments": (60, 60),
+        "POST /api/v1/batch": (60, 60),
+    }
 
 
 class CRUDAdminSettings(BaseSettings):
@@ -183,8 +357,18 @@ class Settings(
     FirstUserSettings,
     TestSettings,
     RedisCacheSettings,
+    LocalCacheSettings,
+    CacheWarmupSettings,
+    WarehouseRegistrySettings,
     ClientSideCacheSettings,
     RedisQueueSettings,
+    PostgresQueueSettings,
+    WorkerCapacitySettings,
+    CarrierWebhookSettings,
+    ShipmentIngestSettings,
+    WebhookDispatchSettings,
+    StatusStreamSettings,
+    BatchSettings,
     RedisRateLimiterSettings,
     DefaultRateLimitSettings,
     CRUDAdminSettings,
@@ -1,4 +1,5 @@
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
 
 from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.asyncio.session import AsyncSession
@@ -21,7 +22,16 @@ async_engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 local_session = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# Set by `POST /api/v1/batch` while it runs a write, so consecutive writes in one batch share a session
+shared_session: ContextVar[AsyncSession | None] = ContextVar("shared_session", default=None)
+
+
 async def async_get_db() -> AsyncGenerator[AsyncSession, None]:
+    db = shared_session.get()
+    if db is not None:
+        yield db
+        return
+
     async with local_session() as db:
         try:
             yield db
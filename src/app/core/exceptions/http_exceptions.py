@@ -14,3 +14,8 @@ from fastcrud.exceptions.http_exceptions import (
 class ServiceUnavailableException(CustomException):
     def __init__(self, detail: str = "Service unavailable") -> None:
         super().__init__(status_code=503, detail=detail)
+
+
+class ConflictException(CustomException):
+    def __init__(self, detail: str = "Conflict") -> None:
+        super().__init__(status_code=409, detail=detail)
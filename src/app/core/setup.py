@@ -13,24 +13,35 @@ from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 
 from ..core.utils.rate_limit import rate_limiter
-from ..middleware.client_cache_middleware import ClientCacheMiddleware
 from ..middleware.logger_middleware import LoggerMiddleware
+from ..middleware.rate_limit_headers_middleware import RateLimitHeadersMiddleware
 from ..models import *  # noqa: F403
+from ..services.service_cache_warmup import service_cache_warmup
+from ..services.service_warehouse_registry import warehouse_registry
 from .config import (
     AppSettings,
+    CacheWarmupSettings,
     ClientSideCacheSettings,
     CORSSettings,
     DatabaseSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    LocalCacheSettings,
+    PostgresQueueSettings,
     RedisCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
+    StatusStreamSettings,
+    WarehouseRegistrySettings,
     settings,
 )
 from .db.database import Base
 from .db.database import async_engine as engine
 from .utils import cache, queue
+from .utils.local_cache import local_cache
+from .utils.pg_queue import PostgresJobQueue
+from .utils.status_stream import status_broadcaster
+from .worker.serialization import deserialize_job, serialize_job
 
 
 # -------------- database --------------
@@ -52,7 +63,16 @@ async def close_redis_cache_pool() -> None:
 
 # -------------- queue --------------
 async def create_redis_queue_pool() -> None:
-    queue.pool = await create_pool(RedisSettings(host=settings.REDIS_QUEUE_HOST, port=settings.REDIS_QUEUE_PORT))
+    queue.pool = await create_pool(
+        RedisSettings(host=settings.REDIS_QUEUE_HOST, port=settings.REDIS_QUEUE_PORT),
+        default_queue_name=settings.REDIS_QUEUE_BACKGROUND_NAME,
+        job_serializer=serialize_job,
+        job_deserializer=deserialize_job,
+    )
+
+
+async def create_postgres_queue_pool() -> None:
+    queue.pool = PostgresJobQueue(default_queue_name=settings.REDIS_QUEUE_BACKGROUND_NAME)
 
 
 async def close_redis_queue_pool() -> None:
@@ -104,7 +124,15 @@ def lifespan_factory(
             if isinstance(settings, RedisCacheSettings):
                 await create_redis_cache_pool()
 
-            if isinstance(settings, RedisQueueSettings):
+                if isinstance(settings, StatusStreamSettings):
+                    status_broadcaster.start(cache.client, settings.SHIPMENT_STATUS_CHANNEL)  # type: ignore
+
+                if isinstance(settings, LocalCacheSettings) and settings.LOCAL_CACHE_ENABLED:
+                    local_cache.start(cache.client, settings.LOCAL_CACHE_INVALIDATION_CHANNEL)  # type: ignore
+
+            if isinstance(settings, PostgresQueueSettings) and settings.QUEUE_BACKEND == "postgres":
+                await create_postgres_queue_pool()
+            elif isinstance(settings, RedisQueueSettings):
                 await create_redis_queue_pool()
 
             if isinstance(settings, RedisRateLimiterSettings):
@@ -113,15 +141,37 @@ def lifespan_factory(
             if create_tables_on_start:
                 await create_tables()
 
+            if (
+                isinstance(settings, WarehouseRegistrySettings)
+                and cache.client is not None
+                and settings.WAREHOUSE_REGISTRY_ENABLED
+            ):
+                warehouse_registry.start(
+                    cache.client,
+                    settings.WAREHOUSE_REGISTRY_CHANNEL,
+                    settings.WAREHOUSE_REGISTRY_VERSION_KEY,
+                )
+                await warehouse_registry.wait_loaded(settings.WAREHOUSE_REGISTRY_LOAD_TIMEOUT_SECONDS)
+
+            if isinstance(settings, CacheWarmupSettings) and cache.client is not None and settings.CACHE_WARMUP_SETS:
+                await service_cache_warmup.warm_up(
+                    settings.CACHE_WARMUP_SETS,
+                    concurrency=settings.CACHE_WARMUP_CONCURRENCY,
+                    budget_seconds=settings.CACHE_WARMUP_BUDGET_SECONDS,
+                )
+
             initialization_complete.set()
 
             yield
 
         finally:
             if isinstance(settings, RedisCacheSettings):
+                await status_broadcaster.stop()
+                await warehouse_registry.stop()
+                await local_cache.stop()
                 await close_redis_cache_pool()
 
-            if isinstance(settings, RedisQueueSettings):
+            if isinstance(settings, RedisQueueSettings) and not isinstance(queue.pool, PostgresJobQueue):
                 await close_redis_queue_pool()
 
             if isinstance(settings, RedisRateLimiterSettings):
@@ -164,10 +214,10 @@ def create_application(
         - AppSettings: Configures basic app metadata like name, description, contact, and license info.
         - DatabaseSettings: Adds event handlers for initializing database tables during startup.
         - RedisCacheSettings: Sets up event handlers for creating and closing a Redis cache pool.
-        - ClientSideCacheSettings: Integrates middleware for client-side caching.
         - CORSSettings: Integrates CORS middleware with specified origins.
         - RedisQueueSettings: Sets up event handlers for creating and closing a Redis queue pool.
-        - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool.
+        - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool, and
+          integrates middleware sending the rate limit headers.
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
           based on the environment type.
 
@@ -185,7 +235,7 @@ def create_application(
 
     The function configures the FastAPI application with different features and behaviors
     based on the provided settings. It includes setting up database connections, Redis pools
-    for caching, queue, and rate limiting, client-side caching, and customizing the API documentation
+    for caching, queue, and rate limiting, and customizing the API documentation
     based on the environment settings.
     """
     # --- before creating application ---
@@ -208,9 +258,6 @@ def create_application(
     application = FastAPI(lifespan=lifespan, **kwargs)
     application.include_router(router)
 
-    if isinstance(settings, ClientSideCacheSettings):
-        application.add_middleware(ClientCacheMiddleware, max_age=settings.CLIENT_CACHE_MAX_AGE)
-
     if isinstance(settings, CORSSettings):
         application.add_middleware(
             CORSMiddleware,
@@ -219,6 +266,9 @@ def create_application(
             allow_methods=settings.CORS_METHODS,
             allow_headers=settings.CORS_HEADERS,
         )
+    if isinstance(settings, RedisRateLimiterSettings):
+        application.add_middleware(RateLimitHeadersMiddleware)
+
     application.add_middleware(LoggerMiddleware)
     if isinstance(settings, EnvironmentSettings):
         if settings.ENVIRONMENT != EnvironmentOption.PRODUCTION:
@@ -1,18 +1,105 @@
+import asyncio
 import functools
+import gzip
+import inspect
 import json
+import logging
+import random
 import re
-from collections.abc import AsyncGenerator, Callable
-from typing import Any
-
-from fastapi import Request
+import time
+import uuid
+from collections import Counter
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterable, Mapping, Sequence
+from datetime import UTC, datetime, timedelta
+from typing import Any, TypeVar
+
+from fastapi import Request, Response
 from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
 from redis.asyncio import ConnectionPool, Redis
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..config import settings
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
+from ..exceptions.http_exceptions import NotFoundException
+from .local_cache import MISSING, local_cache
+
+try:
+    import orjson
+except ImportError:  # optional, see the `speedups` extra
+    orjson = None  # type: ignore[assignment]
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
 
+logger = logging.getLogger(__name__)
+
+ResourceId = TypeVar("ResourceId", bound=int | str)
+
+# Returns when a resource last changed, given the session and its ID, or `None` if it does not exist
+VersionLookup = Callable[[AsyncSession, Any], Awaitable[datetime | None]]
+
+# Response header through which a cached body's version is handed to `http_cache.conditional`, which removes it
+VERSION_HEADER = "x-cache-version"
+
+# Hits and misses of the `cache` decorator in this process, per tier: `l1_*` for `local_cache`, `l2_*` for Redis
+stats: Counter[str] = Counter()
+
+# Keys per DEL when invalidating many resources at once
+_INVALIDATE_CHUNK_SIZE = 1000
+
+# First byte of a stored entry: the rendered JSON body follows as is, or gzipped, or the resource was not found and
+# the error detail follows
+_RAW = b"\x00"
+_GZIP = b"\x01"
+_NOT_FOUND = b"\x02"
+# Prefixes a `_RAW` or `_GZIP` entry with the version of its body, as 8 bytes of microseconds since the epoch
+_VERSIONED = b"\x03"
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+# Store an entry and add its key to each of its tag sets in one step, so a tag invalidation running at the same time
+# either sees the key or runs before the entry exists. Tag sets live at least as long as their newest member.
+# KEYS: the entry key, then its tag sets; ARGV: the value, its expiration in seconds
+_SET_TAGGED_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 2, #KEYS do
+    redis.call('SADD', KEYS[i], KEYS[1])
+    if redis.call('TTL', KEYS[i]) < tonumber(ARGV[2]) then
+        redis.call('EXPIRE', KEYS[i], ARGV[2])
+    end
+end
+"""
+
+# Release a lock only if it is still held with our token, so a lock that expired and was taken over is left alone.
+# KEYS: the lock; ARGV: the token it was acquired with
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Loads of a missing entry in progress in this process, which concurrent misses of the same key wait for
+_inflight: dict[str, asyncio.Future[bytes]] = {}
+
+# Delete every entry in the given tag sets along with the sets, atomically; returns the keys of the entries.
+# Members are deleted in chunks to stay below Lua's unpack() limit.
+# KEYS: the tag sets
+_INVALIDATE_TAGS_SCRIPT = """
+local deleted = {}
+for _, tag in ipairs(KEYS) do
+    local members = redis.call('SMEMBERS', tag)
+    for i = 1, #members, 1000 do
+        redis.call('UNLINK', unpack(members, i, math.min(i + 999, #members)))
+    end
+    for _, member in ipairs(members) do
+        deleted[#deleted + 1] = member
+    end
+    redis.call('DEL', tag)
+end
+return deleted
+"""
+
 
 def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[type, ...]) -> int | str:
     """Infer the resource ID from a dictionary of keyword arguments.
@@ -74,72 +161,183 @@ def _extract_data_inside_brackets(input_string: str) -> list[str]:
     return data_inside_brackets
 
 
-def _construct_data_dict(data_inside_brackets: list[str], kwargs: dict[str, Any]) -> dict[str, Any]:
-    """Construct a dictionary based on data inside brackets and keyword arguments.
+def _compile_template(template: str) -> Callable[[Mapping[str, Any]], str]:
+    """Compile a key template such as 'user_{user_id}_items' into a function formatting it from a mapping.
 
-    Parameters
-    ----------
-    data_inside_brackets: List[str]
-        A list of keys inside brackets.
-    kwargs: Dict[str, Any]
-        A dictionary of keyword arguments.
-
-    Returns
-    -------
-    Dict[str, Any]: A dictionary with keys from data_inside_brackets and corresponding values from kwargs.
+    The fields are extracted once, so formatting a key does not run a regular expression per call.
     """
-    data_dict = {}
-    for key in data_inside_brackets:
-        data_dict[key] = kwargs[key]
-    return data_dict
+    fields = _extract_data_inside_brackets(template)
+    if not fields:
+        return lambda values: template
+    return lambda values: template.format(**{field: values[field] for field in fields})
+
+
+def _result_fields(result: Any) -> Mapping[str, Any]:
+    """The top-level fields of an endpoint's result, for templates that use them."""
+    if isinstance(result, Mapping):
+        return result
+    if isinstance(result, BaseModel):
+        return dict(result)
+    return {}
+
+
+def _dumps(data: Any) -> bytes:
+    """Encode JSON-compatible data like `JSONResponse` does, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _encode_entry(body: bytes, compress_min_bytes: int | None, version: datetime | None = None) -> bytes:
+    if compress_min_bytes is not None and len(body) >= compress_min_bytes:
+        entry = _GZIP + gzip.compress(body, compresslevel=1)
+    else:
+        entry = _RAW + body
+    if version is None:
+        return entry
+    micros = (version - _EPOCH) // timedelta(microseconds=1)
+    return _VERSIONED + micros.to_bytes(8, "big", signed=True) + entry
+
+
+def _split_version(entry: bytes) -> tuple[datetime | None, bytes]:
+    """The version stored with an entry, if any, and the entry without it."""
+    if entry[:1] != _VERSIONED:
+        return None, entry
+    return _EPOCH + timedelta(microseconds=int.from_bytes(entry[1:9], "big", signed=True)), entry[9:]
+
+
+def _render_entry(entry: bytes, request: Request) -> Response:
+    """Turn a stored entry into a response without decoding the JSON, sending gzipped bodies as is when accepted."""
+    version, entry = _split_version(entry)
+    body = entry[1:]
+    if entry[:1] == _NOT_FOUND:
+        raise NotFoundException(body.decode())
+    headers = {} if version is None else {VERSION_HEADER: version.isoformat()}
+    if entry[:1] == _GZIP:
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return Response(
+                content=body,
+                media_type="application/json",
+                headers={**headers, "Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+            )
+        body = gzip.decompress(body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _entry_body(entry: bytes) -> bytes:
+    """The JSON body of a stored entry."""
+    _, entry = _split_version(entry)
+    return gzip.decompress(entry[1:]) if entry[:1] == _GZIP else entry[1:]
+
+
+def _get_client() -> Redis:
+    if client is None:
+        raise MissingClientError
+    return client
 
 
-def _format_prefix(prefix: str, kwargs: dict[str, Any]) -> str:
-    """Format a prefix using keyword arguments.
+async def _read_entry(cache_key: str, with_ttl: bool) -> tuple[bytes | None, int]:
+    """Read an entry and, if asked, its remaining lifetime in milliseconds in the same round trip (else -1)."""
+    if not with_ttl:
+        return await _get_client().get(cache_key), -1
 
-    Parameters
-    ----------
-    prefix: str
-        The prefix template to be formatted.
-    kwargs: Dict[str, Any]
-        A dictionary of keyword arguments.
+    pipe = _get_client().pipeline(transaction=False)
+    pipe.get(cache_key)
+    pipe.pttl(cache_key)
+    cached_data, ttl_ms = await pipe.execute()
+    return cached_data, ttl_ms
 
-    Returns
-    -------
-    str: The formatted prefix.
-    """
-    data_inside_brackets = _extract_data_inside_brackets(prefix)
-    data_dict = _construct_data_dict(data_inside_brackets, kwargs)
-    formatted_prefix = prefix.format(**data_dict)
-    return formatted_prefix
 
+async def _acquire_lock(cache_key: str, timeout: float) -> str | None:
+    """Take the entry's Redis lock for up to `timeout` seconds; returns its token, or `None` if it is held."""
+    token = uuid.uuid4().hex
+    acquired = await _get_client().set(f"lock:{cache_key}", token, nx=True, px=int(timeout * 1000))
+    return token if acquired else None
 
-def _format_extra_data(to_invalidate_extra: dict[str, str], kwargs: dict[str, Any]) -> dict[str, Any]:
-    """Format extra data based on provided templates and keyword arguments.
 
-    This function takes a dictionary of templates and their associated values and a dictionary of keyword arguments.
-    It formats the templates with the corresponding values from the keyword arguments and returns a dictionary
-    where keys are the formatted templates and values are the associated keyword argument values.
+async def _release_lock(cache_key: str, token: str) -> None:
+    script = _get_client().register_script(_RELEASE_LOCK_SCRIPT)
+    await script(keys=[f"lock:{cache_key}"], args=[token])
 
-    Parameters
-    ----------
-    to_invalidate_extra: Dict[str, str]
-        A dictionary where keys are templates and values are the associated values.
-    kwargs: Dict[str, Any]
-        A dictionary of keyword arguments.
 
-    Returns
-    -------
-        Dict[str, Any]: A dictionary where keys are formatted templates and values
-        are associated keyword argument values.
-    """
-    formatted_extra = {}
-    for prefix, id_template in to_invalidate_extra.items():
-        formatted_prefix = _format_prefix(prefix, kwargs)
-        id = _extract_data_inside_brackets(id_template)[0]
-        formatted_extra[formatted_prefix] = kwargs[id]
+async def _revalidate(cache_key: str, stale: bytes, timeout: float, load: Callable[[], Awaitable[bytes]]) -> bytes:
+    """Refresh a stale entry if this request wins its lock; otherwise another one is refreshing it, so return it."""
+    token = await _acquire_lock(cache_key, timeout)
+    if token is None:
+        stats["l2_stale_hits"] += 1
+        return stale
+
+    try:
+        return await load()
+    finally:
+        await _release_lock(cache_key, token)
+
+
+async def _load_locked(cache_key: str, timeout: float | None, load: Callable[[], Awaitable[bytes]]) -> bytes:
+    """Load an entry while holding its Redis lock; if another process holds it, wait for that process's entry."""
+    if timeout is None:
+        return await load()
+
+    token = await _acquire_lock(cache_key, timeout)
+    if token is None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            cached_data: bytes | None = await _get_client().get(cache_key)
+            if cached_data:
+                return cached_data
+        # The lock holder did not finish in time, so stop waiting for it
+        return await load()
+
+    try:
+        return await load()
+    finally:
+        await _release_lock(cache_key, token)
+
+
+async def _load_once(cache_key: str, load: Callable[[], Awaitable[bytes]]) -> bytes:
+    """Load an entry, sharing one load between the concurrent misses of the key in this process."""
+    future = _inflight.get(cache_key)
+    if future is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Only load it ourselves if the shared load was cancelled rather than this request
+            if not future.cancelled():
+                raise
+            return await _load_once(cache_key, load)
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[cache_key] = future
+    try:
+        value = await load()
+    except BaseException as e:
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            future.exception()  # the waiters, if any, re-raise it; don't log it as never retrieved
+        raise
+    else:
+        future.set_result(value)
+        return value
+    finally:
+        del _inflight[cache_key]
 
-    return formatted_extra
+
+async def _announce_invalidation(keys: list[str]) -> None:
+    """Drop deleted keys from this process's `local_cache` and announce them to the other processes'."""
+    local_cache.discard(keys)
+    if keys and client is not None and settings.LOCAL_CACHE_ENABLED:
+        await client.publish(settings.LOCAL_CACHE_INVALIDATION_CHANNEL, json.dumps(keys))
+
+
+async def _invalidate_tags(tags: list[str]) -> None:
+    if client is None or not tags:
+        return
+    script = client.register_script(_INVALIDATE_TAGS_SCRIPT)
+    deleted = await script(keys=tags)
+    await _announce_invalidation([key.decode() for key in deleted])
 
 
 async def _delete_keys_by_pattern(pattern: str) -> None:
@@ -179,10 +377,160 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
         cursor, keys = await client.scan(cursor, match=pattern, count=100)
         if keys:
             await client.delete(*keys)
+            await _announce_invalidation([key.decode() for key in keys])
         if cursor == 0:
             break
 
 
+async def get_many(key_prefix: str, resource_ids: Sequence[int | str]) -> list[bytes | None]:
+    """Read the JSON bodies cached under `key_prefix` for several resources, in order, `None` for misses.
+
+    Entries in `local_cache` are used as is; the rest are read with one MGET. The bodies are those `cache` and
+    `set_many` store, so list endpoints can compose their responses from the entries of their detail reads. Redis
+    errors are logged and read as misses.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The `key_prefix` the entries were cached under.
+    resource_ids: Sequence[int | str]
+        The IDs of the resources to read.
+    """
+    keys = [f"{key_prefix}:{resource_id}" for resource_id in resource_ids]
+    entries: list[Any] = [local_cache.get(key) if local_cache.running else MISSING for key in keys]
+
+    remote = [index for index, entry in enumerate(entries) if entry is MISSING]
+    if local_cache.running:
+        stats["l1_hits"] += len(keys) - len(remote)
+        stats["l1_misses"] += len(remote)
+    if remote and client is not None:
+        try:
+            for index, entry in zip(remote, await client.mget([keys[index] for index in remote]), strict=True):
+                entries[index] = entry
+                if entry is not None and local_cache.running:
+                    local_cache.set(keys[index], entry, local_cache.ttl_seconds)
+        except Exception as e:
+            logger.error(f"Failed to read {len(remote)} cached {key_prefix} entries: {e}", exc_info=True)
+
+    stats["l2_hits"] += sum(1 for index in remote if entries[index] not in (None, MISSING))
+    stats["l2_misses"] += sum(1 for index in remote if entries[index] in (None, MISSING))
+    # A not-found entry for a listed ID is outdated, so it is loaded again
+    return [None if entry in (None, MISSING) or entry[:1] == _NOT_FOUND else _entry_body(entry) for entry in entries]
+
+
+async def get_not_found(key_prefix: str, resource_id: int | str) -> str | None:
+    """The error detail if `cache` holds a not-found entry for the resource, see `not_found_expiration`, else `None`.
+
+    Lets code in front of a decorated endpoint answer absent resources without I/O beyond the cache. Redis errors
+    are logged and read as no entry.
+    """
+    key = f"{key_prefix}:{resource_id}"
+    entry = local_cache.get(key) if local_cache.running else MISSING
+    if entry is MISSING and client is not None:
+        try:
+            entry = await client.get(key)
+        except Exception as e:
+            logger.error(f"Failed to read cached {key}: {e}", exc_info=True)
+    if isinstance(entry, bytes) and entry[:1] == _NOT_FOUND:
+        return entry[1:].decode()
+    return None
+
+
+async def set_many(
+    key_prefix: str,
+    bodies: Mapping[ResourceId, bytes],
+    expiration: int,
+    tags: Mapping[ResourceId, list[str]] | None = None,
+    versions: Mapping[ResourceId, datetime] | None = None,
+    stale_while_revalidate: int = 0,
+    jitter: float = 0.0,
+    compress_min_bytes: int | None = 1024,
+) -> None:
+    """Cache the rendered JSON bodies of several resources under `key_prefix` in one pipelined round trip.
+
+    Entries are stored as `cache` stores them, so its decorated detail reads are served from them, and the other way
+    round. Best effort, like `invalidate`.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The `key_prefix` to cache the entries under.
+    bodies: Mapping[ResourceId, bytes]
+        The JSON body of each resource, by ID.
+    expiration: int
+        The expiration time for the entries in seconds.
+    tags: Mapping[ResourceId, List[str]] | None, optional
+        The formatted tags to file each resource's entry under, by ID.
+    versions: Mapping[ResourceId, datetime] | None, optional
+        When each resource last changed, by ID, read before its body; stored with the entry like `cache`'s `version`.
+    stale_while_revalidate, jitter, compress_min_bytes: optional
+        As for `cache`.
+    """
+    if client is None or not bodies:
+        return
+
+    try:
+        pipe = client.pipeline(transaction=False)
+        for resource_id, body in bodies.items():
+            key = f"{key_prefix}:{resource_id}"
+            entry = _encode_entry(body, compress_min_bytes, (versions or {}).get(resource_id))
+            ttl = expiration + int(random.uniform(0, expiration * jitter)) + stale_while_revalidate
+            entry_tags = (tags or {}).get(resource_id, [])
+            if entry_tags:
+                pipe.eval(_SET_TAGGED_SCRIPT, 1 + len(entry_tags), key, *entry_tags, entry, ttl)
+            else:
+                pipe.set(key, entry, ex=ttl)
+            if local_cache.running:
+                local_cache.set(key, entry, ttl - stale_while_revalidate)
+        await pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to cache {len(bodies)} {key_prefix} entries: {e}", exc_info=True)
+
+
+async def invalidate(key_prefix: str, resource_ids: Iterable[int | str]) -> None:
+    """Delete the entries cached by `cache(key_prefix=...)` for the given resource IDs.
+
+    For writes made outside a decorated endpoint (services, the worker). Invalidation is best effort: without a
+    client it does nothing, and Redis errors are logged rather than failing a write that already committed, since
+    the entries still expire on their own.
+
+    Parameters
+    ----------
+    key_prefix: str
+        The `key_prefix` the entries were cached under.
+    resource_ids: Iterable[int | str]
+        The IDs of the resources whose entries to delete.
+    """
+    if client is None:
+        return
+
+    keys = [f"{key_prefix}:{resource_id}" for resource_id in resource_ids]
+    try:
+        for start in range(0, len(keys), _INVALIDATE_CHUNK_SIZE):
+            await client.delete(*keys[start : start + _INVALIDATE_CHUNK_SIZE])
+        await _announce_invalidation(keys)
+    except Exception as e:
+        logger.error(f"Failed to invalidate {len(keys)} cached {key_prefix} entries: {e}", exc_info=True)
+
+
+async def invalidate_tags(tags: Iterable[str]) -> None:
+    """Delete every entry cached with any of the given tags, see `cache(tags=...)`.
+
+    Costs one round trip and O(entries) in Redis, independent of the size of the keyspace. Best effort, like
+    `invalidate`.
+
+    Parameters
+    ----------
+    tags: Iterable[str]
+        The formatted tags, e.g. 'warehouse_shipments:7'.
+    """
+    tags = list(tags)
+    try:
+        await _invalidate_tags(tags)
+    except Exception as e:
+        logger.error(f"Failed to invalidate cache tags {tags}: {e}", exc_info=True)
+
+
 def cache(
     key_prefix: str,
     resource_id_name: Any = None,
@@ -190,6 +538,14 @@ def cache(
     resource_id_type: type | tuple[type, ...] = int,
     to_invalidate_extra: dict[str, Any] | None = None,
     pattern_to_invalidate_extra: list[str] | None = None,
+    tags: list[str] | None = None,
+    to_invalidate_tags: list[str] | None = None,
+    stale_while_revalidate: int = 0,
+    lock_timeout: float | None = None,
+    jitter: float = 0.0,
+    compress_min_bytes: int | None = 1024,
+    not_found_expiration: int = 0,
+    version: VersionLookup | None = None,
 ) -> Callable:
     """Cache decorator for FastAPI endpoints.
 
@@ -215,6 +571,34 @@ def cache(
     pattern_to_invalidate_extra: List[str] | None, optional
         A list of string patterns for cache keys that should be invalidated when the decorated function is called.
         This allows for bulk invalidation of cache keys based on a matching pattern.
+    tags: List[str] | None, optional
+        Templates of tags to file the cached data under on GET requests, formatted with the keyword arguments or,
+        failing that, the top-level fields of the response, e.g. 'warehouse_shipments:{warehouse_id}'. Entries are
+        added to their tag sets atomically with being stored.
+    to_invalidate_tags: List[str] | None, optional
+        Templates of tags whose entries are invalidated when the decorated function is called with a method other
+        than GET, formatted with the keyword arguments. Each tag costs O(its entries) rather than a keyspace scan.
+    stale_while_revalidate: int, optional
+        Seconds an entry is kept past its expiration. A request that finds an entry in that window takes a Redis
+        lock and refreshes it, while the other requests keep getting the stale entry. Defaults to 0 (disabled).
+    lock_timeout: float | None, optional
+        When set, a miss takes a Redis lock for up to this many seconds before loading the data, so one process
+        loads it while the others wait for the entry to appear. Within a process, concurrent misses of a key always
+        share one load.
+    jitter: float, optional
+        Fraction of `expiration` added at random to each entry's lifetime, so entries written together do not all
+        expire together. Defaults to 0.0.
+    compress_min_bytes: int | None, optional
+        Rendered responses of at least this many bytes are stored gzipped, and sent as is to clients accepting gzip.
+        `None` disables compression. Defaults to 1024.
+    not_found_expiration: int, optional
+        When set, a GET whose endpoint raises `NotFoundException` is cached as not found for this many seconds, so
+        repeated requests for absent resources raise it again without calling the endpoint. Whatever creates or
+        restores the resource must `invalidate` its key. Defaults to 0 (disabled).
+    version: VersionLookup | None, optional
+        Called with the endpoint's `db` session and the resource ID before a GET loads the data. The version is stored
+        with the entry, so `http_cache.conditional` derives the validators of cached bodies from it without looking
+        it up. Being read first, it is never newer than the body. Defaults to None.
 
     Returns
     -------
@@ -241,6 +625,9 @@ def cache(
     This decorator caches the response data of the endpoint function using a unique cache key.
     The cached data is retrieved for GET requests, and the cache is invalidated for other types of requests.
 
+    GET responses are cached as rendered JSON bytes: the result is validated against the endpoint's return
+    annotation and encoded once, when it is stored, and hits are returned as a raw `Response` without decoding it.
+
     Advanced Example Usage
     -------------
     ```python
@@ -281,11 +668,59 @@ def cache(
     ----
     - resource_id_type is used only if resource_id is not passed.
     - `to_invalidate_extra` and `pattern_to_invalidate_extra` are used for cache invalidation on methods other than GET.
-    - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Use it judiciously and
-      consider the potential impact on Redis performance.
+    - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets, since every call scans the
+      whole keyspace. Prefer `tags` and `to_invalidate_tags` for invalidating groups of entries.
+    - While `local_cache` is running (`LOCAL_CACHE_ENABLED`), GET requests are served from it before Redis, and
+      every invalidation is announced to the other processes. Hits and misses per tier are counted in `stats`.
     """
 
+    render_key_prefix = _compile_template(key_prefix)
+    render_tags = [_compile_template(tag) for tag in tags or []]
+    render_invalidate_tags = [_compile_template(tag) for tag in to_invalidate_tags or []]
+    render_patterns = [_compile_template(pattern) for pattern in pattern_to_invalidate_extra or []]
+    render_extra = [
+        (_compile_template(prefix), _extract_data_inside_brackets(id_template)[0])
+        for prefix, id_template in (to_invalidate_extra or {}).items()
+    ]
+
     def wrapper(func: Callable) -> Callable:
+        return_annotation = inspect.signature(func).return_annotation
+        adapter = None if return_annotation is inspect.Signature.empty else TypeAdapter(return_annotation)
+
+        def render(result: Any) -> bytes:
+            if adapter is None:
+                return _dumps(jsonable_encoder(result))
+            return adapter.dump_json(adapter.validate_python(result, from_attributes=True), by_alias=True)
+
+        async def load(request: Request, cache_key: str, resource_id: Any, args: Any, kwargs: dict[str, Any]) -> bytes:
+            loaded_version = None if version is None else await version(kwargs["db"], resource_id)
+            try:
+                result = await func(request, *args, **kwargs)
+            except NotFoundException as e:
+                if not not_found_expiration:
+                    raise
+                # Rendered like any entry, which raises it again, so waiters for this load get it too
+                entry = _NOT_FOUND + str(e.detail).encode()
+                await _get_client().set(cache_key, entry, ex=not_found_expiration)
+                if local_cache.running:
+                    local_cache.set(cache_key, entry, not_found_expiration)
+                return entry
+
+            entry = _encode_entry(render(result), compress_min_bytes, loaded_version)
+            ttl = expiration + int(random.uniform(0, expiration * jitter)) + stale_while_revalidate
+
+            if render_tags:
+                # Endpoint arguments take precedence over result fields of the same name
+                fields = {**_result_fields(result), **kwargs}
+                script = _get_client().register_script(_SET_TAGGED_SCRIPT)
+                await script(keys=[cache_key, *(render_tag(fields) for render_tag in render_tags)], args=[entry, ttl])
+            else:
+                await _get_client().set(cache_key, entry, ex=ttl)
+
+            if local_cache.running:
+                local_cache.set(cache_key, entry, ttl - stale_while_revalidate)
+            return entry
+
         @functools.wraps(func)
         async def inner(request: Request, *args: Any, **kwargs: Any) -> Any:
             if client is None:
@@ -296,39 +731,54 @@ def cache(
             else:
                 resource_id = _infer_resource_id(kwargs=kwargs, resource_id_type=resource_id_type)
 
-            formatted_key_prefix = _format_prefix(key_prefix, kwargs)
-            cache_key = f"{formatted_key_prefix}:{resource_id}"
+            cache_key = f"{render_key_prefix(kwargs)}:{resource_id}"
             if request.method == "GET":
-                if to_invalidate_extra is not None or pattern_to_invalidate_extra is not None:
+                if render_extra or render_patterns or render_invalidate_tags:
                     raise InvalidRequestError
 
-                cached_data = await client.get(cache_key)
+                if local_cache.running:
+                    entry = local_cache.get(cache_key)
+                    if entry is not MISSING:
+                        stats["l1_hits"] += 1
+                        return _render_entry(entry, request)
+                    stats["l1_misses"] += 1
+
+                cached_data, ttl_ms = await _read_entry(cache_key, with_ttl=stale_while_revalidate > 0)
+                refresh = functools.partial(load, request, cache_key, resource_id, args, kwargs)
                 if cached_data:
-                    return json.loads(cached_data.decode())
+                    # Past its expiration, in the stale window: one request refreshes it, the others get it as is.
+                    # Not-found entries have no such window
+                    if cached_data[:1] != _NOT_FOUND and 0 <= ttl_ms < stale_while_revalidate * 1000:
+                        entry = await _revalidate(
+                            cache_key, cached_data, lock_timeout or stale_while_revalidate, refresh
+                        )
+                        return _render_entry(entry, request)
+
+                    stats["l2_hits"] += 1
+                    if local_cache.running:
+                        fresh_for = ttl_ms / 1000 - stale_while_revalidate if ttl_ms >= 0 else expiration
+                        local_cache.set(cache_key, cached_data, fresh_for)
+                    return _render_entry(cached_data, request)
+                stats["l2_misses"] += 1
+
+                entry = await _load_once(cache_key, functools.partial(_load_locked, cache_key, lock_timeout, refresh))
+                return _render_entry(entry, request)
 
             result = await func(request, *args, **kwargs)
 
-            if request.method == "GET":
-                serializable_data = jsonable_encoder(result)
-                serialized_data = json.dumps(serializable_data)
+            deleted_keys = [cache_key]
+            await client.delete(cache_key)
+            for render_prefix, id_field in render_extra:
+                extra_cache_key = f"{render_prefix(kwargs)}:{kwargs[id_field]}"
+                await client.delete(extra_cache_key)
+                deleted_keys.append(extra_cache_key)
+            await _announce_invalidation(deleted_keys)
 
-                await client.set(cache_key, serialized_data)
-                await client.expire(cache_key, expiration)
+            for render_pattern in render_patterns:
+                await _delete_keys_by_pattern(render_pattern(kwargs) + "*")
 
-                return json.loads(serialized_data)
-
-            else:
-                await client.delete(cache_key)
-                if to_invalidate_extra is not None:
-                    formatted_extra = _format_extra_data(to_invalidate_extra, kwargs)
-                    for prefix, id in formatted_extra.items():
-                        extra_cache_key = f"{prefix}:{id}"
-                        await client.delete(extra_cache_key)
-
-                if pattern_to_invalidate_extra is not None:
-                    for pattern in pattern_to_invalidate_extra:
-                        formatted_pattern = _format_prefix(pattern, kwargs)
-                        await _delete_keys_by_pattern(formatted_pattern + "*")
+            if render_invalidate_tags:
+                await _invalidate_tags([render_tag(kwargs) for render_tag in render_invalidate_tags])
 
             return result
 
@@ -0,0 +1,147 @@
+import functools
+from collections.abc import Callable
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from ..exceptions.http_exceptions import NotFoundException
+from . import cache
+
+# Appended to the entity tag of gzipped bodies, which are different bytes than the identity-encoded ones
+_GZIP_SUFFIX = "-gzip"
+
+
+def _entity_tag(key_prefix: str, resource_id: Any, version: datetime) -> str:
+    return f'"{key_prefix}-{resource_id}-{int(version.timestamp() * 1_000_000)}"'
+
+
+def _match_none_match(if_none_match: str, etag: str) -> str | None:
+    """The tag of `If-None-Match` matching `etag`, in whichever encoding, compared weakly as RFC 9110 requires."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*":
+            return etag
+        if candidate in (etag, f'{etag[:-1]}{_GZIP_SUFFIX}"'):
+            return candidate
+    return None
+
+
+def _not_modified_since(if_modified_since: str, version: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    # Last-Modified has second precision
+    return version.replace(microsecond=0) <= since
+
+
+def _validators(key_prefix: str, resource_id: Any, version: datetime, cache_control: str) -> dict[str, str]:
+    return {
+        "ETag": _entity_tag(key_prefix, resource_id, version),
+        "Last-Modified": format_datetime(version.astimezone(UTC), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+
+def _render(result: Any) -> Response:
+    if isinstance(result, Response):
+        return result
+    if isinstance(result, BaseModel):
+        return Response(content=result.model_dump_json(by_alias=True), media_type="application/json")
+    return JSONResponse(content=jsonable_encoder(result))
+
+
+def conditional(
+    key_prefix: str,
+    version: cache.VersionLookup,
+    resource_id_name: str,
+    cache_control: str,
+    not_found_cached: bool = False,
+) -> Callable:
+    """Answer conditional GETs of a single resource with 304 from a cheap version lookup, and set its cache policy.
+
+    The decorated endpoint's resource gets a strong `ETag` and a `Last-Modified` derived from its version, when it
+    last changed. Requests with `If-None-Match` (or, without one, `If-Modified-Since`) look the version up with
+    `version`; if it still matches, they are answered `304 Not Modified` without calling the endpoint, so the resource
+    is neither loaded nor serialized. Other responses get `cache_control` as their `Cache-Control` header.
+
+    Like `cache`, the endpoint must take the request as its first argument, and the database session as `db`. Apply
+    this decorator above `cache`, so that revalidations skip the cache too, and give `cache` the same `version`:
+    plain GETs then take the version stored with the cached body, so they neither query the database nor get
+    validators newer than the body they are sent. Bodies cached without a version are sent without validators.
+
+    Parameters
+    ----------
+    key_prefix: str
+        Prefix of the entity tags, e.g. the resource name.
+    version: cache.VersionLookup
+        Called with the session and the resource ID; returns when the resource last changed, or `None` if it does not
+        exist, in which case the endpoint is called to answer.
+    resource_id_name: str
+        The name of the endpoint argument holding the resource ID.
+    cache_control: str
+        The `Cache-Control` policy of the route's responses.
+    not_found_cached: bool, optional
+        Set when the endpoint's `cache` caches not-found results under the same `key_prefix`: absent resources are
+        then answered from that entry, without the version lookup. Defaults to False.
+
+    Returns
+    -------
+    Callable
+        A decorator function that can be applied to FastAPI endpoints.
+    """
+
+    def wrapper(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def inner(request: Request, *args: Any, **kwargs: Any) -> Any:
+            if request.method != "GET":
+                return await func(request, *args, **kwargs)
+
+            resource_id = kwargs[resource_id_name]
+            if not_found_cached:
+                detail = await cache.get_not_found(key_prefix, resource_id)
+                if detail is not None:
+                    raise NotFoundException(detail)
+
+            last_changed = None
+            if_none_match = request.headers.get("if-none-match")
+            if_modified_since = request.headers.get("if-modified-since")
+            if if_none_match is not None or if_modified_since is not None:
+                last_changed = await version(kwargs["db"], resource_id)
+                if last_changed is None:
+                    return await func(request, *args, **kwargs)
+
+                headers = _validators(key_prefix, resource_id, last_changed, cache_control)
+                if if_none_match is not None:
+                    matched = _match_none_match(if_none_match, headers["ETag"])
+                    if matched is not None:
+                        return Response(status_code=304, headers={**headers, "ETag": matched})
+                elif if_modified_since is not None and _not_modified_since(if_modified_since, last_changed):
+                    return Response(status_code=304, headers=headers)
+
+            response = _render(await func(request, *args, **kwargs))
+            # The version of the body actually sent: the one cached with it, else the one read before loading it
+            stored = response.headers.get(cache.VERSION_HEADER)
+            if stored is not None:
+                del response.headers[cache.VERSION_HEADER]
+                last_changed = datetime.fromisoformat(stored)
+            if last_changed is None:
+                response.headers["Cache-Control"] = cache_control
+                return response
+
+            headers = _validators(key_prefix, resource_id, last_changed, cache_control)
+            if response.headers.get("content-encoding") == "gzip":
+                headers["ETag"] = f'{headers["ETag"][:-1]}{_GZIP_SUFFIX}"'
+            response.headers.update(headers)
+            return response
+
+        return inner
+
+    return wrapper
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from redis.asyncio import Redis
+
+from ..config import settings
+from .pubsub import consume_channel
+
+MISSING = object()
+
+
+class LocalCache:
+    """In-process LRU of `cache` entries, in front of the Redis cache.
+
+    Holds up to `max_entries` entries, each for at most `ttl_seconds`, so a hit costs no round trip. Entries
+    invalidated in any process are announced on a Redis pub/sub channel and dropped here by `_listen`; the local TTL
+    bounds how stale an entry can get if an announcement is lost. The cache is only used while that subscription is
+    running, see `running`.
+
+    Parameters
+    ----------
+    max_entries: int
+        Entries kept before the least recently used one is evicted.
+    ttl_seconds: float
+        Upper bound on how long an entry is kept, whatever its Redis expiration.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, client: Redis, channel: str) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._listen(client, channel))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._entries.clear()
+
+    def get(self, key: str) -> Any:
+        """Return the entry under `key`, or `MISSING` if there is none or it expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float) -> None:
+        self._entries[key] = (time.monotonic() + min(ttl_seconds, self.ttl_seconds), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def _listen(self, client: Redis, channel: str) -> None:
+        async def clear() -> None:
+            # Invalidations published while unsubscribed were missed, so start over
+            self._entries.clear()
+
+        async def discard(data: bytes) -> None:
+            self.discard(json.loads(data))
+
+        await consume_channel(client, channel, discard, on_subscribe=clear)
+
+
+local_cache = LocalCache(max_entries=settings.LOCAL_CACHE_MAX_ENTRIES, ttl_seconds=settings.LOCAL_CACHE_TTL_SECONDS)
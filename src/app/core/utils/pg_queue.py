@@ -0,0 +1,79 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ...models.job import Job
+from ..config import settings
+from ..db.database import local_session
+
+
+class PostgresJobQueue:
+    """Job queue backed by the `job` table, with the same `enqueue_job` interface as `ArqRedis`.
+
+    Jobs are inserted in their own transaction. Jobs that are due immediately also send a `NOTIFY` on
+    `PG_QUEUE_NOTIFY_CHANNEL`, with the queue name as payload, which Postgres delivers to listening workers on
+    commit.
+
+    Parameters
+    ----------
+    default_queue_name: str
+        Queue used when `enqueue_job` is called without `_queue_name`.
+    session_factory: async_sessionmaker[AsyncSession]
+        Session factory for the database holding the `job` table.
+    """
+
+    def __init__(
+        self,
+        default_queue_name: str = settings.REDIS_QUEUE_BACKGROUND_NAME,
+        session_factory: async_sessionmaker[AsyncSession] = local_session,
+    ) -> None:
+        self.default_queue_name = default_queue_name
+        self.session_factory = session_factory
+
+    async def enqueue_job(
+        self,
+        function: str,
+        *args: Any,
+        _job_id: str | None = None,
+        _queue_name: str | None = None,
+        _defer_until: datetime | None = None,
+        _defer_by: int | float | timedelta | None = None,
+        **kwargs: Any,
+    ) -> str | None:
+        """Enqueue `function(*args, **kwargs)` and return its job id, or `None` if a job with `_job_id` exists."""
+        queue_name = _queue_name or self.default_queue_name
+        now = datetime.now(UTC)
+        if _defer_until is not None:
+            scheduled_at = _defer_until
+        elif _defer_by is not None:
+            scheduled_at = now + (_defer_by if isinstance(_defer_by, timedelta) else timedelta(seconds=_defer_by))
+        else:
+            scheduled_at = now
+
+        stmt = (
+            insert(Job)
+            .values(
+                job_id=_job_id or uuid.uuid4().hex,
+                queue_name=queue_name,
+                function=function,
+                args=list(args),
+                kwargs=kwargs,
+                attempts=0,
+                scheduled_at=scheduled_at,
+                created_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=[Job.job_id])
+            .returning(Job.job_id)
+        )
+
+        async with self.session_factory() as db:
+            job_id = (await db.execute(stmt)).scalar_one_or_none()
+            if job_id is not None and scheduled_at <= now:
+                await db.execute(select(func.pg_notify(settings.PG_QUEUE_NOTIFY_CHANNEL, queue_name)))
+            await db.commit()
+
+        return job_id
@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[bytes], Awaitable[None]]
+
+
+async def consume_channel(
+    client: Redis,
+    channel: str,
+    handler: MessageHandler,
+    on_subscribe: Callable[[], Awaitable[None]] | None = None,
+    on_error: Callable[[], None] | None = None,
+) -> None:
+    """Subscribe to a Redis pub/sub channel and hand the data of each message to `handler`, resubscribing a second
+    after any failure. Runs until cancelled.
+
+    Messages published while unsubscribed are lost, so callers that keep state derived from the channel use
+    `on_subscribe` to catch up, and `on_error` to stop trusting that state until they have.
+
+    Parameters
+    ----------
+    client: Redis
+        The Redis client to subscribe with.
+    channel: str
+        The channel name.
+    handler: MessageHandler
+        Coroutine applying one message's data. A failure drops the subscription and resubscribes.
+    on_subscribe: Callable[[], Awaitable[None]] | None
+        Coroutine run after each subscription, before any message is handled.
+    on_error: Callable[[], None] | None
+        Called when the subscription fails, before waiting to resubscribe.
+    """
+    while True:
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(channel)
+            if on_subscribe is not None:
+                await on_subscribe()
+            async for message in pubsub.listen():
+                await handler(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if on_error is not None:
+                on_error()
+            logger.error(f"Subscription to {channel} failed, resubscribing: {e}", exc_info=True)
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()  # type: ignore
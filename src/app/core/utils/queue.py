@@ -1,3 +1,16 @@
 from arq.connections import ArqRedis
 
-pool: ArqRedis | None = None
+from ...schemas.shipment import ShipmentStatus
+from .pg_queue import PostgresJobQueue
+
+# The ARQ Redis pool, or the Postgres job queue when QUEUE_BACKEND is "postgres"; both expose `enqueue_job`
+pool: ArqRedis | PostgresJobQueue | None = None
+
+
+def tracking_job_id(shipment_id: int, status: ShipmentStatus | str | None) -> str:
+    """Job ID of the scheduled tracking update of a shipment in `status`.
+
+    Every scheduled update uses it, so enqueueing the update of a shipment and status that is already queued (or
+    running) is a no-op, and a shipment has a single polling chain however many writers schedule it.
+    """
+    return f"tracking:{shipment_id}:{ShipmentStatus(status).value if status else 'none'}"
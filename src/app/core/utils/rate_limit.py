@@ -1,22 +1,88 @@
-from datetime import UTC, datetime
+import math
+from dataclasses import dataclass
 from typing import Optional
 
+from fastapi import Request
 from redis.asyncio import ConnectionPool, Redis
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...core.logger import logging
+from ..config import settings
+from ..exceptions.http_exceptions import RateLimitException
 
 logger = logging.getLogger(__name__)
 
+# Sliding-window counter: the hit count of the current fixed window, plus the previous window's weighted by how much
+# of it still overlaps the sliding window. Unlike a fixed window, a client cannot burst twice the limit across a
+# window boundary, and it only takes one hash per client and route. Checking and counting the hit is one atomic call,
+# timed by the Redis clock so every API process agrees on the windows. Rejected hits are not counted.
+# KEYS: the client's hash for the route; ARGV: the limit, the period in milliseconds
+# Returns: 1 if the hit is allowed else 0, the hits remaining, ms until the window resets, ms to wait if rejected
+_SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local window = now - (now % period)
+
+local state = redis.call('HMGET', KEYS[1], 'window', 'current', 'previous')
+local stored, current, previous = tonumber(state[1]), tonumber(state[2]) or 0, tonumber(state[3]) or 0
+if stored ~= window then
+    previous = stored == window - period and current or 0
+    current = 0
+end
+
+local elapsed = now - window
+local used = previous * (period - elapsed) / period + current
+local reset = period - elapsed
+if used + 1 > limit then
+    local retry
+    if current + 1 <= limit and previous > 0 then
+        -- once enough of the previous window has slid out
+        retry = math.ceil(period * (1 - (limit - 1 - current) / previous)) - elapsed
+    else
+        -- once enough of this window has slid out, in the next one
+        retry = reset + math.ceil(period * (1 - (limit - 1) / math.max(current, 1)))
+    end
+    return {0, 0, reset, math.max(retry, 1)}
+end
+
+redis.call('HSET', KEYS[1], 'window', window, 'current', current + 1, 'previous', previous)
+redis.call('PEXPIRE', KEYS[1], reset + period)
+return {1, math.floor(limit - used - 1), reset, 0}
+"""
+
 
 def sanitize_path(path: str) -> str:
     return path.strip("/").replace("/", "_")
 
 
+@dataclass
+class RateLimitStatus:
+    allowed: bool
+    limit: int
+    remaining: int
+    """Hits left in the sliding window after this one."""
+    reset_seconds: int
+    """Seconds until the current window ends."""
+    retry_after_seconds: int
+    """Seconds until a rejected client may retry; 0 when allowed."""
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_seconds),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after_seconds)
+        return headers
+
+
 class RateLimiter:
     _instance: Optional["RateLimiter"] = None
-    pool: Optional[ConnectionPool] = None
-    client: Optional[Redis] = None
+    pool: ConnectionPool | None = None
+    client: Redis | None = None
 
     def __new__(cls) -> "RateLimiter":
         if cls._instance is None:
@@ -38,27 +104,65 @@ class RateLimiter:
             raise Exception("Redis client is not initialized.")
         return instance.client
 
-    async def is_rate_limited(self, db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
-        client = self.get_client()
-        current_timestamp = int(datetime.now(UTC).timestamp())
-        window_start = current_timestamp - (current_timestamp % period)
+    async def hit(self, client_id: str, path: str, limit: int, period: int) -> RateLimitStatus:
+        """Count a hit of `client_id` on `path` if it is within `limit` hits per sliding `period` seconds.
 
-        sanitized_path = sanitize_path(path)
-        key = f"ratelimit:{user_id}:{sanitized_path}:{window_start}"
+        One round trip, see `_SLIDING_WINDOW_SCRIPT`.
+        """
+        key = f"ratelimit:{client_id}:{sanitize_path(path)}"
+        script = self.get_client().register_script(_SLIDING_WINDOW_SCRIPT)
+        allowed, remaining, reset_ms, retry_ms = await script(keys=[key], args=[limit, period * 1000])
+        return RateLimitStatus(
+            allowed=bool(allowed),
+            limit=limit,
+            remaining=max(int(remaining), 0),
+            reset_seconds=math.ceil(int(reset_ms) / 1000),
+            retry_after_seconds=math.ceil(int(retry_ms) / 1000),
+        )
+
+
+rate_limiter = RateLimiter()
 
-        try:
-            current_count = await client.incr(key)
-            if current_count == 1:
-                await client.expire(key, period)
 
-            if current_count > limit:
-                return True
+class RateLimit:
+    """FastAPI dependency enforcing a per-client limit on the route it guards.
 
+    Each route is limited to `RATE_LIMIT_ROUTES["<METHOD> <path>"]` hits (as `[limit, period]`) per client IP, or
+    `DEFAULT_RATE_LIMIT_LIMIT` per `DEFAULT_RATE_LIMIT_PERIOD` seconds when it is not listed. A client over its limit
+    gets `RateLimitException` (429). The `RateLimit-*` headers of the check, plus `Retry-After` on a 429, are sent
+    by `RateLimitHeadersMiddleware`, since headers set by dependencies are lost when an endpoint returns its own
+    `Response`. If Redis fails, requests are let through.
+
+    The client IP is `request.client.host`. Behind a proxy it is only the client's own address when the server
+    trusts the proxy's `X-Forwarded-For` (uvicorn's `--forwarded-allow-ips`); otherwise all clients share one limit.
+
+    Example usage
+    -------------
+    ```python
+    router = APIRouter(dependencies=[Depends(rate_limit)])
+    ```
+    """
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED or rate_limiter.client is None:
+            return
+
+        route = request.scope.get("route")
+        path = getattr(route, "path", request.url.path)
+        limit, period = settings.RATE_LIMIT_ROUTES.get(
+            f"{request.method} {path}", (settings.DEFAULT_RATE_LIMIT_LIMIT, settings.DEFAULT_RATE_LIMIT_PERIOD)
+        )
+        client_id = request.client.host if request.client else "unknown"
+
+        try:
+            status = await rate_limiter.hit(client_id, f"{request.method.lower()}{path}", limit, period)
         except Exception as e:
-            logger.exception(f"Error checking rate limit for user {user_id} on path {path}: {e}")
-            raise e
+            logger.exception(f"Error checking rate limit for client {client_id} on {path}, allowing it: {e}")
+            return
 
-        return False
+        request.state.rate_limit_headers = status.headers
+        if not status.allowed:
+            raise RateLimitException("Rate limit exceeded")
 
 
-rate_limiter = RateLimiter()
+rate_limit = RateLimit()
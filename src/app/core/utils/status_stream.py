@@ -0,0 +1,144 @@
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Iterable
+
+from redis.asyncio import Redis
+
+from ..config import settings
+from .pubsub import consume_channel
+
+logger = logging.getLogger(__name__)
+
+
+class StatusSubscription:
+    """One client's view of the status stream: a bounded buffer of encoded events.
+
+    `None` in the buffer marks the end of the stream, either because the broadcaster stopped or because the
+    client fell `buffer_size` events behind and was dropped.
+    """
+
+    def __init__(self, shipment_ids: frozenset[int], warehouse_id: int | None, buffer_size: int) -> None:
+        self.shipment_ids = shipment_ids
+        self.warehouse_id = warehouse_id
+        self.events: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def _close(self) -> None:
+        while not self.events.empty():
+            self.events.get_nowait()
+        self.events.put_nowait(None)
+
+
+class StatusBroadcaster:
+    """Fan shipment status changes from one Redis pub/sub subscription out to every subscriber of this process.
+
+    The process holds a single pub/sub connection no matter how many clients are subscribed. Each change is
+    encoded once and put on the buffers of the subscriptions watching its shipment or its warehouse, so an idle
+    subscriber costs a queue and a few index entries. Delivery never waits on a client: a subscriber whose buffer
+    is full is dropped, and can reconnect and re-read the current status.
+
+    Parameters
+    ----------
+    buffer_size: int
+        Events buffered per subscriber before it is dropped.
+    """
+
+    def __init__(self, buffer_size: int) -> None:
+        self.buffer_size = buffer_size
+        self._by_shipment: dict[int, set[StatusSubscription]] = {}
+        self._by_warehouse: dict[int, set[StatusSubscription]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, client: Redis, channel: str) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._listen(client, channel))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for subscription in {s for subs in (*self._by_shipment.values(), *self._by_warehouse.values()) for s in subs}:
+            subscription._close()
+        self._by_shipment.clear()
+        self._by_warehouse.clear()
+
+    def subscribe(self, shipment_ids: Iterable[int], warehouse_id: int | None = None) -> StatusSubscription:
+        subscription = StatusSubscription(frozenset(shipment_ids), warehouse_id, self.buffer_size)
+        for shipment_id in subscription.shipment_ids:
+            self._by_shipment.setdefault(shipment_id, set()).add(subscription)
+        if warehouse_id is not None:
+            self._by_warehouse.setdefault(warehouse_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: StatusSubscription) -> None:
+        for shipment_id in subscription.shipment_ids:
+            self._discard(self._by_shipment, shipment_id, subscription)
+        if subscription.warehouse_id is not None:
+            self._discard(self._by_warehouse, subscription.warehouse_id, subscription)
+
+    async def stream(self, subscription: StatusSubscription, heartbeat_seconds: float) -> AsyncIterator[bytes]:
+        """Server-Sent Events body for `subscription`, with a comment line every `heartbeat_seconds` of silence so
+        proxies keep the connection open. Unsubscribes when the client goes away."""
+        try:
+            yield b": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.events.get(), heartbeat_seconds)
+                except TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+
+                if event is None:
+                    if subscription.overflowed:
+                        yield b"event: overflow\ndata: {}\n\n"
+                    return
+                yield event
+        finally:
+            self.unsubscribe(subscription)
+
+    def deliver(self, data: bytes) -> None:
+        """Deliver one published status change, as sent by `service_shipment_status.record`."""
+        try:
+            change = json.loads(data)
+        except ValueError:
+            logger.warning(f"Skipping malformed status change {data!r}")
+            return
+
+        subscriptions = self._by_shipment.get(change.get("shipment_id"), set()) | self._by_warehouse.get(
+            change.get("warehouse_id"), set()
+        )
+        if not subscriptions:
+            return
+
+        event = b"event: status\ndata: " + data + b"\n\n"
+        for subscription in subscriptions:
+            try:
+                subscription.events.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.unsubscribe(subscription)
+                subscription._close()
+
+    @staticmethod
+    def _discard(index: dict[int, set[StatusSubscription]], key: int, subscription: StatusSubscription) -> None:
+        subscriptions = index.get(key)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del index[key]
+
+    async def _listen(self, client: Redis, channel: str) -> None:
+        async def deliver(data: bytes) -> None:
+            self.deliver(data)
+
+        await consume_channel(client, channel, deliver)
+
+
+status_broadcaster = StatusBroadcaster(buffer_size=settings.STATUS_STREAM_CLIENT_BUFFER)
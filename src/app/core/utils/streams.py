@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+StreamEntry = tuple[bytes, dict[bytes, bytes]]
+StreamHandler = Callable[[list[StreamEntry]], Awaitable[None]]
+
+
+async def ensure_consumer_group(client: Redis, stream: str, group: str) -> None:
+    """Create the consumer group (and the stream itself) if it does not exist yet."""
+    try:
+        await client.xgroup_create(stream, group, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def consume_stream(
+    client: Redis,
+    stream: str,
+    group: str,
+    consumer: str,
+    handler: StreamHandler,
+    batch_size: int = 500,
+    block_ms: int = 100,
+    claim_idle_ms: int = 60_000,
+    max_deliveries: int = 5,
+    dead_letter_stream: str | None = None,
+    on_dead_letter: StreamHandler | None = None,
+) -> None:
+    """Read a Redis Stream through a consumer group and hand entries to `handler` in batches.
+
+    Entries are acknowledged only after `handler` returns, so a batch that fails stays pending and is
+    picked up again, either by this consumer on its next claim pass or by another consumer once it has
+    been idle for `claim_idle_ms`. Entries of a failed batch that have been delivered `max_deliveries`
+    times are moved to the dead-letter stream instead, so a batch that can never succeed is not retried
+    forever. Runs until cancelled.
+
+    Parameters
+    ----------
+    client: Redis
+        The Redis client holding the stream.
+    stream: str
+        The stream key.
+    group: str
+        The consumer group name. Created on first use.
+    consumer: str
+        The name of this consumer within the group, unique per process.
+    handler: StreamHandler
+        Coroutine applying a batch of `(entry_id, fields)` pairs.
+    batch_size: int
+        Maximum number of entries read per batch.
+    block_ms: int
+        How long `XREADGROUP` blocks waiting for new entries.
+    claim_idle_ms: int
+        Pending entries idle longer than this are reclaimed from other (possibly dead) consumers.
+    max_deliveries: int
+        Deliveries after which the entries of a failed batch are dead-lettered.
+    dead_letter_stream: str | None
+        The stream dead-lettered entries are appended to, with their original ID as `source_id`.
+        Defaults to `<stream>:dead-letter`.
+    on_dead_letter: StreamHandler | None
+        Coroutine called with the entries about to be dead-lettered, e.g. to record their failure.
+    """
+    await ensure_consumer_group(client, stream, group)
+    dead_letter_stream = dead_letter_stream or f"{stream}:dead-letter"
+
+    loop = asyncio.get_running_loop()
+    next_claim_at = loop.time()
+
+    while True:
+        entries: list[StreamEntry] = []
+
+        if loop.time() >= next_claim_at:
+            next_claim_at = loop.time() + claim_idle_ms / 1000
+            claimed = await client.xautoclaim(stream, group, consumer, min_idle_time=claim_idle_ms, count=batch_size)
+            entries = [entry for entry in claimed[1] if entry[1]]
+
+        if not entries:
+            response = await client.xreadgroup(group, consumer, {stream: ">"}, count=batch_size, block=block_ms)
+            if not response:
+                continue
+            entries = response[0][1]
+
+        try:
+            await handler(entries)
+        except Exception as e:
+            logger.error(f"Failed to process {len(entries)} entries from stream {stream}: {e}", exc_info=True)
+            try:
+                await _dead_letter_exhausted(
+                    client, stream, group, entries, max_deliveries, dead_letter_stream, on_dead_letter
+                )
+            except Exception as e:
+                logger.error(f"Failed to dead-letter entries from stream {stream}: {e}", exc_info=True)
+            await asyncio.sleep(1)
+            continue
+
+        await client.xack(stream, group, *(entry_id for entry_id, _ in entries))
+
+
+async def _dead_letter_exhausted(
+    client: Redis,
+    stream: str,
+    group: str,
+    entries: list[StreamEntry],
+    max_deliveries: int,
+    dead_letter_stream: str,
+    on_dead_letter: StreamHandler | None,
+) -> None:
+    """Move the entries delivered at least `max_deliveries` times to `dead_letter_stream` and acknowledge them."""
+    pipe = client.pipeline(transaction=False)
+    for entry_id, _ in entries:
+        pipe.xpending_range(stream, group, min=entry_id, max=entry_id, count=1)
+    pending = await pipe.execute()
+
+    exhausted = [
+        entry
+        for entry, info in zip(entries, pending, strict=True)
+        if info and info[0]["times_delivered"] >= max_deliveries
+    ]
+    if not exhausted:
+        return
+
+    logger.error(f"Dead-lettering {len(exhausted)} entries from stream {stream} after {max_deliveries} deliveries")
+    if on_dead_letter is not None:
+        await on_dead_letter(exhausted)
+
+    # Moved and acknowledged together, so an entry is never lost nor dead-lettered twice
+    pipe = client.pipeline(transaction=True)
+    for entry_id, fields in exhausted:
+        pipe.xadd(dead_letter_stream, {**fields, b"source_id": entry_id})
+    pipe.xack(stream, group, *(entry_id for entry_id, _ in exhausted))
+    await pipe.execute()
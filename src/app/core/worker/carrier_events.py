@@ -0,0 +1,78 @@
+import logging
+import os
+import socket
+from datetime import UTC, datetime
+
+from redis.asyncio import Redis
+
+from ...core.config import settings
+from ...core.db.database import local_session
+from ...core.utils import cache
+from ...core.utils.streams import StreamEntry, consume_stream
+from ...crud.crud_shipments import crud_shipments
+from ...schemas.shipment import ShipmentStatus, ShipmentStatusChange
+from ...services.service_shipment_events import service_shipment_events
+from ...services.service_shipment_status import service_shipment_status
+
+
+def _latest_event_per_tracking_number(entries: list[StreamEntry]) -> dict[str, tuple[datetime, ShipmentStatus]]:
+    """Collapse a batch of carrier events to the most recent (occurred at, status) for each tracking number."""
+    latest: dict[str, tuple[datetime, ShipmentStatus]] = {}
+    for _, fields in entries:
+        try:
+            tracking_number = fields[b"tracking_number"].decode()
+            status = ShipmentStatus(fields[b"status"].decode())
+            occurred_at = datetime.fromisoformat(fields[b"occurred_at"].decode())
+        except (KeyError, ValueError) as e:
+            logging.warning(f"Skipping malformed carrier event {fields!r}: {e}")
+            continue
+
+        if occurred_at.tzinfo is None:
+            occurred_at = occurred_at.replace(tzinfo=UTC)
+
+        current = latest.get(tracking_number)
+        if current is None or occurred_at >= current[0]:
+            latest[tracking_number] = (occurred_at, status)
+
+    return latest
+
+
+async def apply_carrier_events(entries: list[StreamEntry]) -> None:
+    """Apply a batch of carrier events. Events older than the last one applied to a shipment, whether from an earlier
+    batch or redelivered, are dropped by the update."""
+    events = _latest_event_per_tracking_number(entries)
+    if not events:
+        return
+
+    async with local_session() as db:
+        changed = await crud_shipments.update_status_by_tracking_number(db=db, events=events)
+        await db.commit()
+
+    logging.info(f"Applied {len(entries)} carrier events, {len(changed)} shipments changed status")
+
+    changes = [
+        ShipmentStatusChange(
+            shipment_id=row.id,
+            warehouse_id=row.warehouse_id,
+            new_status=row.status,
+            changed_at=row.updated_at,
+        )
+        for row in changed
+    ]
+    await service_shipment_status.record(changes)
+    await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [row.id for row in changed])
+    await service_shipment_events.publish_status_changes(changes)
+
+
+async def consume_carrier_events(redis: Redis) -> None:
+    await consume_stream(
+        client=redis,
+        stream=settings.CARRIER_EVENTS_STREAM,
+        group=settings.CARRIER_EVENTS_CONSUMER_GROUP,
+        consumer=f"{socket.gethostname()}:{os.getpid()}",
+        handler=apply_carrier_events,
+        batch_size=settings.CARRIER_EVENTS_BATCH_SIZE,
+        block_ms=settings.CARRIER_EVENTS_BLOCK_MS,
+        claim_idle_ms=settings.CARRIER_EVENTS_CLAIM_IDLE_MS,
+        max_deliveries=settings.CARRIER_EVENTS_MAX_DELIVERIES,
+    )
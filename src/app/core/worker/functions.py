@@ -1,31 +1,85 @@
 import asyncio
 import logging
-from datetime import UTC, datetime
 from typing import Any
 
+import redis.asyncio as redis
 import structlog
 import uvloop
-from arq.worker import Worker
 
+from ...core.config import settings
 from ...core.db.database import local_session
-from ...core.utils import queue
+from ...core.utils import cache, queue
+from ...core.utils.queue import tracking_job_id
 from ...crud.crud_shipments import crud_shipments
 from ...schemas.shipment import (
+    TERMINAL_SHIPMENT_STATUSES,
     Shipment,
     ShipmentStatus,
-    ShipmentUpdateInternal,
+    ShipmentStatusChange,
     TrackingUpdateStatus,
     TrackingUpdateStatusType,
 )
+from ...services.service_shipment_events import service_shipment_events
+from ...services.service_shipment_status import service_shipment_status
+from .carrier_events import consume_carrier_events
+from .metrics import count_outcomes, job_outcomes
+from .shipment_ingest import consume_shipment_ingest
+from .status_writes import status_write_buffer
+from .webhook_dispatcher import run_webhook_dispatcher
 
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
-async def startup(ctx: Worker) -> None:
+def _open_cache() -> None:
+    # Status writes keep the API's status hash in the cache Redis current and drop stale cached shipments
+    if cache.client is None:
+        cache.pool = redis.ConnectionPool.from_url(settings.REDIS_CACHE_URL)
+        cache.client = redis.Redis.from_pool(cache.pool)  # type: ignore
+
+
+async def startup(ctx: dict[str, Any]) -> None:
+    # Jobs enqueue their own follow-ups through the shared pool, so point it at the worker's queue:
+    # ARQ's Redis connection, or the Postgres job queue
+    queue.pool = ctx.get("queue", ctx.get("redis"))
+    _open_cache()
+    # The stream consumers and outcome metrics need Redis, so they only run with the ARQ backend
+    ctx["background_tasks"] = (
+        [
+            asyncio.create_task(consume_carrier_events(ctx["redis"])),
+            asyncio.create_task(consume_shipment_ingest(ctx["redis"])),
+            asyncio.create_task(run_webhook_dispatcher(ctx["redis"])),
+            asyncio.create_task(job_outcomes.run(ctx["redis"], settings.WORKER_METRICS_FLUSH_SECONDS)),
+        ]
+        if "redis" in ctx
+        else []
+    )
     logging.info("Worker Started")
 
 
-async def shutdown(ctx: Worker) -> None:
+async def interactive_startup(ctx: dict[str, Any]) -> None:
+    # The interactive lane only runs jobs; stream consumers are left to the background lane
+    queue.pool = ctx.get("queue", ctx.get("redis"))
+    _open_cache()
+    ctx["background_tasks"] = (
+        [asyncio.create_task(job_outcomes.run(ctx["redis"], settings.WORKER_METRICS_FLUSH_SECONDS))]
+        if "redis" in ctx
+        else []
+    )
+    logging.info("Interactive Worker Started")
+
+
+async def shutdown(ctx: dict[str, Any]) -> None:
+    background_tasks: list[asyncio.Task] = ctx.get("background_tasks", [])
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
+    await status_write_buffer.flush()
+    if "redis" in ctx:
+        await job_outcomes.flush(ctx["redis"])
+    if cache.client is not None:
+        await cache.client.aclose()  # type: ignore
+        cache.client = None
     logging.info("Worker end")
 
 
@@ -43,6 +97,10 @@ def _get_mock_tracking_status(current_status: ShipmentStatus | None, tracking_nu
     if not tracking_number:
         return ShipmentStatus.PENDING
 
+    return _next_mock_status(current_status)
+
+
+def _next_mock_status(current_status: ShipmentStatus | None) -> ShipmentStatus:
     if current_status is None:
         return ShipmentStatus.PENDING
 
@@ -59,86 +117,141 @@ def _get_mock_tracking_status(current_status: ShipmentStatus | None, tracking_nu
     return status_progression.get(current_status, ShipmentStatus.PENDING)
 
 
+async def _schedule_next_update(shipment_id: int, status: ShipmentStatus) -> None:
+    if queue.pool is None:
+        return
+
+    job_id = await queue.pool.enqueue_job(
+        "update_shipment_tracking_status",
+        shipment_id,
+        status,
+        _defer_by=300,  # 5 minutes
+        _queue_name=settings.REDIS_QUEUE_BACKGROUND_NAME,
+        _job_id=tracking_job_id(shipment_id, status),
+    )
+    if job_id is not None:
+        logging.info(f"Scheduled next tracking update for shipment {shipment_id} in 5 minutes")
+
+
+async def _apply_transition(
+    shipment_id: int,
+    old_status: ShipmentStatus | None,
+    new_status: ShipmentStatus,
+) -> TrackingUpdateStatus | None:
+    """Move a shipment from `old_status` to `new_status`; returns `None` if it no longer had `old_status`."""
+    # Coalesced with the writes of concurrent jobs; returns once the batch is committed
+    updated = await status_write_buffer.submit(shipment_id, old_status, new_status)
+    if updated is None:
+        return None
+
+    logging.info(f"Updated shipment {shipment_id} status from {old_status} to {new_status}")
+
+    change = ShipmentStatusChange(
+        shipment_id=shipment_id,
+        warehouse_id=updated.warehouse_id,
+        old_status=old_status,
+        new_status=new_status,
+        changed_at=updated.updated_at,
+    )
+    await service_shipment_status.record([change])
+    await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [shipment_id])
+    if new_status != old_status:
+        await service_shipment_events.publish_status_changes([change])
+
+    if new_status not in TERMINAL_SHIPMENT_STATUSES:
+        await _schedule_next_update(shipment_id, new_status)
+
+    return TrackingUpdateStatus(
+        status=TrackingUpdateStatusType.UPDATED,
+        shipment_id=shipment_id,
+        old_status=old_status.value if old_status else None,
+        new_status=new_status.value,
+    )
+
+
+@count_outcomes
 async def update_shipment_tracking_status(
     ctx: dict[str, Any],
     shipment_id: int,
+    expected_status: ShipmentStatus | None = None,
 ) -> TrackingUpdateStatus:
+    """Advance a shipment's tracking status.
+
+    `expected_status` is the status the enqueuer last saw. When given, the transition is applied straight away as a
+    compare-and-set, without reading the shipment; the shipment is only read if that write does not match, e.g.
+    because its status was changed through the API in the meantime. The job then only makes sure the update for the
+    current status is scheduled, which the writer of that status normally did already, so the shipment keeps a
+    single polling chain.
+    """
     logging.info(f"Updating tracking status for shipment {shipment_id}")
 
-    async with local_session() as db:
-        try:
+    try:
+        if expected_status is not None:
+            expected_status = ShipmentStatus(expected_status)
+
+        if expected_status is not None and expected_status not in TERMINAL_SHIPMENT_STATUSES:
+            result = await _apply_transition(shipment_id, expected_status, _next_mock_status(expected_status))
+            if result is not None:
+                return result
+
+        async with local_session() as db:
             shipment: Shipment | None = await crud_shipments.get(
                 db=db,
                 id=shipment_id,
                 schema_to_select=Shipment,
             )
 
-            if shipment is None:
-                logging.warning(f"Shipment {shipment_id} not found")
-                return TrackingUpdateStatus(
-                    status=TrackingUpdateStatusType.NOT_FOUND,
-                    shipment_id=shipment_id,
-                )
-
-            current_status = shipment.status
-            tracking_number = shipment.tracking_number
-
-            if not tracking_number:
-                logging.info(f"Shipment {shipment_id} has no tracking number, skipping update")
-                return TrackingUpdateStatus(
-                    status=TrackingUpdateStatusType.NO_TRACKING,
-                    shipment_id=shipment_id,
-                )
-
-            terminal_states = {
-                ShipmentStatus.DELIVERED,
-                ShipmentStatus.CANCELLED,
-                ShipmentStatus.FAILED,
-            }
-
-            if current_status in terminal_states:
-                logging.info(f"Shipment {shipment_id} is in terminal state {current_status}, no update needed")
-                return TrackingUpdateStatus(
-                    status=TrackingUpdateStatusType.TERMINAL,
-                    shipment_id=shipment_id,
-                    current_status=current_status.value,
-                )
-
-            new_status = _get_mock_tracking_status(current_status, tracking_number)
-
-            shipment_update = ShipmentUpdateInternal(
-                status=new_status,
-                updated_at=datetime.now(UTC),
+        if shipment is None:
+            logging.warning(f"Shipment {shipment_id} not found")
+            return TrackingUpdateStatus(
+                status=TrackingUpdateStatusType.NOT_FOUND,
+                shipment_id=shipment_id,
             )
 
-            await crud_shipments.update(
-                db=db,
-                id=shipment_id,
-                object=shipment_update,
-                commit=True,
-            )
+        current_status = shipment.status
+        tracking_number = shipment.tracking_number
 
-            logging.info(f"Updated shipment {shipment_id} status from {current_status} to {new_status}")
+        if not tracking_number:
+            logging.info(f"Shipment {shipment_id} has no tracking number, skipping update")
+            return TrackingUpdateStatus(
+                status=TrackingUpdateStatusType.NO_TRACKING,
+                shipment_id=shipment_id,
+            )
 
-            if new_status not in terminal_states and queue.pool is not None:
-                await queue.pool.enqueue_job(
-                    "update_shipment_tracking_status",
-                    shipment_id,
-                    _defer_by=300,  # 5 minutes
-                )
-                logging.info(f"Scheduled next tracking update for shipment {shipment_id} in 5 minutes")
+        if current_status in TERMINAL_SHIPMENT_STATUSES:
+            logging.info(f"Shipment {shipment_id} is in terminal state {current_status}, no update needed")
+            return TrackingUpdateStatus(
+                status=TrackingUpdateStatusType.TERMINAL,
+                shipment_id=shipment_id,
+                current_status=current_status.value,
+            )
 
+        if expected_status is not None and current_status is not None:
+            logging.info(
+                f"Shipment {shipment_id} is no longer {expected_status}, leaving it to its {current_status} update"
+            )
+            await _schedule_next_update(shipment_id, current_status)
             return TrackingUpdateStatus(
-                status=TrackingUpdateStatusType.UPDATED,
+                status=TrackingUpdateStatusType.CONFLICT,
                 shipment_id=shipment_id,
-                old_status=current_status.value if current_status else None,
-                new_status=new_status.value,
             )
 
-        except Exception as e:
-            logging.error(f"Error updating tracking status for shipment {shipment_id}: {e}", exc_info=True)
+        new_status = _get_mock_tracking_status(current_status, tracking_number)
+        result = await _apply_transition(shipment_id, current_status, new_status)
+
+        if result is None:
+            logging.info(f"Shipment {shipment_id} changed while updating its status, leaving it to the newer change")
             return TrackingUpdateStatus(
-                status=TrackingUpdateStatusType.ERROR,
+                status=TrackingUpdateStatusType.CONFLICT,
                 shipment_id=shipment_id,
-                error=str(e),
             )
+
+        return result
+
+    except Exception as e:
+        logging.error(f"Error updating tracking status for shipment {shipment_id}: {e}", exc_info=True)
+        return TrackingUpdateStatus(
+            status=TrackingUpdateStatusType.ERROR,
+            shipment_id=shipment_id,
+            error=str(e),
+        )
@@ -0,0 +1,64 @@
+import asyncio
+import functools
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from typing import ParamSpec
+
+from redis.asyncio import Redis
+
+from ...core.config import settings
+from ...schemas.shipment import TrackingUpdateStatus
+
+P = ParamSpec("P")
+
+
+class JobOutcomeCounter:
+    """Per-process tally of job outcomes, added to one Redis hash per function (`<prefix><function>`).
+
+    Counting in memory and flushing every few seconds keeps this to one pipelined round trip per interval instead of
+    a Redis write per job.
+    """
+
+    def __init__(self, key_prefix: str) -> None:
+        self.key_prefix = key_prefix
+        self._counts: Counter[tuple[str, str]] = Counter()
+
+    def record(self, function: str, outcome: str) -> None:
+        self._counts[(function, outcome)] += 1
+
+    async def flush(self, redis: Redis) -> None:
+        counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for (function, outcome), count in counts.items():
+                pipe.hincrby(f"{self.key_prefix}{function}", outcome, count)
+            await pipe.execute()
+        except Exception as e:
+            logging.warning(f"Failed to flush job outcome counts, keeping them for the next flush: {e}")
+            self._counts.update(counts)
+
+    async def run(self, redis: Redis, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.flush(redis)
+
+
+job_outcomes = JobOutcomeCounter(key_prefix=settings.WORKER_METRICS_KEY_PREFIX)
+
+
+def count_outcomes(
+    function: Callable[P, Awaitable[TrackingUpdateStatus]],
+) -> Callable[P, Awaitable[TrackingUpdateStatus]]:
+    """Count each result of a tracking job by its `status` in `job_outcomes`."""
+
+    @functools.wraps(function)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> TrackingUpdateStatus:
+        result = await function(*args, **kwargs)
+        job_outcomes.record(function.__name__, result.status.value)
+        return result
+
+    return wrapper
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import signal
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import timedelta
+from typing import Any
+
+from arq.worker import Function
+from sqlalchemy import Row, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from ...core.config import settings
+from ...core.db.database import async_engine, local_session
+from ...core.utils.pg_queue import PostgresJobQueue
+from ...models.job import Job
+
+JobHook = Callable[[dict[str, Any]], Awaitable[None]]
+
+
+class PostgresWorker:
+    """Run jobs from the `job` table for one queue.
+
+    Due jobs are claimed in batches with `FOR UPDATE SKIP LOCKED`, so any number of workers can share a queue
+    without handing out the same job twice. A claimed job is leased for `PG_QUEUE_LEASE_SECONDS`; if its worker dies,
+    the job becomes claimable again once the lease runs out. Finished jobs are deleted in the same transaction as the
+    next claim.
+
+    An idle worker does not poll: it `LISTEN`s on `PG_QUEUE_NOTIFY_CHANNEL` and otherwise sleeps until the next
+    deferred job on its queue is due (at most `PG_QUEUE_MAX_IDLE_SECONDS`).
+
+    Parameters
+    ----------
+    functions: Sequence[Any]
+        Job functions (coroutines or ARQ `Function`s), looked up by name.
+    queue_name: str
+        Queue this worker takes jobs from.
+    max_jobs: int
+        Maximum number of jobs running at once.
+    on_startup, on_shutdown, on_job_start, on_job_end: JobHook | None
+        Hooks with the same meaning as ARQ's; `ctx["queue"]` is the `PostgresJobQueue` to enqueue follow-ups on.
+    job_completion_wait: int
+        Seconds running jobs get to finish after `stop()` before they are cancelled.
+    burst: bool
+        Exit once the queue has no due jobs left.
+    """
+
+    def __init__(
+        self,
+        functions: Sequence[Any],
+        queue_name: str,
+        max_jobs: int = 10,
+        on_startup: JobHook | None = None,
+        on_shutdown: JobHook | None = None,
+        on_job_start: JobHook | None = None,
+        on_job_end: JobHook | None = None,
+        job_completion_wait: int = 0,
+        burst: bool = False,
+    ) -> None:
+        # Plain coroutines or ARQ `func(...)` wrappers, whose per-function options do not apply here
+        self.functions = dict(
+            (function.name, function.coroutine) if isinstance(function, Function) else (function.__name__, function)
+            for function in functions
+        )
+        self.queue_name = queue_name
+        self.max_jobs = max_jobs
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+        self.on_job_start = on_job_start
+        self.on_job_end = on_job_end
+        self.job_completion_wait = job_completion_wait
+        self.burst = burst
+
+        self.ctx: dict[str, Any] = {"queue": PostgresJobQueue(default_queue_name=queue_name)}
+        self.jobs_complete = 0
+        self.jobs_failed = 0
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._finished: list[int] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+
+    @classmethod
+    def from_settings(cls, worker_settings: type, **kwargs: Any) -> "PostgresWorker":
+        """Build a worker from an ARQ-style settings class such as `WorkerSettings`."""
+        options = {
+            name: getattr(worker_settings, name)
+            for name in (
+                "functions",
+                "queue_name",
+                "max_jobs",
+                "on_startup",
+                "on_shutdown",
+                "on_job_start",
+                "on_job_end",
+                "job_completion_wait",
+            )
+            if hasattr(worker_settings, name)
+        }
+        return cls(**{**options, **kwargs})
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def run(self) -> None:
+        if self.on_startup is not None:
+            await self.on_startup(self.ctx)
+
+        connection = await self._listen()
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.clear()
+                free = self.max_jobs - len(self._tasks)
+                timeout: float | None
+                try:
+                    if free > 0:
+                        limit = min(free, settings.PG_QUEUE_CLAIM_BATCH_SIZE)
+                        claimed = await self._claim(limit)
+                        for job in claimed:
+                            task = asyncio.create_task(self._run_job(job))
+                            self._tasks.add(task)
+                            task.add_done_callback(self._job_done)
+                        if len(claimed) == limit:
+                            continue
+                        if self.burst and not claimed and not self._tasks:
+                            break
+
+                    timeout = await self._next_due_in() if free > 0 else None
+                except Exception as e:
+                    # Running jobs carry on; claiming is retried once the database is back
+                    logging.error(f"Failed to claim jobs from queue {self.queue_name}, retrying: {e}", exc_info=True)
+                    timeout = 1
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except TimeoutError:
+                    pass
+        finally:
+            await self._drain()
+            driver = await self._driver_connection(connection)
+            await driver.remove_listener(settings.PG_QUEUE_NOTIFY_CHANNEL, self._notified)
+            await connection.close()
+            if self.on_shutdown is not None:
+                await self.on_shutdown(self.ctx)
+
+    async def _listen(self) -> AsyncConnection:
+        """Subscribe to enqueue notifications on a connection held for the worker's lifetime."""
+        connection = await async_engine.connect()
+        driver = await self._driver_connection(connection)
+        await driver.add_listener(settings.PG_QUEUE_NOTIFY_CHANNEL, self._notified)
+        return connection
+
+    @staticmethod
+    async def _driver_connection(connection: AsyncConnection) -> Any:
+        """The asyncpg connection under `connection`, which listeners are added to."""
+        raw = await connection.get_raw_connection()
+        if raw.driver_connection is None:
+            raise RuntimeError("Database connection is closed")
+        return raw.driver_connection
+
+    def _notified(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+        if payload == self.queue_name:
+            self._wakeup.set()
+
+    async def _claim(self, limit: int) -> Sequence[Row[Any]]:
+        now = func.now()
+        due = (
+            select(Job.id)
+            .where(
+                Job.queue_name == self.queue_name,
+                Job.scheduled_at <= now,
+                or_(Job.locked_until.is_(None), Job.locked_until < now),
+            )
+            .order_by(Job.scheduled_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id.in_(due.scalar_subquery()))
+            .values(
+                locked_until=now + timedelta(seconds=settings.PG_QUEUE_LEASE_SECONDS),
+                attempts=Job.attempts + 1,
+            )
+            .returning(Job.id, Job.job_id, Job.function, Job.args, Job.kwargs, Job.attempts, Job.created_at)
+            .execution_options(synchronize_session=False)
+        )
+
+        finished, self._finished = self._finished, []
+        try:
+            async with local_session() as db:
+                if finished:
+                    await db.execute(delete(Job).where(Job.id.in_(finished)))
+                claimed = (await db.execute(stmt)).all()
+                await db.commit()
+        except BaseException:
+            # Not deleted, so they are deleted with the next claim instead of running again once their lease expires
+            self._finished.extend(finished)
+            raise
+
+        return claimed
+
+    async def _next_due_in(self) -> float:
+        """Seconds until the next deferred job or expired lease on this queue, capped at `PG_QUEUE_MAX_IDLE_SECONDS`."""
+        next_due = func.greatest(Job.scheduled_at, func.coalesce(Job.locked_until, Job.scheduled_at))
+        async with local_session() as db:
+            seconds = (
+                await db.execute(
+                    select(func.extract("epoch", func.min(next_due) - func.now())).where(
+                        Job.queue_name == self.queue_name
+                    )
+                )
+            ).scalar_one_or_none()
+
+        if seconds is None:
+            return settings.PG_QUEUE_MAX_IDLE_SECONDS
+        # Never return 0: a due job that could not be claimed is locked by another worker's claim in progress
+        return min(max(float(seconds), 0.01), settings.PG_QUEUE_MAX_IDLE_SECONDS)
+
+    async def _run_job(self, job: Row[Any]) -> None:
+        ctx = {**self.ctx, "job_id": job.job_id, "job_try": job.attempts, "enqueue_time": job.created_at}
+
+        function = self.functions.get(job.function)
+        if function is None:
+            logging.error(f"Job {job.job_id} has unknown function {job.function!r}, dropping it")
+            self._finished.append(job.id)
+            return
+
+        if self.on_job_start is not None:
+            await self.on_job_start(ctx)
+        try:
+            await asyncio.wait_for(function(ctx, *job.args, **job.kwargs), settings.PG_QUEUE_JOB_TIMEOUT_SECONDS)
+        except Exception as e:
+            self.jobs_failed += 1
+            await self._retry_or_drop(job, e)
+        else:
+            self.jobs_complete += 1
+            self._finished.append(job.id)
+        finally:
+            if self.on_job_end is not None:
+                await self.on_job_end(ctx)
+
+    async def _retry_or_drop(self, job: Row[Any], error: Exception) -> None:
+        async with local_session() as db:
+            if job.attempts < settings.PG_QUEUE_MAX_TRIES:
+                logging.warning(f"Job {job.job_id} failed on try {job.attempts}, retrying: {error!r}")
+                delay = timedelta(seconds=settings.PG_QUEUE_RETRY_DELAY_SECONDS * job.attempts)
+                await db.execute(
+                    update(Job).where(Job.id == job.id).values(locked_until=None, scheduled_at=func.now() + delay)
+                )
+            else:
+                logging.error(f"Job {job.job_id} failed after {job.attempts} tries, dropping it: {error!r}")
+                await db.execute(delete(Job).where(Job.id == job.id))
+            await db.commit()
+
+    def _job_done(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        self._wakeup.set()
+
+    async def _drain(self) -> None:
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=self.job_completion_wait)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._finished:
+            async with local_session() as db:
+                await db.execute(delete(Job).where(Job.id.in_(self._finished)))
+                await db.commit()
+            self._finished = []
+
+
+async def run_postgres_lanes(lanes: Sequence[type], handle_signals: bool = False, burst: bool = False) -> None:
+    """Postgres-backend counterpart of `run_lanes`: one `PostgresWorker` per lane in this event loop."""
+    workers = [PostgresWorker.from_settings(lane, burst=burst) for lane in lanes]
+
+    def stop_lanes() -> None:
+        for worker in workers:
+            worker.stop()
+
+    if handle_signals:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop_lanes)
+
+    await asyncio.gather(*(worker.run() for worker in workers))
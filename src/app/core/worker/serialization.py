@@ -0,0 +1,36 @@
+import pickle
+from datetime import date, datetime
+from typing import Any, cast
+
+import msgpack
+from pydantic import BaseModel
+
+# Protocol 2+ pickles start with PROTO (0x80); a msgpack job or result is never an empty map, which is the only
+# msgpack value starting with that byte
+_PICKLE_PROTO = b"\x80"
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, BaseException):
+        return repr(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__} for the job queue")
+
+
+def serialize_job(data: dict[str, Any]) -> bytes:
+    """ARQ `job_serializer`: msgpack instead of pickle for job payloads and results.
+
+    Results are stored as plain data, e.g. `TrackingUpdateStatus` becomes its JSON-mode dict and exceptions their
+    `repr`.
+    """
+    return cast(bytes, msgpack.packb(data, default=_default, use_bin_type=True))
+
+
+def deserialize_job(data: bytes) -> dict[str, Any]:
+    """ARQ `job_deserializer`; still reads pickled jobs enqueued before the switch to msgpack."""
+    if data[:1] == _PICKLE_PROTO:
+        return cast(dict[str, Any], pickle.loads(data))
+    return cast(dict[str, Any], msgpack.unpackb(data, raw=False, strict_map_key=False))
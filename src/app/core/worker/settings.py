@@ -1,42 +1,157 @@
 import asyncio
-from typing import cast
+import signal
+import sys
+from collections.abc import Awaitable, Callable
+from typing import Any, cast
 
 from arq.cli import watch_reload
 from arq.connections import RedisSettings
-from arq.typing import WorkerSettingsType
-from arq.worker import check_health, run_worker
+from arq.typing import WorkerCoroutine, WorkerSettingsType
+from arq.worker import Function, check_health, create_worker, func
 
 from ...core.config import settings
-from ...core.logger import logging  # noqa: F401
-from .functions import on_job_end, on_job_start, shutdown, startup, update_shipment_tracking_status
+from ...core.logger import logging
+from .functions import (
+    interactive_startup,
+    on_job_end,
+    on_job_start,
+    shutdown,
+    startup,
+    update_shipment_tracking_status,
+)
+from .serialization import deserialize_job, serialize_job
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
 REDIS_QUEUE_PORT = settings.REDIS_QUEUE_PORT
 
 
+def _with_result_retention(*functions: Callable[..., Awaitable[Any]]) -> list[Function]:
+    keep_result = settings.WORKER_KEEP_RESULT_SECONDS_BY_FUNCTION
+    return [
+        func(cast("WorkerCoroutine", function), keep_result=keep_result.get(function.__name__))
+        for function in functions
+    ]
+
+
+FUNCTIONS = _with_result_retention(update_shipment_tracking_status)
+
+
 class WorkerSettings:
-    functions = [update_shipment_tracking_status]
+    """Background lane: scheduled tracking polls and the stream consumers."""
+
+    functions = FUNCTIONS
+    queue_name = settings.REDIS_QUEUE_BACKGROUND_NAME
+    max_jobs = settings.WORKER_BACKGROUND_MAX_JOBS
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
     on_job_start = on_job_start
     on_job_end = on_job_end
     handle_signals = False
+    job_completion_wait = settings.WORKER_JOB_COMPLETION_WAIT_SECONDS
+    keep_result = settings.WORKER_KEEP_RESULT_SECONDS
+    job_serializer = serialize_job
+    job_deserializer = deserialize_job
+
+
+class InteractiveWorkerSettings:
+    """Interactive lane: user-triggered tracking refreshes, never queued behind background polls.
+
+    ARQ reads settings from the class `__dict__`, so every option is repeated here instead of inherited.
+    """
+
+    functions = FUNCTIONS
+    queue_name = settings.REDIS_QUEUE_INTERACTIVE_NAME
+    max_jobs = settings.WORKER_INTERACTIVE_MAX_JOBS
+    redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
+    on_startup = interactive_startup
+    on_shutdown = shutdown
+    on_job_start = on_job_start
+    on_job_end = on_job_end
+    handle_signals = False
+    job_completion_wait = settings.WORKER_JOB_COMPLETION_WAIT_SECONDS
+    keep_result = settings.WORKER_KEEP_RESULT_SECONDS
+    job_serializer = serialize_job
+    job_deserializer = deserialize_job
 
 
-def start_arq_service(check: bool = False, burst: int | None = None, watch: str | None = None):
-    worker_settings_ = cast("WorkerSettingsType", WorkerSettings)
+WORKER_LANES = {
+    "background": WorkerSettings,
+    "interactive": InteractiveWorkerSettings,
+}
+
+
+async def run_lanes(lanes: list[WorkerSettingsType], handle_signals: bool = False, **kwargs: object) -> None:
+    """Run several lanes in one event loop; their `max_jobs` values weight how the process capacity is shared.
+
+    With `handle_signals`, SIGINT/SIGTERM stop every lane from picking new jobs and give running jobs up to
+    `job_completion_wait` seconds to finish before they are cancelled. If a lane fails, the others are stopped and
+    its exception is raised, so the process exits with an error instead of running on with a lane missing.
+    """
+    workers = [create_worker(lane, **kwargs) for lane in lanes]
+
+    def stop_lanes(signum: signal.Signals) -> None:
+        for worker in workers:
+            worker.handle_sig_wait_for_completion(signum)
+
+    if handle_signals:
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop_lanes, signum)
+
+    runs = {asyncio.create_task(worker.async_run()): worker for worker in workers}
+    try:
+        # Lanes stopped by a signal end cancelled, which is not a failure
+        done, pending = await asyncio.wait(runs, return_when=asyncio.FIRST_EXCEPTION)
+        failed = [run for run in done if not run.cancelled() and run.exception() is not None]
+        if failed:
+            for run in pending:
+                run.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for run in failed[1:]:
+                logging.error(f"Worker lane {runs[run].queue_name} failed", exc_info=run.exception())
+            failed[0].result()
+    finally:
+        await asyncio.gather(*(worker.close() for worker in workers))
+
+
+def start_arq_service(
+    check: bool = False,
+    burst: int | None = None,
+    watch: str | None = None,
+    lane: str | None = None,
+    processes: int | None = None,
+    handle_signals: bool = False,
+):
+    if processes is not None:
+        from .supervisor import WorkerSupervisor
+
+        WorkerSupervisor(lane=lane, processes=processes).run()
+        return
+
+    selected = list(WORKER_LANES.values()) if lane is None else [WORKER_LANES[lane]]
+    lanes = [cast("WorkerSettingsType", lane_settings) for lane_settings in selected]
+
+    if settings.QUEUE_BACKEND == "postgres":
+        from .postgres_worker import run_postgres_lanes
+
+        asyncio.run(run_postgres_lanes(selected, handle_signals=handle_signals, burst=bool(burst)))
+        return
 
     if check:
-        exit(check_health(worker_settings_))
+        exit(max(check_health(lane_settings) for lane_settings in lanes))
     else:
         kwargs = {} if burst is None else {"burst": burst}
         if watch:
-            asyncio.run(watch_reload(watch, worker_settings_))
+
+            async def watch_lanes() -> None:
+                await asyncio.gather(*(watch_reload(watch, lane_settings) for lane_settings in lanes))
+
+            asyncio.run(watch_lanes())
         else:
-            run_worker(worker_settings_, **kwargs)
+            asyncio.run(run_lanes(lanes, handle_signals=handle_signals, **kwargs))
 
 
 if __name__ == "__main__":
-    start_arq_service()
-    # python -m src.app.core.worker.settings
+    start_arq_service(lane=sys.argv[1] if len(sys.argv) > 1 else None)
+    # python -m src.app.core.worker.settings [background|interactive]
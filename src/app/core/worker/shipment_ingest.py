@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import os
+import socket
+from collections.abc import Sequence
+from typing import Any
+
+from pydantic import ValidationError
+from redis.asyncio import Redis
+from sqlalchemy import Row, select
+
+from ...core.config import settings
+from ...core.db.database import local_session
+from ...core.utils import cache, queue
+from ...core.utils.queue import tracking_job_id
+from ...core.utils.streams import StreamEntry, consume_stream
+from ...crud.crud_shipments import crud_shipments
+from ...models.shipment import Shipment
+from ...schemas.shipment import ShipmentCreate, ShipmentIngestState, ShipmentStatusChange
+from ...services.service_shipment_ingest import ingest_result_key
+from ...services.service_shipment_status import service_shipment_status
+from ...services.service_warehouse_registry import warehouse_registry
+
+
+async def apply_shipment_ingest(redis: Redis, entries: list[StreamEntry]) -> None:
+    """Insert a batch of queued shipments in one transaction and record each pending id's outcome.
+
+    Shipments are stored with their pending id, which is unique, so a batch that is redelivered after its transaction
+    committed does not insert its shipments twice: the ones already stored are reported as created again. Shipments
+    whose external reference is taken are skipped by the insert too, and fail.
+    """
+    shipments: dict[str, ShipmentCreate] = {}
+    failed: dict[str, str] = {}
+    for _, fields in entries:
+        try:
+            pending_id = fields[b"pending_id"].decode()
+        except KeyError:
+            logging.warning(f"Skipping shipment ingest entry without pending id: {fields!r}")
+            continue
+        try:
+            shipments[pending_id] = ShipmentCreate.model_validate_json(fields[b"shipment"])
+        except (KeyError, ValidationError) as e:
+            failed[pending_id] = f"Invalid shipment: {e}"
+
+    # Pending id -> shipment id, of the shipments inserted now and of the ones stored by an earlier delivery
+    created: dict[str, int] = {}
+    inserted: Sequence[Row[Any]] = []
+    if shipments:
+        async with local_session() as db:
+            warehouse_ids = {shipment.warehouse_id for shipment in shipments.values()}
+            known = {
+                warehouse_id
+                for warehouse_id in warehouse_ids
+                if await warehouse_registry.exists(db=db, warehouse_id=warehouse_id)
+            }
+            for pending_id, shipment in list(shipments.items()):
+                if shipment.warehouse_id not in known:
+                    failed[pending_id] = "Warehouse not found"
+                    del shipments[pending_id]
+
+            inserted = await crud_shipments.create_many(db=db, shipments=shipments)
+            created = {row.pending_id: row.id for row in inserted}
+            if skipped := set(shipments) - set(created):
+                rows = await db.execute(
+                    select(Shipment.pending_id, Shipment.id).where(Shipment.pending_id.in_(skipped))
+                )
+                created.update({row.pending_id: row.id for row in rows})
+            await db.commit()
+
+        # Neither inserted nor stored before: another shipment, possibly earlier in this batch, has the reference.
+        # Resends should use the upsert endpoint.
+        for pending_id in shipments.keys() - created.keys():
+            failed[pending_id] = "Shipment with this external reference already exists"
+
+    logging.info(f"Ingested {len(entries)} queued shipments: {len(created)} created, {len(failed)} failed")
+
+    pipe = redis.pipeline(transaction=False)
+    for pending_id, shipment_id in created.items():
+        key = ingest_result_key(pending_id)
+        pipe.hset(key, mapping={"state": ShipmentIngestState.CREATED.value, "shipment_id": shipment_id})
+        pipe.expire(key, settings.SHIPMENT_INGEST_RESULT_TTL_SECONDS)
+    for pending_id, error in failed.items():
+        key = ingest_result_key(pending_id)
+        pipe.hset(key, mapping={"state": ShipmentIngestState.FAILED.value, "error": error})
+        pipe.expire(key, settings.SHIPMENT_INGEST_RESULT_TTL_SECONDS)
+    await pipe.execute()
+
+    # Drop not-found entries cached while the new IDs did not exist yet
+    await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [row.id for row in inserted])
+    await service_shipment_status.record(
+        [
+            ShipmentStatusChange(
+                shipment_id=row.id,
+                warehouse_id=row.warehouse_id,
+                new_status=row.status,
+                changed_at=row.created_at,
+            )
+            for row in inserted
+        ]
+    )
+
+    if queue.pool is not None:
+        await asyncio.gather(
+            *(
+                queue.pool.enqueue_job(
+                    "update_shipment_tracking_status",
+                    row.id,
+                    row.status,
+                    _defer_by=60,  # 1 minute
+                    _job_id=tracking_job_id(row.id, row.status),
+                )
+                for row in inserted
+                if row.tracking_number
+            )
+        )
+
+
+async def fail_shipment_ingest(redis: Redis, entries: list[StreamEntry]) -> None:
+    """Mark the pending ids of entries that are given up on as `failed`, so they do not stay `queued`."""
+    pipe = redis.pipeline(transaction=False)
+    for _, fields in entries:
+        pending_id = fields.get(b"pending_id")
+        if pending_id is None:
+            continue
+        key = ingest_result_key(pending_id.decode())
+        pipe.hset(key, mapping={"state": ShipmentIngestState.FAILED.value, "error": "Shipment could not be processed"})
+        pipe.expire(key, settings.SHIPMENT_INGEST_RESULT_TTL_SECONDS)
+    await pipe.execute()
+
+
+async def consume_shipment_ingest(redis: Redis) -> None:
+    async def handler(entries: list[StreamEntry]) -> None:
+        await apply_shipment_ingest(redis, entries)
+
+    async def on_dead_letter(entries: list[StreamEntry]) -> None:
+        await fail_shipment_ingest(redis, entries)
+
+    await consume_stream(
+        client=redis,
+        stream=settings.SHIPMENT_INGEST_STREAM,
+        group=settings.SHIPMENT_INGEST_CONSUMER_GROUP,
+        consumer=f"{socket.gethostname()}:{os.getpid()}",
+        handler=handler,
+        batch_size=settings.SHIPMENT_INGEST_BATCH_SIZE,
+        block_ms=settings.SHIPMENT_INGEST_BLOCK_MS,
+        claim_idle_ms=settings.SHIPMENT_INGEST_CLAIM_IDLE_MS,
+        max_deliveries=settings.SHIPMENT_INGEST_MAX_DELIVERIES,
+        on_dead_letter=on_dead_letter,
+    )
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import Row
+
+from ...core.config import settings
+from ...core.db.database import local_session
+from ...crud.crud_shipments import crud_shipments
+from ...schemas.shipment import ShipmentStatus
+
+# (expected status, new status, future resolved with the updated row)
+_PendingWrite = tuple[ShipmentStatus | None, ShipmentStatus, asyncio.Future[Row[Any] | None]]
+
+
+class StatusWriteBuffer:
+    """Coalesce shipment status writes from concurrent jobs into one UPDATE per flush.
+
+    Jobs `submit` a compare-and-set transition and wait for the flush that carries it. A flush runs
+    `flush_interval_ms` after the first pending write, or as soon as `max_rows` writes are pending, and applies the
+    whole batch as a single `UPDATE ... FROM (VALUES ...)` in one transaction. Flushes run one at a time, so writes
+    are applied in the order they were submitted; a second write for a shipment that is still pending starts a flush
+    first.
+
+    Parameters
+    ----------
+    flush_interval_ms: int
+        Longest time a write waits in the buffer.
+    max_rows: int
+        Number of pending writes that triggers an immediate flush.
+    """
+
+    def __init__(self, flush_interval_ms: int, max_rows: int) -> None:
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_rows = max_rows
+        self._pending: dict[int, _PendingWrite] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_lock = asyncio.Lock()
+        self._flushes: set[asyncio.Task[None]] = set()
+
+    async def submit(
+        self,
+        shipment_id: int,
+        expected_status: ShipmentStatus | None,
+        status: ShipmentStatus,
+    ) -> Row[Any] | None:
+        """Buffer a transition from `expected_status` to `status` and return the updated
+        (id, warehouse_id, status, updated_at) row once it is committed, or `None` if the shipment was not in
+        `expected_status` (see `crud_shipments.compare_and_set_status`)."""
+        if shipment_id in self._pending:
+            self._start_flush()
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Row[Any] | None] = loop.create_future()
+        self._pending[shipment_id] = (expected_status, status, future)
+
+        if len(self._pending) >= self.max_rows:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.flush_interval, self._start_flush)
+
+        return await future
+
+    async def flush(self) -> None:
+        """Write everything that is pending and wait for in-flight flushes, e.g. on worker shutdown."""
+        self._start_flush()
+        await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _start_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        task = asyncio.create_task(self._write(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: dict[int, _PendingWrite]) -> None:
+        async with self._flush_lock:
+            try:
+                async with local_session() as db:
+                    rows = await crud_shipments.compare_and_set_status(
+                        db=db,
+                        transitions={
+                            shipment_id: (expected_status, status)
+                            for shipment_id, (expected_status, status, _) in batch.items()
+                        },
+                    )
+                    await db.commit()
+            except Exception as e:
+                logging.error(f"Failed to write {len(batch)} buffered shipment statuses: {e}")
+                for *_, future in batch.values():
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+        updated = {row.id: row for row in rows}
+        for shipment_id, (*_, future) in batch.items():
+            if not future.done():
+                future.set_result(updated.get(shipment_id))
+
+
+status_write_buffer = StatusWriteBuffer(
+    flush_interval_ms=settings.WORKER_STATUS_FLUSH_INTERVAL_MS,
+    max_rows=settings.WORKER_STATUS_FLUSH_MAX_ROWS,
+)
@@ -0,0 +1,188 @@
+"""Run the ARQ worker as several processes and scale them with the queue backlog.
+
+Usage:
+    python -m src.app.core.worker.supervisor [--lane background|interactive] [--processes N] [--autoscale]
+"""
+
+import argparse
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.process import BaseProcess
+
+from redis import Redis
+
+from ...core.config import settings
+from ...core.logger import logging
+
+logger = logging.getLogger(__name__)
+
+# Spawned (not forked) children import the app from scratch, so each one builds its own engine and Redis pools.
+_mp = multiprocessing.get_context("spawn")
+
+
+def _worker_process_main(lane: str | None) -> None:
+    from .settings import start_arq_service
+
+    start_arq_service(lane=lane, handle_signals=True)
+
+
+@dataclass
+class QueueStats:
+    backlog: int
+    """Jobs that are due and waiting to be picked up."""
+    oldest_ready_seconds: float
+    """How long the oldest due job has been waiting."""
+
+
+def read_queue_stats(client: Redis, queue_names: list[str]) -> QueueStats:
+    now_ms = int(time.time() * 1000)
+    pipe = client.pipeline(transaction=False)
+    for queue_name in queue_names:
+        pipe.zcount(queue_name, "-inf", now_ms)
+        pipe.zrangebyscore(queue_name, "-inf", now_ms, start=0, num=1, withscores=True)
+    results = pipe.execute()
+
+    backlog = 0
+    oldest_ready_seconds = 0.0
+    for count, oldest in zip(results[::2], results[1::2]):
+        backlog += count
+        if oldest:
+            oldest_ready_seconds = max(oldest_ready_seconds, (now_ms - oldest[0][1]) / 1000)
+
+    return QueueStats(backlog=backlog, oldest_ready_seconds=oldest_ready_seconds)
+
+
+class WorkerSupervisor:
+    """Keep a pool of worker processes running, optionally resizing it to the queue backlog.
+
+    Crashed processes are restarted. With autoscaling on, a process is added whenever the ready backlog per process
+    or the age of the oldest ready job crosses its threshold, and the newest process is retired after the queue has
+    been quiet for `WORKER_SCALE_DOWN_IDLE_CHECKS` consecutive checks. Retired and stopped processes get SIGTERM and
+    finish their running jobs before exiting.
+
+    Parameters
+    ----------
+    lane: str | None
+        Worker lane every process runs, or all lanes when `None`.
+    processes: int | None
+        Initial number of processes, defaults to `WORKER_PROCESSES` or the CPU count.
+    autoscale: bool | None
+        Whether to resize the pool, defaults to `WORKER_AUTOSCALE`.
+    """
+
+    def __init__(self, lane: str | None = None, processes: int | None = None, autoscale: bool | None = None) -> None:
+        self.lane = lane
+        self.min_processes = max(1, settings.WORKER_MIN_PROCESSES)
+        self.max_processes = max(self.min_processes, settings.WORKER_MAX_PROCESSES or os.cpu_count() or 1)
+
+        initial = processes or settings.WORKER_PROCESSES or os.cpu_count() or 1
+        self.target = min(max(initial, self.min_processes), self.max_processes)
+        self.autoscale = settings.WORKER_AUTOSCALE if autoscale is None else autoscale
+        if self.autoscale and settings.QUEUE_BACKEND != "arq":
+            logger.warning("Autoscaling reads the ARQ queues in Redis and is disabled for the Postgres queue backend")
+            self.autoscale = False
+
+        self._processes: list[BaseProcess] = []
+        self._retiring: list[BaseProcess] = []
+        self._idle_checks = 0
+        self._stopping = threading.Event()
+
+    @property
+    def queue_names(self) -> list[str]:
+        if self.lane == "interactive":
+            return [settings.REDIS_QUEUE_INTERACTIVE_NAME]
+        if self.lane == "background":
+            return [settings.REDIS_QUEUE_BACKGROUND_NAME]
+        return [settings.REDIS_QUEUE_INTERACTIVE_NAME, settings.REDIS_QUEUE_BACKGROUND_NAME]
+
+    def desired_processes(self, stats: QueueStats) -> int:
+        """Return the pool size for the current queue stats, moving at most one process per check."""
+        current = self.target
+        overloaded = (
+            stats.backlog > current * settings.WORKER_SCALE_UP_BACKLOG_PER_PROCESS
+            or stats.oldest_ready_seconds > settings.WORKER_SCALE_UP_LATENCY_SECONDS
+        )
+        if overloaded:
+            self._idle_checks = 0
+            return min(current + 1, self.max_processes)
+
+        if stats.backlog == 0:
+            self._idle_checks += 1
+            if self._idle_checks >= settings.WORKER_SCALE_DOWN_IDLE_CHECKS:
+                self._idle_checks = 0
+                return max(current - 1, self.min_processes)
+        else:
+            self._idle_checks = 0
+
+        return current
+
+    def run(self) -> None:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self._stopping.set())
+
+        logger.info(f"Starting {self.target} worker processes (lane={self.lane or 'all'}, autoscale={self.autoscale})")
+        client = Redis(host=settings.REDIS_QUEUE_HOST, port=settings.REDIS_QUEUE_PORT) if self.autoscale else None
+        try:
+            while not self._stopping.is_set():
+                if client is not None:
+                    try:
+                        self.target = self.desired_processes(read_queue_stats(client, self.queue_names))
+                    except Exception as e:
+                        logger.warning(f"Could not read queue stats: {e!r}")
+
+                self._reconcile()
+                self._stopping.wait(settings.WORKER_AUTOSCALE_INTERVAL_SECONDS)
+        finally:
+            self._shutdown()
+            if client is not None:
+                client.close()
+
+    def _reconcile(self) -> None:
+        for process in [p for p in self._processes if not p.is_alive()]:
+            logger.warning(f"Worker process {process.pid} exited with code {process.exitcode}, replacing it")
+            self._processes.remove(process)
+        self._retiring = [p for p in self._retiring if p.is_alive()]
+
+        while len(self._processes) < self.target:
+            process = _mp.Process(target=_worker_process_main, args=(self.lane,), daemon=False)
+            process.start()
+            self._processes.append(process)
+            logger.info(f"Started worker process {process.pid} ({len(self._processes)}/{self.target})")
+
+        while len(self._processes) > self.target:
+            process = self._processes.pop()
+            logger.info(f"Retiring worker process {process.pid} ({len(self._processes)}/{self.target})")
+            process.terminate()
+            self._retiring.append(process)
+
+    def _shutdown(self) -> None:
+        processes = self._processes + self._retiring
+        logger.info(f"Stopping {len(processes)} worker processes")
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+        deadline = time.monotonic() + settings.WORKER_SHUTDOWN_TIMEOUT_SECONDS
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker process {process.pid} did not stop in time, killing it")
+                process.kill()
+                process.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lane", choices=["background", "interactive"], default=None)
+    parser.add_argument("--processes", type=int, default=None, help="Initial number of worker processes")
+    parser.add_argument("--autoscale", action=argparse.BooleanOptionalAction, default=None)
+    args = parser.parse_args()
+    WorkerSupervisor(lane=args.lane, processes=args.processes, autoscale=args.autoscale).run()
+
+
+if __name__ == "__main__":
+    main()
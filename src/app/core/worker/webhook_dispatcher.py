@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Sequence
+from enum import Enum
+from typing import Any
+from urllib.parse import urlsplit
+
+import httpx
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+
+from ...core.config import settings
+from ...core.db.database import local_session
+from ...core.utils.streams import StreamEntry, consume_stream
+from ...crud.crud_webhook_subscriptions import crud_webhook_subscriptions
+from ...schemas.shipment import ShipmentStatusChange
+from ...schemas.webhook_subscription import WebhookSubscription
+
+RETRYABLE_CLIENT_ERRORS = {408, 425, 429}
+
+_subscriptions_adapter = TypeAdapter(list[WebhookSubscription])
+_changes_adapter = TypeAdapter(list[ShipmentStatusChange])
+
+
+class DeliveryResult(Enum):
+    DELIVERED = "delivered"
+    RETRY = "retry"
+    FAILED = "failed"
+
+
+class WebhookDispatcher:
+    """Deliver shipment status changes to webhook subscribers.
+
+    Every call to `dispatch` sends at most one request per subscriber, carrying all of the changes that subscriber
+    is interested in. Requests go through a shared, pooled `httpx.AsyncClient`, and the number of in-flight requests
+    per endpoint (scheme + host + port) is capped. Each call makes a single attempt per subscriber, so a slow or
+    failing endpoint holds up no one else for longer than one request; failed deliveries are returned, to be retried
+    later after `retry_delay`.
+
+    Parameters
+    ----------
+    client: httpx.AsyncClient
+        The HTTP client used for all deliveries. Its connection pool is reused across batches.
+    max_concurrency_per_endpoint: int
+        Maximum number of concurrent requests to the same endpoint.
+    max_attempts: int
+        Number of delivery attempts before a batch is given up on.
+    backoff_base_seconds: float
+        Delay before the first retry; doubled on every following attempt.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        max_concurrency_per_endpoint: int = 4,
+        max_attempts: int = 5,
+        backoff_base_seconds: float = 0.5,
+    ) -> None:
+        self.client = client
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self._semaphores: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max_concurrency_per_endpoint)
+        )
+
+    async def dispatch(
+        self,
+        subscriptions: Sequence[WebhookSubscription],
+        changes: Sequence[ShipmentStatusChange],
+    ) -> list[tuple[WebhookSubscription, list[ShipmentStatusChange], DeliveryResult]]:
+        """Deliver `changes` to every matching subscription and return the deliveries that failed, with why."""
+        deliveries: list[tuple[WebhookSubscription, list[ShipmentStatusChange]]] = []
+        for subscription in subscriptions:
+            matching = [
+                change
+                for change in changes
+                if subscription.warehouse_id is None or change.warehouse_id == subscription.warehouse_id
+            ]
+            if matching:
+                deliveries.append((subscription, matching))
+
+        results = await asyncio.gather(*(self.deliver(subscription, batch) for subscription, batch in deliveries))
+        return [
+            (subscription, batch, result)
+            for (subscription, batch), result in zip(deliveries, results, strict=True)
+            if result is not DeliveryResult.DELIVERED
+        ]
+
+    async def deliver(
+        self, subscription: WebhookSubscription, changes: list[ShipmentStatusChange], attempt: int = 1
+    ) -> DeliveryResult:
+        """Make one delivery attempt. Client errors other than `RETRYABLE_CLIENT_ERRORS` are not worth retrying."""
+        body = json.dumps({"events": [change.model_dump(mode="json") for change in changes]}).encode()
+        headers = {"Content-Type": "application/json"}
+        if subscription.secret:
+            signature = hmac.new(subscription.secret.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+        parts = urlsplit(subscription.url)
+        async with self._semaphores[f"{parts.scheme}://{parts.netloc}"]:
+            try:
+                response = await self.client.post(subscription.url, content=body, headers=headers)
+            except httpx.HTTPError as e:
+                logging.warning(f"Webhook {subscription.id} delivery attempt {attempt} failed: {e!r}")
+                return DeliveryResult.RETRY
+
+        if response.is_success:
+            return DeliveryResult.DELIVERED
+
+        logging.warning(f"Webhook {subscription.id} delivery attempt {attempt} got HTTP {response.status_code}")
+        if response.is_client_error and response.status_code not in RETRYABLE_CLIENT_ERRORS:
+            return DeliveryResult.FAILED
+        return DeliveryResult.RETRY
+
+    def retry_delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number `attempt` before the next one, with jitter."""
+        return self.backoff_base_seconds * 2.0 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+
+class _SubscriptionCache:
+    """Active subscriptions, reloaded from the database at most every `refresh_seconds`."""
+
+    def __init__(self, refresh_seconds: int) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._subscriptions: list[WebhookSubscription] = []
+        self._loaded_at: float | None = None
+
+    async def get(self) -> list[WebhookSubscription]:
+        now = asyncio.get_running_loop().time()
+        if self._loaded_at is None or now - self._loaded_at >= self.refresh_seconds:
+            async with local_session() as db:
+                # All columns, since the read schema leaves out the signing secret
+                result = await crud_webhook_subscriptions.get_multi(
+                    db=db,
+                    limit=None,
+                    is_active=True,
+                    is_deleted=False,
+                )
+            self._subscriptions = _subscriptions_adapter.validate_python(result["data"])
+            self._loaded_at = now
+
+        return self._subscriptions
+
+
+async def _retry_later(
+    redis: Redis,
+    dispatcher: WebhookDispatcher,
+    subscription: WebhookSubscription,
+    changes: list[ShipmentStatusChange],
+    attempt: int,
+    result: DeliveryResult,
+) -> None:
+    """Schedule the next attempt of a failed delivery, or dead-letter it if it is not retried any more."""
+    data = [change.model_dump(mode="json") for change in changes]
+    if result is DeliveryResult.RETRY and attempt < dispatcher.max_attempts:
+        retry = {"id": uuid.uuid4().hex, "subscription_id": subscription.id, "attempt": attempt + 1, "data": data}
+        due_ms = int((time.time() + dispatcher.retry_delay(attempt)) * 1000)
+        await redis.zadd(settings.WEBHOOK_RETRY_KEY, {json.dumps(retry): due_ms})
+        return
+
+    logging.error(f"Giving up on webhook {subscription.id} after {attempt} attempts")
+    await redis.xadd(
+        settings.WEBHOOK_DEAD_LETTER_STREAM,
+        {"subscription_id": subscription.id, "data": json.dumps(data)},
+        maxlen=settings.WEBHOOK_EVENTS_STREAM_MAXLEN,
+        approximate=True,
+    )
+
+
+async def _retry(
+    redis: Redis,
+    dispatcher: WebhookDispatcher,
+    subscriptions: dict[int, WebhookSubscription],
+    retry: dict[str, Any],
+) -> None:
+    subscription = subscriptions.get(retry["subscription_id"])
+    if subscription is None:
+        logging.info(f"Dropping retry of webhook {retry['subscription_id']}, which is no longer active")
+        return
+
+    changes = _changes_adapter.validate_python(retry["data"])
+    result = await dispatcher.deliver(subscription, changes, attempt=retry["attempt"])
+    if result is not DeliveryResult.DELIVERED:
+        await _retry_later(redis, dispatcher, subscription, changes, retry["attempt"], result)
+
+
+async def run_webhook_retries(redis: Redis, dispatcher: WebhookDispatcher, subscriptions: _SubscriptionCache) -> None:
+    """Make the scheduled attempts of failed deliveries once they are due, each in its own task. Runs until cancelled.
+
+    A retry is claimed by removing it from `WEBHOOK_RETRY_KEY`, so with several workers only one of them makes it. A
+    retry claimed by a worker that stops before making it is lost.
+    """
+    running: set[asyncio.Task[None]] = set()
+    try:
+        while True:
+            due: list[bytes] = []
+            try:
+                due = await redis.zrangebyscore(
+                    settings.WEBHOOK_RETRY_KEY,
+                    "-inf",
+                    int(time.time() * 1000),
+                    start=0,
+                    num=settings.WEBHOOK_RETRY_BATCH_SIZE,
+                )
+                claimed = [json.loads(member) for member in due if await redis.zrem(settings.WEBHOOK_RETRY_KEY, member)]
+                if claimed:
+                    active = {subscription.id: subscription for subscription in await subscriptions.get()}
+                    for retry in claimed:
+                        task = asyncio.create_task(_retry(redis, dispatcher, active, retry))
+                        running.add(task)
+                        task.add_done_callback(running.discard)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Failed to claim webhook retries: {e}", exc_info=True)
+
+            if len(due) < settings.WEBHOOK_RETRY_BATCH_SIZE:
+                await asyncio.sleep(settings.WEBHOOK_RETRY_POLL_SECONDS)
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+
+async def run_webhook_dispatcher(redis: Redis) -> None:
+    limits = httpx.Limits(
+        max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+    )
+    async with httpx.AsyncClient(limits=limits, timeout=settings.WEBHOOK_TIMEOUT_SECONDS) as client:
+        dispatcher = WebhookDispatcher(
+            client=client,
+            max_concurrency_per_endpoint=settings.WEBHOOK_MAX_CONCURRENCY_PER_ENDPOINT,
+            max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+            backoff_base_seconds=settings.WEBHOOK_BACKOFF_BASE_SECONDS,
+        )
+        subscriptions = _SubscriptionCache(refresh_seconds=settings.WEBHOOK_SUBSCRIPTIONS_REFRESH_SECONDS)
+
+        async def handle(entries: list[StreamEntry]) -> None:
+            active = await subscriptions.get()
+            if not active:
+                return
+
+            changes = [ShipmentStatusChange.model_validate_json(fields[b"data"]) for _, fields in entries]
+            for subscription, batch, result in await dispatcher.dispatch(active, changes):
+                await _retry_later(redis, dispatcher, subscription, batch, 1, result)
+
+        retries = asyncio.create_task(run_webhook_retries(redis, dispatcher, subscriptions))
+        try:
+            await consume_stream(
+                client=redis,
+                stream=settings.WEBHOOK_EVENTS_STREAM,
+                group=settings.WEBHOOK_CONSUMER_GROUP,
+                consumer=f"{socket.gethostname()}:{os.getpid()}",
+                handler=handle,
+                batch_size=settings.WEBHOOK_BATCH_SIZE,
+                block_ms=settings.WEBHOOK_BLOCK_MS,
+                claim_idle_ms=settings.WEBHOOK_CLAIM_IDLE_MS,
+            )
+        finally:
+            retries.cancel()
+            await asyncio.gather(retries, return_exceptions=True)
@@ -1,17 +1,45 @@
+from collections.abc import Mapping, Sequence
+from datetime import UTC, datetime
 from typing import Any
 
 from fastcrud import FastCRUD, JoinConfig, aliased
+from sqlalchemy import (
+    DateTime,
+    Insert,
+    Integer,
+    Row,
+    String,
+    and_,
+    bindparam,
+    case,
+    column,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.address import Address
 from ..models.shipment import Shipment
 from ..models.warehouse import Warehouse
-from ..schemas.address import AddressRead
+from ..schemas.address import AddressCreate, AddressRead
 from ..schemas.shipment import (
+    TERMINAL_SHIPMENT_STATUSES,
+    ShipmentCreate,
     ShipmentCreateInternal,
     ShipmentDelete,
     ShipmentRead,
     ShipmentReadDetailed,
+    ShipmentStatus,
     ShipmentUpdate,
     ShipmentUpdateInternal,
 )
@@ -80,6 +108,25 @@ class CRUDShipment(
             **kwargs,
         )
 
+    async def get_page_ids(
+        self,
+        db: AsyncSession,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> tuple[list[int], int]:
+        """
+        Get the IDs of a page of shipments, ordered by ID, and the total count, reading nothing else.
+        """
+        total_count = await self.count(db=db, is_deleted=False)
+        if not total_count or offset >= total_count:
+            return [], total_count
+
+        stmt = (
+            select(Shipment.id).where(Shipment.is_deleted.is_(False)).order_by(Shipment.id).offset(offset).limit(limit)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all()), total_count
+
     async def get_detailed(
         self,
         db: AsyncSession,
@@ -125,5 +172,356 @@ class CRUDShipment(
             **kwargs,
         )
 
+    async def update_status_by_tracking_number(
+        self,
+        db: AsyncSession,
+        events: Mapping[str, tuple[datetime, ShipmentStatus]],
+    ) -> Sequence[Row[Any]]:
+        """
+        Apply carrier events, as (occurred at, status) keyed by tracking number, in a single set-based
+        UPDATE ... FROM (VALUES ...).
+
+        Rows that are deleted, already in a terminal state, or already have a carrier event at least as recent are left
+        untouched, so an event that arrives late does not undo a newer one. Returns the (id, warehouse_id, status,
+        updated_at) of the rows whose status actually changed.
+        """
+        if not events:
+            return []
+
+        changes = values(
+            column("tracking_number", String),
+            column("occurred_at", DateTime(timezone=True)),
+            column("status", Shipment.__table__.c.status.type),
+            name="changes",
+        ).data([(tracking_number, occurred_at, status) for tracking_number, (occurred_at, status) in events.items()])
+
+        # Joined on itself, so RETURNING can tell the status before the update from the one after it
+        previous = aliased(Shipment, name="previous")
+        status_changed = Shipment.status.is_distinct_from(changes.c.status)
+        stmt = (
+            update(Shipment)
+            .where(
+                Shipment.tracking_number == changes.c.tracking_number,
+                previous.id == Shipment.id,
+                Shipment.is_deleted.is_(False),
+                or_(Shipment.status.is_(None), Shipment.status.not_in(TERMINAL_SHIPMENT_STATUSES)),
+                or_(Shipment.carrier_event_at.is_(None), Shipment.carrier_event_at < changes.c.occurred_at),
+            )
+            .values(
+                status=changes.c.status,
+                carrier_event_at=changes.c.occurred_at,
+                updated_at=case((status_changed, func.now()), else_=Shipment.updated_at),
+            )
+            .returning(
+                Shipment.id,
+                Shipment.warehouse_id,
+                Shipment.status,
+                Shipment.updated_at,
+                previous.status.label("old_status"),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await db.execute(stmt)
+        return [row for row in result.all() if row.status != row.old_status]
+
+    async def compare_and_set_status(
+        self,
+        db: AsyncSession,
+        transitions: Mapping[int, tuple[ShipmentStatus | None, ShipmentStatus]],
+    ) -> Sequence[Row[Any]]:
+        """
+        Apply (expected status, new status) transitions keyed by shipment id as a single UPDATE ... FROM (VALUES ...).
+
+        A row is only updated while it still has the expected status, is not deleted, is not in a terminal state,
+        and has a tracking number. Returns the (id, warehouse_id, status, updated_at) of the rows that were updated.
+        """
+        if not transitions:
+            return []
+
+        status_type = Shipment.__table__.c.status.type
+        changes = values(
+            column("id", Integer),
+            column("expected_status", status_type),
+            column("status", status_type),
+            name="changes",
+        ).data([(shipment_id, expected, status) for shipment_id, (expected, status) in transitions.items()])
+
+        stmt = (
+            update(Shipment)
+            .where(
+                Shipment.id == changes.c.id,
+                Shipment.is_deleted.is_(False),
+                Shipment.status.is_not_distinct_from(changes.c.expected_status),
+                or_(Shipment.status.is_(None), Shipment.status.not_in(TERMINAL_SHIPMENT_STATUSES)),
+                Shipment.tracking_number != "",  # also false for NULL
+            )
+            .values(status=changes.c.status, updated_at=func.now())
+            .returning(Shipment.id, Shipment.warehouse_id, Shipment.status, Shipment.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await db.execute(stmt)
+        return result.all()
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        shipments: Mapping[str, ShipmentCreate],
+    ) -> Sequence[Row[Any]]:
+        """
+        Insert queued shipments, keyed by their pending id, with their ship-to and ship-from addresses as two
+        multi-row INSERT ... RETURNING statements.
+
+        A shipment whose pending id or external reference is already stored, or taken earlier in the batch, is skipped
+        (ON CONFLICT DO NOTHING), so one that is redelivered after its transaction committed is not inserted twice.
+        The addresses inserted for skipped shipments are deleted again. Does not commit. Returns the (pending_id, id,
+        warehouse_id, status, tracking_number, created_at) of the inserted shipments.
+        """
+        if not shipments:
+            return []
+
+        now = datetime.now(UTC)
+        address_ids = (
+            await db.scalars(
+                insert(Address).returning(Address.id, sort_by_parameter_order=True),
+                [
+                    {**address.model_dump(), "created_at": now}
+                    for shipment in shipments.values()
+                    for address in (shipment.ship_to, shipment.ship_from)
+                ],
+            )
+        ).all()
+
+        result = await db.execute(
+            pg_insert(Shipment)
+            # No conflict target, so it covers both the pending id and the external reference unique indexes
+            .on_conflict_do_nothing()
+            .returning(
+                Shipment.pending_id,
+                Shipment.id,
+                Shipment.warehouse_id,
+                Shipment.status,
+                Shipment.tracking_number,
+                Shipment.created_at,
+            ),
+            [
+                {
+                    **shipment.model_dump(exclude={"ship_to", "ship_from"}),
+                    "pending_id": pending_id,
+                    "ship_to_id": address_ids[2 * i],
+                    "ship_from_id": address_ids[2 * i + 1],
+                    "created_at": now,
+                }
+                for i, (pending_id, shipment) in enumerate(shipments.items())
+            ],
+        )
+        created = result.all()
+
+        inserted = {row.pending_id for row in created}
+        unused_address_ids = [
+            address_id
+            for i, pending_id in enumerate(shipments)
+            if pending_id not in inserted
+            for address_id in address_ids[2 * i : 2 * i + 2]
+        ]
+        if unused_address_ids:
+            await db.execute(delete(Address).where(Address.id.in_(unused_address_ids)))
+
+        return created
+
+    async def upsert_by_reference(
+        self,
+        db: AsyncSession,
+        shipment: ShipmentCreate,
+    ) -> Row[Any] | None:
+        """
+        Create the shipment with `shipment.external_reference`, or update the existing one, in a single
+        INSERT ... ON CONFLICT DO UPDATE statement. Does not commit.
+
+        The ship-to and ship-from addresses are only inserted (in CTEs of the same statement) when no shipment has the
+        reference yet; an existing shipment keeps its addresses, and its status unless it has none. An existing shipment
+        is only updated, and revived if it was soft-deleted, when that changes it. Returns the inserted or updated row's
+        columns along with `changed_at`, its `old_status` and whether it was `created`, or `None` if the existing
+        shipment already matched.
+        """
+        now = datetime.now(UTC)
+        reference = shipment.external_reference
+
+        existing = (
+            select(Shipment.status, Shipment.ship_to_id, Shipment.ship_from_id)
+            .where(Shipment.external_reference == reference)
+            .cte("existing")
+        )
+
+        def insert_address(address: AddressCreate, name: str) -> Any:
+            # Every column with a default is given explicitly, so the two address inserts and the shipment insert
+            # do not each render a default parameter of the same name
+            data = {**address.model_dump(), "created_at": now, "is_deleted": False}
+            row = select(
+                *(
+                    bindparam(f"{name}_{key}", value, Address.__table__.c[key].type).label(key)
+                    for key, value in data.items()
+                )
+            )
+            return (
+                insert(Address)
+                .from_select(list(data), row.where(~exists(select(existing.c.status))))
+                .returning(Address.id)
+                .cte(name)
+            )
+
+        ship_to = insert_address(shipment.ship_to, "ship_to")
+        ship_from = insert_address(shipment.ship_from, "ship_from")
+
+        fields = shipment.model_dump(exclude={"ship_to", "ship_from", "external_reference"})
+        row = select(
+            *(
+                bindparam(key, value, Shipment.__table__.c[key].type).label(key)
+                for key, value in {
+                    **fields,
+                    "external_reference": reference,
+                    "created_at": now,
+                    "is_deleted": False,
+                }.items()
+            ),
+            func.coalesce(
+                select(ship_to.c.id).scalar_subquery(), select(existing.c.ship_to_id).scalar_subquery()
+            ).label("ship_to_id"),
+            func.coalesce(
+                select(ship_from.c.id).scalar_subquery(), select(existing.c.ship_from_id).scalar_subquery()
+            ).label("ship_from_id"),
+        )
+        # INSERT ... SELECT rather than VALUES, so the address CTEs can be referenced from the inserted row
+        insert_stmt = pg_insert(Shipment).from_select(row.selected_columns.keys(), row)
+        # A resend only sets the status of a shipment that has none: once set, statuses are advanced by carrier events
+        # and tracking updates, which a stale partner payload must not undo
+        updated = [name for name in fields if name != "status"]
+        stmt: Insert = insert_stmt.on_conflict_do_update(
+            index_elements=[Shipment.external_reference],
+            index_where=Shipment.external_reference.is_not(None),
+            set_={
+                **{name: getattr(insert_stmt.excluded, name) for name in updated},
+                "status": func.coalesce(Shipment.status, insert_stmt.excluded.status),
+                "updated_at": func.now(),
+                "is_deleted": False,
+                "deleted_at": None,
+            },
+            where=or_(
+                tuple_(*(getattr(Shipment, name) for name in updated), Shipment.is_deleted).is_distinct_from(
+                    tuple_(*(getattr(insert_stmt.excluded, name) for name in updated), false())
+                ),
+                and_(Shipment.status.is_(None), insert_stmt.excluded.status.is_not(None)),
+            ),
+        ).returning(
+            Shipment.id,
+            Shipment.warehouse_id,
+            Shipment.ship_to_id,
+            Shipment.ship_from_id,
+            Shipment.carrier,
+            Shipment.service_code,
+            Shipment.tracking_number,
+            Shipment.status,
+            Shipment.external_reference,
+            Shipment.created_at,
+            func.coalesce(Shipment.updated_at, Shipment.created_at).label("changed_at"),
+            select(existing.c.status).scalar_subquery().label("old_status"),
+            # xmax is only set on rows this statement updated rather than inserted
+            (literal_column("xmax") == 0).label("created"),
+        )
+
+        result = await db.execute(stmt)
+        return result.one_or_none()
+
+    async def get_recent_ids(
+        self,
+        db: AsyncSession,
+        limit: int,
+    ) -> list[int]:
+        """
+        Get the IDs of the most recently created or updated shipments, newest first.
+        """
+        stmt = (
+            select(Shipment.id)
+            .where(Shipment.is_deleted.is_(False))
+            .order_by(func.coalesce(Shipment.updated_at, Shipment.created_at).desc())
+            .limit(limit)
+        )
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_version(
+        self,
+        db: AsyncSession,
+        id: int,
+    ) -> datetime | None:
+        """
+        Get when a shipment or its warehouse last changed, reading only timestamps, or `None` if it does not exist.
+
+        Address changes create new addresses and update the shipment, so this covers everything `get_detailed` joins.
+        """
+        stmt = (
+            select(
+                func.greatest(
+                    Shipment.created_at,
+                    Shipment.updated_at,
+                    Warehouse.created_at,
+                    Warehouse.updated_at,
+                    Warehouse.deleted_at,
+                )
+            )
+            .outerjoin(Warehouse, Shipment.warehouse_id == Warehouse.id)
+            .where(Shipment.id == id, Shipment.is_deleted.is_(False))
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_versions(
+        self,
+        db: AsyncSession,
+        ids: Sequence[int],
+    ) -> dict[int, datetime]:
+        """
+        `get_version` of several shipments in one query, by ID. Unknown and deleted shipments are left out.
+        """
+        stmt = (
+            select(
+                Shipment.id,
+                func.greatest(
+                    Shipment.created_at,
+                    Shipment.updated_at,
+                    Warehouse.created_at,
+                    Warehouse.updated_at,
+                    Warehouse.deleted_at,
+                ),
+            )
+            .outerjoin(Warehouse, Shipment.warehouse_id == Warehouse.id)
+            .where(Shipment.id.in_(ids), Shipment.is_deleted.is_(False))
+        )
+        result = await db.execute(stmt)
+        return dict(result.tuples().all())
+
+    async def get_statuses(
+        self,
+        db: AsyncSession,
+        shipment_ids: Sequence[int],
+    ) -> Sequence[Row[Any]]:
+        """
+        Read the (id, status, updated_at) of the given shipments without joining anything.
+
+        Deleted shipments are left out; `updated_at` falls back to `created_at` for shipments never updated.
+        """
+        if not shipment_ids:
+            return []
+
+        stmt = select(
+            Shipment.id,
+            Shipment.status,
+            func.coalesce(Shipment.updated_at, Shipment.created_at).label("updated_at"),
+        ).where(Shipment.id.in_(shipment_ids), Shipment.is_deleted.is_(False))
+
+        result = await db.execute(stmt)
+        return result.all()
+
 
 crud_shipments = CRUDShipment(Shipment)
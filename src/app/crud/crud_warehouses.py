@@ -1,6 +1,8 @@
+from datetime import datetime
 from typing import Any
 
 from fastcrud import FastCRUD, JoinConfig, aliased
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.address import Address
@@ -106,5 +108,21 @@ class CRUDWarehouse(
             **kwargs,
         )
 
+    async def get_version(
+        self,
+        db: AsyncSession,
+        id: int,
+    ) -> datetime | None:
+        """
+        Get when a warehouse last changed, reading only its timestamps, or `None` if it does not exist.
+
+        Address changes create new addresses and update the warehouse, so this also covers its joined addresses.
+        """
+        stmt = select(func.greatest(Warehouse.created_at, Warehouse.updated_at)).where(
+            Warehouse.id == id, Warehouse.is_deleted.is_(False)
+        )
+        result = await db.execute(stmt)
+        return result.scalar_one_or_none()
+
 
 crud_warehouses = CRUDWarehouse(Warehouse)
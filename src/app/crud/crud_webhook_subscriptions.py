@@ -0,0 +1,26 @@
+from fastcrud import FastCRUD
+
+from ..models.webhook_subscription import WebhookSubscription
+from ..schemas.webhook_subscription import (
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionDelete,
+    WebhookSubscriptionRead,
+    WebhookSubscriptionUpdate,
+    WebhookSubscriptionUpdateInternal,
+)
+
+
+class CRUDWebhookSubscription(
+    FastCRUD[
+        WebhookSubscription,
+        WebhookSubscriptionCreate,
+        WebhookSubscriptionUpdate,
+        WebhookSubscriptionUpdateInternal,
+        WebhookSubscriptionDelete,
+        WebhookSubscriptionRead,
+    ]
+):
+    pass
+
+
+crud_webhook_subscriptions = CRUDWebhookSubscription(WebhookSubscription)
@@ -0,0 +1,34 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RateLimitHeadersMiddleware:
+    """Middleware to add the headers of the request's rate limit check to its response, including error responses.
+
+    The check is made by the `core.utils.rate_limit.RateLimit` dependency, which leaves its headers in the request
+    state. A plain ASGI middleware, so responses are not buffered.
+
+    Parameters
+    ----------
+    app: ASGIApp
+        The application to wrap.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                rate_limit_headers = scope.get("state", {}).get("rate_limit_headers")
+                if rate_limit_headers:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        *((name.lower().encode(), value.encode()) for name, value in rate_limit_headers.items()),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,3 +1,5 @@
 from .address import Address
+from .job import Job
 from .shipment import Shipment
 from .warehouse import Warehouse
+from .webhook_subscription import WebhookSubscription
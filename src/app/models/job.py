@@ -0,0 +1,27 @@
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import BigInteger, DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..core.db.database import Base
+
+
+class Job(Base):
+    """A queued job for the Postgres queue backend; the row is deleted once the job has run."""
+
+    __tablename__ = "job"
+    __table_args__ = (Index("ix_job_queue_name_scheduled_at", "queue_name", "scheduled_at"),)
+
+    id: Mapped[int] = mapped_column(BigInteger, autoincrement=True, nullable=False, primary_key=True, init=False)
+    job_id: Mapped[str] = mapped_column(String(255), unique=True)
+    queue_name: Mapped[str] = mapped_column(String(255))
+    function: Mapped[str] = mapped_column(String(255))
+    args: Mapped[list[Any]] = mapped_column(JSONB, default_factory=list)
+    kwargs: Mapped[dict[str, Any]] = mapped_column(JSONB, default_factory=dict)
+    attempts: Mapped[int] = mapped_column(default=0)
+
+    scheduled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
@@ -1,7 +1,7 @@
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from ..core.db.database import Base
@@ -14,6 +14,22 @@ if TYPE_CHECKING:
 
 class Shipment(Base):
     __tablename__ = "shipment"
+    __table_args__ = (
+        # Partners' own reference for the shipment; resends upsert on it, see `crud_shipments.upsert_by_reference`
+        Index(
+            "ix_shipment_external_reference",
+            "external_reference",
+            unique=True,
+            postgresql_where=text("external_reference IS NOT NULL"),
+        ),
+        # Pending id of a shipment queued through the ingest stream, so a redelivered entry is not inserted twice
+        Index(
+            "ix_shipment_pending_id",
+            "pending_id",
+            unique=True,
+            postgresql_where=text("pending_id IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column("id", autoincrement=True, nullable=False, unique=True, primary_key=True, init=False)
     warehouse_id: Mapped[int] = mapped_column(ForeignKey("warehouse.id"), index=True)
@@ -44,6 +60,10 @@ class Shipment(Base):
     service_code: Mapped[str | None] = mapped_column(String(50), default=None)
     tracking_number: Mapped[str | None] = mapped_column(String(100), default=None, index=True)
     status: Mapped[ShipmentStatus | None] = mapped_column(Enum(ShipmentStatus), default=None, index=True)
+    external_reference: Mapped[str | None] = mapped_column(String(100), default=None)
+    pending_id: Mapped[str | None] = mapped_column(String(32), default=None)
+    # When the carrier event that set the status happened, so events arriving out of order cannot undo newer ones
+    carrier_event_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default_factory=lambda: datetime.now(UTC))
     updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), default=None)
@@ -0,0 +1,38 @@
+from typing import Annotated, Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BatchOperation(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    id: Annotated[str | None, Field(description="Echoed back on the result", examples=["create-1"], default=None)] = (
+        None
+    )
+    method: Annotated[Literal["GET", "POST", "PUT", "PATCH", "DELETE"], Field(examples=["GET"])]
+    path: Annotated[
+        str,
+        Field(
+            description="Route path relative to /api/v1, without query string",
+            pattern=r"^/[^?#]*$",
+            examples=["/shipments/1"],
+        ),
+    ]
+    query: Annotated[dict[str, Any] | None, Field(examples=[{"page": 1}], default=None)] = None
+    body: Annotated[Any, Field(description="JSON request body", examples=[None], default=None)] = None
+
+
+class BatchRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    operations: Annotated[list[BatchOperation], Field(min_length=1)]
+
+
+class BatchResult(BaseModel):
+    id: Annotated[str | None, Field(examples=["create-1"], default=None)] = None
+    status: Annotated[int, Field(examples=[200])]
+    body: Annotated[Any, Field(description="JSON (or text) response body", examples=[{"id": 1}], default=None)] = None
+
+
+class BatchResponse(BaseModel):
+    results: list[BatchResult]
@@ -19,11 +19,21 @@ class ShipmentStatus(str, Enum):
     FAILED = "failed"
 
 
+TERMINAL_SHIPMENT_STATUSES = frozenset(
+    {
+        ShipmentStatus.DELIVERED,
+        ShipmentStatus.CANCELLED,
+        ShipmentStatus.FAILED,
+    }
+)
+
+
 class TrackingUpdateStatusType(str, Enum):
     NOT_FOUND = "not_found"
     NO_TRACKING = "no_tracking"
     TERMINAL = "terminal"
     UPDATED = "updated"
+    CONFLICT = "conflict"
     ERROR = "error"
 
 
@@ -33,6 +43,7 @@ class ShipmentBase(BaseModel):
     service_code: Annotated[str | None, Field(examples=["usps_priority"], default=None)] = None
     tracking_number: Annotated[str | None, Field(examples=["9400111899223197428490"], default=None)] = None
     status: Annotated[ShipmentStatus | None, Field(examples=[ShipmentStatus.PENDING], default=None)] = None
+    external_reference: Annotated[str | None, Field(max_length=100, examples=["ORDER-10042"], default=None)] = None
 
 
 class Shipment(ShipmentBase, TimestampSchema):
@@ -104,6 +115,41 @@ class ShipmentRestoreDeleted(BaseModel):
     is_deleted: bool
 
 
+class ShipmentStatusChange(BaseModel):
+    shipment_id: Annotated[int, Field(examples=[1])]
+    warehouse_id: Annotated[int | None, Field(examples=[1], default=None)] = None
+    old_status: Annotated[ShipmentStatus | None, Field(examples=[ShipmentStatus.PENDING], default=None)] = None
+    new_status: Annotated[ShipmentStatus | None, Field(examples=[ShipmentStatus.PROCESSING])]
+    changed_at: datetime
+
+
+class ShipmentStatusRead(BaseModel):
+    id: Annotated[int, Field(examples=[1])]
+    status: Annotated[ShipmentStatus | None, Field(examples=[ShipmentStatus.IN_TRANSIT], default=None)] = None
+    updated_at: datetime
+
+
+class ShipmentIngestState(str, Enum):
+    QUEUED = "queued"
+    CREATED = "created"
+    FAILED = "failed"
+
+
+class ShipmentIngestAccepted(BaseModel):
+    pending_id: Annotated[str, Field(description="ID to look the queued shipment up by", examples=["0f8e2d4c..."])]
+
+
+class ShipmentIngestStatus(BaseModel):
+    pending_id: Annotated[str, Field(examples=["0f8e2d4c..."])]
+    state: Annotated[ShipmentIngestState, Field(examples=[ShipmentIngestState.CREATED])]
+    shipment_id: Annotated[int | None, Field(description="ID of the created shipment", examples=[1], default=None)] = (
+        None
+    )
+    error: Annotated[
+        str | None, Field(description="Why the shipment could not be created", examples=[None], default=None)
+    ] = None
+
+
 class ShipmentTrackingUpdateResponse(BaseModel):
     message: Annotated[str, Field(description="Response message")]
     shipment_id: Annotated[int, Field(description="ID of the shipment", examples=[1])]
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from ..schemas.shipment import ShipmentStatus
+
+
+class CarrierTrackingEvent(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    tracking_number: Annotated[str, Field(min_length=1, max_length=100, examples=["9400111899223197428490"])]
+    status: Annotated[ShipmentStatus, Field(examples=[ShipmentStatus.IN_TRANSIT])]
+    occurred_at: Annotated[datetime, Field(examples=["2026-01-22T13:00:00Z"])]
+    carrier: Annotated[str | None, Field(examples=["usps"], default=None)] = None
+
+
+class CarrierTrackingEventBatch(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    events: Annotated[list[CarrierTrackingEvent], Field(min_length=1)]
+
+
+class CarrierWebhookAccepted(BaseModel):
+    accepted: Annotated[int, Field(description="Number of events queued for processing", examples=[100])]
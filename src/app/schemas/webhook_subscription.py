@@ -0,0 +1,67 @@
+from datetime import datetime
+from typing import Annotated
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class WebhookSubscriptionBase(BaseModel):
+    url: Annotated[
+        str, Field(max_length=2048, pattern=r"^https?://", examples=["https://example.com/webhooks/shipments"])
+    ]
+    warehouse_id: Annotated[
+        int | None,
+        Field(description="Only deliver changes for shipments of this warehouse", examples=[None], default=None),
+    ] = None
+    is_active: Annotated[bool, Field(examples=[True])] = True
+
+
+class WebhookSubscription(WebhookSubscriptionBase):
+    id: Annotated[int, Field(examples=[1])]
+    secret: Annotated[str | None, Field(default=None)] = None
+
+
+class WebhookSubscriptionRead(WebhookSubscriptionBase):
+    id: Annotated[int, Field(examples=[1])]
+    created_at: datetime
+
+
+class WebhookSubscriptionCreate(WebhookSubscriptionBase):
+    model_config = ConfigDict(extra="forbid")
+
+    secret: Annotated[
+        str | None,
+        Field(
+            max_length=255,
+            description="Shared secret used to sign deliveries with HMAC-SHA256 (X-Webhook-Signature header)",
+            examples=["whsec_2f8c..."],
+            default=None,
+        ),
+    ] = None
+
+
+class WebhookSubscriptionUpdate(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    url: Annotated[str | None, Field(max_length=2048, pattern=r"^https?://", default=None)] = None
+    secret: Annotated[str | None, Field(max_length=255, default=None)] = None
+    warehouse_id: Annotated[int | None, Field(default=None)] = None
+    is_active: Annotated[bool | None, Field(default=None)] = None
+
+    @field_validator("url", "is_active")
+    @classmethod
+    def _not_null(cls, value: str | bool | None) -> str | bool | None:
+        # Omitted fields keep their value, but these columns cannot be cleared
+        if value is None:
+            raise ValueError("Cannot be null")
+        return value
+
+
+class WebhookSubscriptionUpdateInternal(WebhookSubscriptionUpdate):
+    updated_at: datetime
+
+
+class WebhookSubscriptionDelete(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    is_deleted: bool
+    deleted_at: datetime
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime
+
+from pydantic import TypeAdapter
+
+from ..core.config import settings
+from ..core.db.database import local_session
+from ..core.utils import cache
+from ..crud.crud_shipments import crud_shipments
+from ..crud.crud_warehouses import crud_warehouses
+from ..schemas.warehouse import Warehouse, WarehouseReadDetailed
+from .service_shipment_status import service_shipment_status
+from .service_shipments import service_shipments
+
+logger = logging.getLogger(__name__)
+
+_warehouses_adapter = TypeAdapter(list[Warehouse])
+
+
+class CacheWarmupService:
+    """Preload the hot sets of the caches, so a freshly started process does not meet its traffic with cold caches.
+
+    Each hot set is loaded in chunks, each with its own session, at most `concurrency` at a time across all sets.
+    Entries and statuses already in Redis are not loaded again, so the processes of a deployment starting together
+    mostly warm their local caches from the first one's work. Failures are logged and skipped: a cold entry is only
+    slower.
+    """
+
+    @staticmethod
+    async def warm_up(
+        hot_sets: Sequence[str],
+        concurrency: int,
+        budget_seconds: float,
+    ) -> None:
+        """Load `hot_sets` into the caches, giving up on what is left after `budget_seconds`."""
+        loaders: dict[str, Callable[[asyncio.Semaphore], Awaitable[int]]] = {
+            "warehouses": CacheWarmupService._warm_warehouses,
+            "recent_shipments": CacheWarmupService._warm_recent_shipments,
+            "shipment_statuses": CacheWarmupService._warm_shipment_statuses,
+        }
+        unknown = [name for name in hot_sets if name not in loaders]
+        if unknown:
+            logger.warning(f"Skipping unknown cache warm-up sets: {', '.join(unknown)}")
+        names = [name for name in dict.fromkeys(hot_sets) if name in loaders]
+
+        started = time.monotonic()
+        limit = asyncio.Semaphore(concurrency)
+        try:
+            async with asyncio.timeout(budget_seconds):
+                counts = await asyncio.gather(*(CacheWarmupService._warm(name, loaders[name], limit) for name in names))
+        except TimeoutError:
+            logger.warning(f"Cache warm-up stopped after its {budget_seconds}s budget")
+            return
+
+        summary = ", ".join(f"{name}: {count}" for name, count in zip(names, counts, strict=True))
+        logger.info(f"Cache warm-up finished in {time.monotonic() - started:.1f}s ({summary})")
+
+    @staticmethod
+    async def _warm(name: str, loader: Callable[[asyncio.Semaphore], Awaitable[int]], limit: asyncio.Semaphore) -> int:
+        try:
+            return await loader(limit)
+        except Exception as e:
+            logger.error(f"Cache warm-up of {name} failed: {e}", exc_info=True)
+            return 0
+
+    @staticmethod
+    async def _recent_shipment_chunks(limit: asyncio.Semaphore) -> list[list[int]]:
+        async with limit, local_session() as db:
+            ids = await crud_shipments.get_recent_ids(db=db, limit=settings.CACHE_WARMUP_RECENT_SHIPMENTS)
+        size = settings.CACHE_WARMUP_CHUNK_SIZE
+        return [ids[i : i + size] for i in range(0, len(ids), size)]
+
+    @staticmethod
+    async def _warm_warehouses(limit: asyncio.Semaphore) -> int:
+        async def render(warehouse_id: int) -> tuple[bytes, datetime] | None:
+            async with limit, local_session() as db:
+                # Read first, like the detail read does, so it is never newer than the body
+                version = await crud_warehouses.get_version(db=db, id=warehouse_id)
+                warehouse = await crud_warehouses.get_detailed(db=db, id=warehouse_id)
+            if warehouse is None or version is None:
+                return None
+            body = WarehouseReadDetailed.model_validate(warehouse).model_dump_json(by_alias=True).encode()
+            return body, version
+
+        # The detailed schema has no ID to key the entries by
+        async with limit, local_session() as db:
+            result = await crud_warehouses.get_multi(db=db, limit=None, is_deleted=False)
+        ids = [warehouse.id for warehouse in _warehouses_adapter.validate_python(result["data"])]
+
+        # Reading them also fills the local cache with the entries Redis already has
+        cached = await cache.get_many(settings.WAREHOUSE_CACHE_KEY_PREFIX, ids)
+        missing = [warehouse_id for warehouse_id, body in zip(ids, cached, strict=True) if body is None]
+
+        rendered = await asyncio.gather(*(render(warehouse_id) for warehouse_id in missing))
+        loaded = {warehouse_id: entry for warehouse_id, entry in zip(missing, rendered, strict=True) if entry}
+        await cache.set_many(
+            settings.WAREHOUSE_CACHE_KEY_PREFIX,
+            {warehouse_id: body for warehouse_id, (body, _) in loaded.items()},
+            versions={warehouse_id: version for warehouse_id, (_, version) in loaded.items()},
+            expiration=settings.DETAIL_CACHE_EXPIRATION_SECONDS,
+            stale_while_revalidate=settings.DETAIL_CACHE_STALE_SECONDS,
+            jitter=settings.DETAIL_CACHE_JITTER,
+        )
+        return len(ids)
+
+    @staticmethod
+    async def _warm_recent_shipments(limit: asyncio.Semaphore) -> int:
+        async def warm_chunk(shipment_ids: list[int]) -> int:
+            # Reading the chunk also fills the local cache with the entries Redis already has
+            cached = await cache.get_many(settings.SHIPMENT_CACHE_KEY_PREFIX, shipment_ids)
+            missing = [shipment_id for shipment_id, body in zip(shipment_ids, cached, strict=True) if body is None]
+            if missing:
+                async with limit, local_session() as db:
+                    await service_shipments.cache_detailed(db=db, shipment_ids=missing)
+            return len(shipment_ids)
+
+        chunks = await CacheWarmupService._recent_shipment_chunks(limit)
+        return sum(await asyncio.gather(*(warm_chunk(chunk) for chunk in chunks)))
+
+    @staticmethod
+    async def _warm_shipment_statuses(limit: asyncio.Semaphore) -> int:
+        async def warm_chunk(shipment_ids: list[int]) -> int:
+            # Statuses missing from the hash are read from the database and written back
+            async with limit, local_session() as db:
+                return len(await service_shipment_status.get_statuses(db=db, shipment_ids=shipment_ids))
+
+        chunks = await CacheWarmupService._recent_shipment_chunks(limit)
+        return sum(await asyncio.gather(*(warm_chunk(chunk) for chunk in chunks)))
+
+
+service_cache_warmup = CacheWarmupService()
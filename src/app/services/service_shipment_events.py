@@ -0,0 +1,38 @@
+import logging
+from collections.abc import Sequence
+
+from ..core.config import settings
+from ..core.utils import queue
+from ..core.utils.pg_queue import PostgresJobQueue
+from ..schemas.shipment import ShipmentStatusChange
+
+logger = logging.getLogger(__name__)
+
+
+class ShipmentEventService:
+    @staticmethod
+    async def publish_status_changes(changes: Sequence[ShipmentStatusChange]) -> None:
+        """Publish shipment status changes for webhook delivery.
+
+        Publishing is best effort: the status change itself is already committed, so a Redis failure is
+        logged instead of being propagated to the caller.
+        """
+        # The events stream lives in Redis, which the Postgres queue backend does without
+        if not changes or queue.pool is None or isinstance(queue.pool, PostgresJobQueue):
+            return
+
+        try:
+            pipe = queue.pool.pipeline(transaction=False)
+            for change in changes:
+                pipe.xadd(
+                    settings.WEBHOOK_EVENTS_STREAM,
+                    {"data": change.model_dump_json()},
+                    maxlen=settings.WEBHOOK_EVENTS_STREAM_MAXLEN,
+                    approximate=True,
+                )
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish {len(changes)} shipment status changes: {e}", exc_info=True)
+
+
+service_shipment_events = ShipmentEventService()
@@ -0,0 +1,54 @@
+import uuid
+
+from redis.asyncio import Redis
+
+from ..core.config import settings
+from ..schemas.shipment import ShipmentCreate, ShipmentIngestState, ShipmentIngestStatus
+
+
+def ingest_result_key(pending_id: str) -> str:
+    return f"{settings.SHIPMENT_INGEST_RESULT_KEY_PREFIX}{pending_id}"
+
+
+class ShipmentIngestService:
+    @staticmethod
+    async def queue_shipment(redis: Redis, shipment: ShipmentCreate) -> str:
+        """Append a validated shipment to the ingest stream for the worker to insert, and return its pending id.
+
+        The pending id's state is written in the same MULTI as the stream entry, so a lookup right after the
+        request already sees it as queued.
+        """
+        pending_id = uuid.uuid4().hex
+        key = ingest_result_key(pending_id)
+
+        pipe = redis.pipeline(transaction=True)
+        pipe.hset(key, mapping={"state": ShipmentIngestState.QUEUED.value})
+        pipe.expire(key, settings.SHIPMENT_INGEST_RESULT_TTL_SECONDS)
+        pipe.xadd(
+            settings.SHIPMENT_INGEST_STREAM,
+            {"pending_id": pending_id, "shipment": shipment.model_dump_json()},
+            maxlen=settings.SHIPMENT_INGEST_STREAM_MAXLEN,
+            approximate=True,
+        )
+        await pipe.execute()
+
+        return pending_id
+
+    @staticmethod
+    async def get_status(redis: Redis, pending_id: str) -> ShipmentIngestStatus | None:
+        """Return the state of a queued shipment, or `None` if the pending id is unknown or has expired."""
+        fields = await redis.hgetall(ingest_result_key(pending_id))
+        if not fields:
+            return None
+
+        shipment_id = fields.get(b"shipment_id")
+        error = fields.get(b"error")
+        return ShipmentIngestStatus(
+            pending_id=pending_id,
+            state=ShipmentIngestState(fields[b"state"].decode()),
+            shipment_id=int(shipment_id) if shipment_id else None,
+            error=error.decode() if error else None,
+        )
+
+
+service_shipment_ingest = ShipmentIngestService()
@@ -0,0 +1,109 @@
+import logging
+from collections.abc import Sequence
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.utils import cache
+from ..crud.crud_shipments import crud_shipments
+from ..schemas.shipment import ShipmentStatus, ShipmentStatusChange, ShipmentStatusRead
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(status: ShipmentStatus | None, updated_at: datetime) -> str:
+    return f"{status.value if status else ''}|{updated_at.isoformat()}"
+
+
+def _decode(shipment_id: int, value: bytes) -> ShipmentStatusRead:
+    status, updated_at = value.decode().split("|", 1)
+    return ShipmentStatusRead(
+        id=shipment_id,
+        status=ShipmentStatus(status) if status else None,
+        updated_at=datetime.fromisoformat(updated_at),
+    )
+
+
+class ShipmentStatusService:
+    """Keep the current status of every shipment in one Redis hash, so status reads skip Postgres.
+
+    Every status write stores the committed status in `SHIPMENT_STATUS_HASH` as `<status>|<updated_at>` under the
+    shipment id. Writes are best effort: the hash is only a read path, so a Redis failure is logged and the next
+    read of that shipment falls back to the database and fills the entry in again. Status changes are also
+    published on `SHIPMENT_STATUS_CHANNEL` for the live status stream.
+    """
+
+    @staticmethod
+    async def record(changes: Sequence[ShipmentStatusChange]) -> None:
+        """Store committed status writes in the hash and publish the ones that changed the status on
+        `SHIPMENT_STATUS_CHANNEL`, for the API processes to push to their subscribers."""
+        if not changes or cache.client is None:
+            return
+
+        try:
+            pipe = cache.client.pipeline(transaction=False)
+            pipe.hset(
+                settings.SHIPMENT_STATUS_HASH,
+                mapping={str(change.shipment_id): _encode(change.new_status, change.changed_at) for change in changes},
+            )
+            for change in changes:
+                if change.new_status != change.old_status:
+                    pipe.publish(settings.SHIPMENT_STATUS_CHANNEL, change.model_dump_json())
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to record {len(changes)} shipment status writes: {e}", exc_info=True)
+
+    @staticmethod
+    async def forget(shipment_ids: Sequence[int]) -> None:
+        if not shipment_ids or cache.client is None:
+            return
+
+        try:
+            await cache.client.hdel(settings.SHIPMENT_STATUS_HASH, *map(str, shipment_ids))
+        except Exception as e:
+            logger.error(f"Failed to remove {len(shipment_ids)} shipment statuses: {e}", exc_info=True)
+
+    @staticmethod
+    async def get_statuses(db: AsyncSession, shipment_ids: Sequence[int]) -> list[ShipmentStatusRead]:
+        """Return the statuses of the given shipments in request order, leaving out unknown and deleted ones.
+
+        Ids missing from the hash are read from the database in one query and written back with HSETNX, so a
+        concurrent status write that got there first is not overwritten with the older value.
+        """
+        shipment_ids = list(dict.fromkeys(shipment_ids))
+        found: dict[int, ShipmentStatusRead] = {}
+
+        if cache.client is not None:
+            try:
+                values = await cache.client.hmget(settings.SHIPMENT_STATUS_HASH, [str(i) for i in shipment_ids])
+            except Exception as e:
+                logger.error(f"Failed to read shipment statuses, falling back to the database: {e}", exc_info=True)
+                values = [None] * len(shipment_ids)
+
+            found = {
+                shipment_id: _decode(shipment_id, value)
+                for shipment_id, value in zip(shipment_ids, values, strict=True)
+                if value is not None
+            }
+
+        missing = [shipment_id for shipment_id in shipment_ids if shipment_id not in found]
+        if missing:
+            rows = await crud_shipments.get_statuses(db=db, shipment_ids=missing)
+            loaded = [ShipmentStatusRead(id=row.id, status=row.status, updated_at=row.updated_at) for row in rows]
+            found.update((status.id, status) for status in loaded)
+
+            if loaded and cache.client is not None:
+                try:
+                    pipe = cache.client.pipeline(transaction=False)
+                    for status in loaded:
+                        value = _encode(status.status, status.updated_at)
+                        pipe.hsetnx(settings.SHIPMENT_STATUS_HASH, str(status.id), value)
+                    await pipe.execute()
+                except Exception as e:
+                    logger.error(f"Failed to backfill {len(loaded)} shipment statuses: {e}", exc_info=True)
+
+        return [found[shipment_id] for shipment_id in shipment_ids if shipment_id in found]
+
+
+service_shipment_status = ShipmentStatusService()
@@ -1,19 +1,28 @@
+import json
 from datetime import UTC, datetime
 
+from fastcrud import compute_offset, paginated_response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.exceptions.http_exceptions import NotFoundException
-from ..core.utils import queue
+from ..core.config import settings
+from ..core.exceptions.http_exceptions import ConflictException, NotFoundException
+from ..core.utils import cache, queue
+from ..core.utils.queue import tracking_job_id
 from ..crud.crud_addresses import crud_addresses
 from ..crud.crud_shipments import crud_shipments
-from ..crud.crud_warehouses import crud_warehouses
 from ..schemas.shipment import (
     Shipment,
     ShipmentCreate,
     ShipmentCreateInternal,
+    ShipmentRead,
+    ShipmentReadDetailed,
+    ShipmentStatusChange,
     ShipmentUpdate,
     ShipmentUpdateInternal,
 )
+from .service_shipment_status import service_shipment_status
+from .service_warehouse_registry import warehouse_registry
 
 
 class ShipmentService:
@@ -23,11 +32,7 @@ class ShipmentService:
         shipment: ShipmentCreate,
     ):
         async with db.begin():
-            warehouse = await crud_warehouses.get(
-                db=db,
-                id=shipment.warehouse_id,
-            )
-            if warehouse is None:
+            if not await warehouse_registry.exists(db=db, warehouse_id=shipment.warehouse_id):
                 raise NotFoundException("Warehouse not found")
 
             ship_to_address = await crud_addresses.create(
@@ -50,13 +55,20 @@ class ShipmentService:
                 service_code=shipment.service_code,
                 tracking_number=shipment.tracking_number,
                 status=shipment.status,
+                external_reference=shipment.external_reference,
             )
 
-            result = await crud_shipments.create(
-                db=db,
-                object=shipment_create,
-                commit=False,
-            )
+            try:
+                result = await crud_shipments.create(
+                    db=db,
+                    object=shipment_create,
+                    commit=False,
+                )
+            except IntegrityError as e:
+                # unique_violation: another shipment already has the external reference
+                if getattr(e.orig, "sqlstate", None) == "23505":
+                    raise ConflictException("Shipment with this external reference already exists") from e
+                raise
 
             if shipment.tracking_number and queue.pool is not None:
                 shipment_id = result.id
@@ -64,10 +76,24 @@ class ShipmentService:
                 await queue.pool.enqueue_job(
                     "update_shipment_tracking_status",
                     shipment_id,
+                    shipment.status,
                     _defer_by=60,  # 1 minute
+                    _job_id=tracking_job_id(shipment_id, shipment.status),
                 )
 
-            return result
+        # Drops a not-found entry cached while the ID did not exist yet
+        await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [result.id])
+        await service_shipment_status.record(
+            [
+                ShipmentStatusChange(
+                    shipment_id=result.id,
+                    warehouse_id=result.warehouse_id,
+                    new_status=result.status,
+                    changed_at=result.created_at,
+                )
+            ]
+        )
+        return result
 
     @staticmethod
     async def update_shipment(
@@ -88,11 +114,7 @@ class ShipmentService:
             ship_from_id = current_shipment.ship_from_id
 
             if shipment.warehouse_id is not None:
-                warehouse = await crud_warehouses.get(
-                    db=db,
-                    id=shipment.warehouse_id,
-                )
-                if warehouse is None:
+                if not await warehouse_registry.exists(db=db, warehouse_id=shipment.warehouse_id):
                     raise NotFoundException("Warehouse not found")
 
             if shipment.ship_to is not None:
@@ -133,12 +155,159 @@ class ShipmentService:
             if tracking_number is None:
                 tracking_number = current_shipment.tracking_number
 
+            status = shipment.status
+            if status is None:
+                status = current_shipment.status
+
             if tracking_number and queue.pool is not None:
                 await queue.pool.enqueue_job(
                     "update_shipment_tracking_status",
                     shipment_id,
+                    status,
                     _defer_by=60,  # 1 minute
+                    _job_id=tracking_job_id(shipment_id, status),
+                )
+
+        await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [shipment_id])
+        await service_shipment_status.record(
+            [
+                ShipmentStatusChange(
+                    shipment_id=shipment_id,
+                    warehouse_id=shipment.warehouse_id or current_shipment.warehouse_id,
+                    old_status=current_shipment.status,
+                    new_status=status,
+                    changed_at=shipment_update.updated_at,
                 )
+            ]
+        )
+
+    @staticmethod
+    async def upsert_shipment(
+        db: AsyncSession,
+        shipment: ShipmentCreate,
+    ) -> tuple[ShipmentRead, bool]:
+        """
+        Create or update the shipment with `shipment.external_reference`, returning it and whether it was created.
+
+        Resending an unchanged shipment writes nothing, so it neither records a status change nor enqueues tracking.
+        """
+        try:
+            async with db.begin():
+                row = await crud_shipments.upsert_by_reference(db=db, shipment=shipment)
+        except IntegrityError as e:
+            # foreign_key_violation: the warehouse does not exist
+            if getattr(e.orig, "sqlstate", None) == "23503":
+                raise NotFoundException("Warehouse not found") from e
+            raise
+
+        if row is None:
+            existing = await crud_shipments.get(
+                db=db,
+                external_reference=shipment.external_reference,
+                is_deleted=False,
+                schema_to_select=ShipmentRead,
+                return_as_model=True,
+            )
+            if existing is None:
+                # Deleted between the upsert and this read
+                raise NotFoundException("Shipment not found")
+            return existing, False
+
+        # A created shipment may have a not-found entry cached from before it existed
+        await cache.invalidate(settings.SHIPMENT_CACHE_KEY_PREFIX, [row.id])
+
+        if row.created or row.status != row.old_status:
+            await service_shipment_status.record(
+                [
+                    ShipmentStatusChange(
+                        shipment_id=row.id,
+                        warehouse_id=row.warehouse_id,
+                        old_status=row.old_status,
+                        new_status=row.status,
+                        changed_at=row.changed_at,
+                    )
+                ]
+            )
+
+            if row.tracking_number and queue.pool is not None:
+                await queue.pool.enqueue_job(
+                    "update_shipment_tracking_status",
+                    row.id,
+                    row.status,
+                    _defer_by=60,  # 1 minute
+                    _job_id=tracking_job_id(row.id, row.status),
+                )
+
+        return ShipmentRead.model_validate(row, from_attributes=True), row.created
+
+    @staticmethod
+    async def cache_detailed(
+        db: AsyncSession,
+        shipment_ids: list[int],
+    ) -> dict[int, bytes]:
+        """
+        Load shipments in one query and cache them as the detail read does, returning their JSON bodies by ID.
+
+        Unknown and deleted shipments are left out.
+        """
+        # Read before the shipments, so the versions stored with them are never newer than their bodies
+        versions = await crud_shipments.get_versions(db=db, ids=shipment_ids)
+        loaded = await crud_shipments.get_multi_detailed(
+            db=db,
+            limit=None,
+            return_total_count=False,
+            id__in=shipment_ids,
+        )
+        rendered: dict[int, bytes] = {}
+        tags: dict[int, list[str]] = {}
+        for row in loaded["data"]:
+            shipment = ShipmentReadDetailed.model_validate(row)
+            rendered[shipment.id] = shipment.model_dump_json(by_alias=True).encode()
+            tags[shipment.id] = [f"{settings.WAREHOUSE_SHIPMENTS_CACHE_TAG}:{shipment.warehouse_id}"]
+
+        await cache.set_many(
+            settings.SHIPMENT_CACHE_KEY_PREFIX,
+            rendered,
+            expiration=settings.DETAIL_CACHE_EXPIRATION_SECONDS,
+            tags=tags,
+            versions=versions,
+            stale_while_revalidate=settings.DETAIL_CACHE_STALE_SECONDS,
+            jitter=settings.DETAIL_CACHE_JITTER,
+        )
+        return rendered
+
+    @staticmethod
+    async def list_shipments_cached(
+        db: AsyncSession,
+        page: int,
+        items_per_page: int,
+    ) -> bytes:
+        """
+        Render a page of shipments as JSON from the shipment detail cache entries.
+
+        Only the page's IDs come from the database, plus the shipments missing from the cache, see `cache_detailed`;
+        a shipment change then only invalidates its own entry, not whole pages.
+        """
+        ids, total_count = await crud_shipments.get_page_ids(
+            db=db,
+            offset=compute_offset(page, items_per_page),
+            limit=items_per_page,
+        )
+
+        bodies = dict(zip(ids, await cache.get_many(settings.SHIPMENT_CACHE_KEY_PREFIX, ids), strict=True))
+        missing = [shipment_id for shipment_id, body in bodies.items() if body is None]
+        if missing:
+            bodies.update(await ShipmentService.cache_detailed(db=db, shipment_ids=missing))
+
+        # Shipments deleted since their IDs were read are left out
+        data = [body for body in bodies.values() if body is not None]
+        response = paginated_response(
+            crud_data={"data": [], "total_count": total_count},
+            page=page,
+            items_per_page=items_per_page,
+        )
+        meta = {key: value for key, value in response.items() if key != "data"}
+        return b'{"data":[' + b",".join(data) + b"]," + json.dumps(meta, separators=(",", ":")).encode()[1:]
 
 
 service_shipments = ShipmentService()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.db.database import local_session
+from ..core.utils import cache
+from ..core.utils.pubsub import consume_channel
+from ..crud.crud_warehouses import crud_warehouses
+from ..schemas.warehouse import Warehouse
+
+logger = logging.getLogger(__name__)
+
+_warehouses_adapter = TypeAdapter(list[Warehouse])
+
+
+class WarehouseRegistry:
+    """Process-local set of the existing warehouses, for validation without I/O.
+
+    The registry is loaded from the database when its pub/sub subscription starts, and reloaded whenever
+    `service_warehouses` publishes a new version on `WAREHOUSE_REGISTRY_CHANNEL` after a warehouse write. The
+    version is a Redis counter (`WAREHOUSE_REGISTRY_VERSION_KEY`), so a process only reloads for versions it has not
+    loaded yet. Any warehouse unknown to the registry is looked up in the database, so a warehouse created in another
+    process a moment ago is never rejected, and the registry is only trusted while its subscription is up.
+    """
+
+    def __init__(self) -> None:
+        self.version: int | None = None
+        self._ids: frozenset[int] = frozenset()
+        self._loaded = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def loaded(self) -> bool:
+        return self.running and self._loaded.is_set()
+
+    def start(self, client: Redis, channel: str, version_key: str) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._listen(client, channel, version_key))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._loaded.clear()
+
+    async def wait_loaded(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for the first load, returning whether the registry is loaded."""
+        try:
+            await asyncio.wait_for(self._loaded.wait(), timeout)
+        except TimeoutError:
+            logger.warning(f"Warehouse registry not loaded after {timeout}s, checking warehouses in the database")
+        return self.loaded
+
+    async def exists(self, db: AsyncSession, warehouse_id: int) -> bool:
+        """Whether the warehouse exists and is not deleted; answered from memory for every warehouse loaded."""
+        if self.loaded and warehouse_id in self._ids:
+            return True
+        return await crud_warehouses.exists(db=db, id=warehouse_id, is_deleted=False)
+
+    @staticmethod
+    async def publish_change() -> None:
+        """Bump the registry version and announce it to every process. Called after committed warehouse writes."""
+        if cache.client is None:
+            return
+
+        try:
+            version = await cache.client.incr(settings.WAREHOUSE_REGISTRY_VERSION_KEY)
+            await cache.client.publish(settings.WAREHOUSE_REGISTRY_CHANNEL, str(version))
+        except Exception as e:
+            logger.error(f"Failed to publish a warehouse registry change: {e}", exc_info=True)
+
+    async def _reload(self, client: Redis, version_key: str) -> None:
+        # The version is read first, so the warehouses loaded are at least as new as it
+        version = int(await client.get(version_key) or 0)
+        async with local_session() as db:
+            result = await crud_warehouses.get_multi(db=db, limit=None, is_deleted=False)
+
+        warehouses = _warehouses_adapter.validate_python(result["data"])
+        self._ids = frozenset(warehouse.id for warehouse in warehouses)
+        self.version = version
+        self._loaded.set()
+
+    async def _listen(self, client: Redis, channel: str, version_key: str) -> None:
+        async def reload() -> None:
+            # Changes published while unsubscribed were missed, so load everything again
+            await self._reload(client, version_key)
+
+        async def reload_if_new(data: bytes) -> None:
+            if int(data) != self.version:
+                await self._reload(client, version_key)
+
+        await consume_channel(client, channel, reload_if_new, on_subscribe=reload, on_error=self._loaded.clear)
+
+
+warehouse_registry = WarehouseRegistry()
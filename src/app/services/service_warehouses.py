@@ -2,7 +2,9 @@ from datetime import UTC, datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.config import settings
 from ..core.exceptions.http_exceptions import NotFoundException
+from ..core.utils import cache
 from ..crud.crud_addresses import crud_addresses
 from ..crud.crud_warehouses import crud_warehouses
 from ..schemas.warehouse import (
@@ -12,6 +14,7 @@ from ..schemas.warehouse import (
     WarehouseUpdate,
     WarehouseUpdateInternal,
 )
+from .service_warehouse_registry import warehouse_registry
 
 
 class WarehouseService:
@@ -50,7 +53,8 @@ class WarehouseService:
                 commit=False,
             )
 
-            return result
+        await warehouse_registry.publish_change()
+        return result
 
     @staticmethod
     async def update_warehouse(
@@ -101,5 +105,28 @@ class WarehouseService:
                 commit=False,
             )
 
+        await WarehouseService.invalidate_cache(warehouse_id=warehouse_id)
+
+    @staticmethod
+    async def delete_warehouse(
+        db: AsyncSession,
+        warehouse_id: int,
+    ) -> None:
+        await crud_warehouses.delete(
+            db=db,
+            id=warehouse_id,
+            allow_multiple=False,
+        )
+
+        await WarehouseService.invalidate_cache(warehouse_id=warehouse_id)
+
+    @staticmethod
+    async def invalidate_cache(warehouse_id: int) -> None:
+        """Drop the warehouse's cached detail read, and those of its shipments, which embed the warehouse, and have
+        every process reload its warehouse registry."""
+        await cache.invalidate(settings.WAREHOUSE_CACHE_KEY_PREFIX, [warehouse_id])
+        await cache.invalidate_tags([f"{settings.WAREHOUSE_SHIPMENTS_CACHE_TAG}:{warehouse_id}"])
+        await warehouse_registry.publish_change()
+
 
 service_warehouses = WarehouseService()
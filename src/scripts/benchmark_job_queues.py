@@ -0,0 +1,109 @@
+"""Compare enqueue and dequeue throughput of the ARQ (Redis) and Postgres queue backends.
+
+Both backends run the same no-op job on a dedicated benchmark queue, so real tracking jobs are not touched.
+
+Usage:
+    python -m src.scripts.benchmark_job_queues --jobs 20000 --concurrency 50 --max-jobs 100 --backend both
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any
+
+from arq import create_pool
+from arq.connections import RedisSettings
+from arq.worker import Worker
+
+from ..app.core.config import settings
+from ..app.core.utils.pg_queue import PostgresJobQueue
+from ..app.core.worker.postgres_worker import PostgresWorker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCHMARK_QUEUE = "benchmark:queue"
+
+
+async def benchmark_noop(ctx: dict[str, Any], i: int) -> None:
+    return None
+
+
+async def enqueue_all(enqueue_job: Any, jobs: int, concurrency: int) -> float:
+    pending = iter(range(jobs))
+
+    async def producer() -> None:
+        for i in pending:
+            await enqueue_job("benchmark_noop", i, _queue_name=BENCHMARK_QUEUE)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(producer() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def report(backend: str, jobs: int, enqueue_seconds: float, dequeue_seconds: float) -> None:
+    logger.info(
+        f"{backend}: enqueued {jobs} jobs in {enqueue_seconds:.2f}s ({jobs / enqueue_seconds:.0f}/s), "
+        f"ran them in {dequeue_seconds:.2f}s ({jobs / dequeue_seconds:.0f}/s)"
+    )
+
+
+async def benchmark_arq(args: argparse.Namespace) -> None:
+    pool = await create_pool(
+        RedisSettings(host=settings.REDIS_QUEUE_HOST, port=settings.REDIS_QUEUE_PORT),
+        default_queue_name=BENCHMARK_QUEUE,
+    )
+    try:
+        enqueue_seconds = await enqueue_all(pool.enqueue_job, args.jobs, args.concurrency)
+
+        worker = Worker(
+            functions=[benchmark_noop],
+            queue_name=BENCHMARK_QUEUE,
+            redis_pool=pool,
+            max_jobs=args.max_jobs,
+            burst=True,
+            handle_signals=False,
+            keep_result=0,
+            poll_delay=0.01,
+        )
+        started = time.perf_counter()
+        await worker.main()
+        dequeue_seconds = time.perf_counter() - started
+        await worker.close()
+    finally:
+        await pool.aclose()  # type: ignore
+
+    report("arq", args.jobs, enqueue_seconds, dequeue_seconds)
+
+
+async def benchmark_postgres(args: argparse.Namespace) -> None:
+    queue = PostgresJobQueue(default_queue_name=BENCHMARK_QUEUE)
+    enqueue_seconds = await enqueue_all(queue.enqueue_job, args.jobs, args.concurrency)
+
+    worker = PostgresWorker(functions=[benchmark_noop], queue_name=BENCHMARK_QUEUE, max_jobs=args.max_jobs, burst=True)
+    started = time.perf_counter()
+    await worker.run()
+    dequeue_seconds = time.perf_counter() - started
+
+    report("postgres", args.jobs, enqueue_seconds, dequeue_seconds)
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.backend in ("arq", "both"):
+        await benchmark_arq(args)
+    if args.backend in ("postgres", "both"):
+        await benchmark_postgres(args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["arq", "postgres", "both"], default="both")
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent enqueuers")
+    parser.add_argument("--max-jobs", type=int, default=100, help="Worker concurrency")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Generate carrier tracking events against the webhook endpoint and report the sustained ingestion rate.
+
+Usage:
+    python -m src.scripts.generate_carrier_events --events 100000 --batch-size 100 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from datetime import UTC, datetime
+
+import httpx
+from sqlalchemy import select
+
+from ..app.core.db.database import local_session
+from ..app.models.shipment import Shipment
+from ..app.schemas.shipment import TERMINAL_SHIPMENT_STATUSES, ShipmentStatus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NON_TERMINAL_STATUSES = [status for status in ShipmentStatus if status not in TERMINAL_SHIPMENT_STATUSES]
+
+
+async def load_tracking_numbers(limit: int) -> list[str]:
+    async with local_session() as db:
+        result = await db.execute(
+            select(Shipment.tracking_number)
+            .where(Shipment.tracking_number.is_not(None), Shipment.is_deleted.is_(False))
+            .limit(limit)
+        )
+        return [tracking_number for tracking_number in result.scalars() if tracking_number]
+
+
+def build_batch(tracking_numbers: list[str], batch_size: int) -> dict:
+    now = datetime.now(UTC).isoformat()
+    return {
+        "events": [
+            {
+                "tracking_number": random.choice(tracking_numbers),
+                "status": random.choice(NON_TERMINAL_STATUSES).value,
+                "occurred_at": now,
+            }
+            for _ in range(batch_size)
+        ]
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.synthetic:
+        tracking_numbers = [f"BENCH{i:012d}" for i in range(args.tracking_numbers)]
+    else:
+        tracking_numbers = await load_tracking_numbers(args.tracking_numbers)
+        if not tracking_numbers:
+            logger.error("No shipments with tracking numbers found, rerun with --synthetic")
+            return
+
+    batches = max(1, args.events // args.batch_size)
+    pending = iter(range(batches))
+    latencies: list[float] = []
+    failures = 0
+
+    headers = {"X-Webhook-Token": args.token} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, headers=headers, limits=limits, timeout=30) as client:
+
+        async def sender() -> None:
+            nonlocal failures
+            for _ in pending:
+                payload = build_batch(tracking_numbers, args.batch_size)
+                started = time.perf_counter()
+                response = await client.post("/api/v1/carrier-webhooks/tracking", json=payload)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 202:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(sender() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    sent = batches * args.batch_size
+    logger.info(f"Sent {sent} events in {batches} requests over {elapsed:.2f}s ({sent / elapsed:.0f} events/s)")
+    logger.info(
+        f"Request latency p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms, failed requests: {failures}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default=None, help="Value for the X-Webhook-Token header")
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tracking-numbers", type=int, default=10_000, help="Size of the tracking number pool")
+    parser.add_argument("--synthetic", action="store_true", help="Use made-up tracking numbers instead of the DB")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
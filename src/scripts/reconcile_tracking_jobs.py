@@ -0,0 +1,123 @@
+"""Rebuild tracking jobs for every active shipment, e.g. after a Redis failover lost the deferred ones.
+
+Shipments that are not deleted, not in a terminal state and have a tracking number are streamed from a server-side
+cursor and written to the background queue in pipelined batches. Every job is an ARQ job with the id every scheduled
+tracking update uses (`tracking_job_id`), so neither rerunning the command nor a shipment whose update is still queued
+ends up with a second job. By default, existing jobs are left alone (SET NX / ZADD NX); `--reschedule` overwrites them
+with the new schedule.
+
+Usage:
+    python -m src.scripts.reconcile_tracking_jobs --batch-size 5000 --spread-seconds 300
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import zlib
+from typing import Any
+
+from arq.constants import job_key_prefix
+from arq.jobs import serialize_job
+from redis.asyncio import Redis
+from sqlalchemy import func, or_, select
+
+from ..app.core.config import settings
+from ..app.core.db.database import local_session
+from ..app.core.utils.queue import tracking_job_id
+from ..app.core.worker.settings import WorkerSettings
+from ..app.models.shipment import Shipment
+from ..app.schemas.shipment import TERMINAL_SHIPMENT_STATUSES
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FUNCTION_NAME = "update_shipment_tracking_status"
+EXPIRES_EXTRA_MS = 86_400_000  # ARQ's default: keep a job for a day past its scheduled time
+
+ACTIVE_SHIPMENTS = (
+    Shipment.is_deleted.is_(False),
+    Shipment.tracking_number != "",  # also false for NULL
+    or_(Shipment.status.is_(None), Shipment.status.not_in(TERMINAL_SHIPMENT_STATUSES)),
+)
+
+
+def spread_offset_ms(shipment_id: int, spread_seconds: int) -> int:
+    """Deterministic offset that spreads the rebuilt jobs over `spread_seconds` instead of firing them at once."""
+    if spread_seconds <= 0:
+        return 0
+    return zlib.crc32(str(shipment_id).encode()) % (spread_seconds * 1000)
+
+
+async def write_batch(redis: Redis, rows: list[Any], args: argparse.Namespace) -> None:
+    now_ms = int(time.time() * 1000)
+    serializer = getattr(WorkerSettings, "job_serializer", None)
+
+    pipe = redis.pipeline(transaction=False)
+    for shipment_id, status in rows:
+        job_id = tracking_job_id(shipment_id, status)
+        score = now_ms + spread_offset_ms(shipment_id, args.spread_seconds)
+        job = serialize_job(FUNCTION_NAME, (shipment_id, status), {}, None, now_ms, serializer=serializer)
+
+        pipe.set(job_key_prefix + job_id, job, px=score - now_ms + EXPIRES_EXTRA_MS, nx=not args.reschedule)
+        pipe.zadd(args.queue_name, {job_id: score}, nx=not args.reschedule)
+    await pipe.execute()
+
+
+async def run(args: argparse.Namespace) -> None:
+    redis = Redis(host=settings.REDIS_QUEUE_HOST, port=settings.REDIS_QUEUE_PORT)
+
+    async with local_session() as db:
+        total = (await db.execute(select(func.count()).select_from(Shipment).where(*ACTIVE_SHIPMENTS))).scalar_one()
+        logger.info(f"Reconciling tracking jobs for {total} shipments into {args.queue_name}")
+
+        stream = await db.stream(
+            select(Shipment.id, Shipment.status)
+            .where(*ACTIVE_SHIPMENTS)
+            .order_by(Shipment.id)
+            .execution_options(yield_per=args.batch_size)
+        )
+
+        # Redis writes overlap with fetching the next batch, with at most `--in-flight` pipelines outstanding
+        in_flight: set[asyncio.Task[None]] = set()
+        written = 0
+        started = last_report = time.perf_counter()
+
+        async for partition in stream.partitions(args.batch_size):
+            if len(in_flight) >= args.in_flight:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+
+            rows = [(shipment_id, status.value if status else None) for shipment_id, status in partition]
+            in_flight.add(asyncio.create_task(write_batch(redis, rows, args)))
+            written += len(rows)
+
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                rate = written / (now - started)
+                eta = (total - written) / rate if rate else 0
+                logger.info(f"{written}/{total} shipments ({rate:.0f}/s, ~{eta:.0f}s left)")
+                last_report = now
+
+        await asyncio.gather(*in_flight)
+
+    await redis.aclose()  # type: ignore
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Reconciled {written} shipments in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.0f}/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue-name", default=settings.REDIS_QUEUE_BACKGROUND_NAME)
+    parser.add_argument("--batch-size", type=int, default=5_000, help="Rows per cursor fetch and Redis pipeline")
+    parser.add_argument("--in-flight", type=int, default=4, help="Redis pipelines outstanding at once")
+    parser.add_argument("--spread-seconds", type=int, default=300, help="Spread the jobs' first run over this window")
+    parser.add_argument("--reschedule", action="store_true", help="Overwrite jobs that already exist")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between progress reports")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import asyncio
+import gzip
+import json
+from typing import Annotated
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.api.v1.batch import router as batch_router
+from src.app.core.db.database import async_get_db
+from src.app.core.exceptions.http_exceptions import NotFoundException
+from src.app.core.utils import cache
+
+events: list[str] = []
+sessions: list[AsyncSession] = []
+
+items_router = APIRouter(prefix="/items")
+
+
+@items_router.get("/{item_id}")
+async def read_item(item_id: int) -> dict:
+    events.append(f"read {item_id} start")
+    await asyncio.sleep(0.01)
+    events.append(f"read {item_id} end")
+    if item_id == 404:
+        raise NotFoundException("Item not found")
+    return {"id": item_id}
+
+
+@items_router.get("/{item_id}/details")
+@cache.cache(key_prefix="item", resource_id_name="item_id")
+async def read_item_details(request: Request, item_id: int) -> dict:
+    raise AssertionError("served from the cache")
+
+
+@items_router.post("", status_code=201)
+async def create_item(item: dict, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
+    events.append(f"write {item['name']}")
+    sessions.append(db)
+    return item
+
+
+@items_router.put("/{item_id}")
+async def replace_item(item_id: int, item: dict, db: Annotated[AsyncSession, Depends(async_get_db)]) -> dict:
+    events.append(f"write {item['name']}")
+    raise RuntimeError("unexpected failure")
+
+
+def _app() -> FastAPI:
+    v1 = APIRouter(prefix="/api/v1")
+    v1.include_router(items_router)
+    v1.include_router(batch_router)
+    app = FastAPI()
+    app.include_router(v1)
+    return app
+
+
+@pytest.fixture
+def batch_client():
+    events.clear()
+    sessions.clear()
+    return AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test")
+
+
+class TestBatch:
+    @pytest.mark.asyncio
+    async def test_reads_run_concurrently_and_writes_in_order(self, batch_client):
+        async with batch_client as client:
+            response = await client.post(
+                "/api/v1/batch",
+                json={
+                    "operations": [
+                        {"id": "r1", "method": "GET", "path": "/items/1"},
+                        {"id": "r2", "method": "GET", "path": "/items/2"},
+                        {"id": "w1", "method": "POST", "path": "/items", "body": {"name": "a"}},
+                        {"id": "w2", "method": "POST", "path": "/items", "body": {"name": "b"}},
+                        {"id": "r3", "method": "GET", "path": "/items/404"},
+                    ]
+                },
+            )
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"id": "r1", "status": 200, "body": {"id": 1}},
+            {"id": "r2", "status": 200, "body": {"id": 2}},
+            {"id": "w1", "status": 201, "body": {"name": "a"}},
+            {"id": "w2", "status": 201, "body": {"name": "b"}},
+            {"id": "r3", "status": 404, "body": {"detail": "Item not found"}},
+        ]
+        # Both reads started before either finished, and neither write overlapped them
+        assert events[:2] == ["read 1 start", "read 2 start"]
+        assert events[4:7] == ["write a", "write b", "read 404 start"]
+        assert sessions[0] is sessions[1]
+
+    @pytest.mark.asyncio
+    async def test_nested_batches_rejected(self, batch_client):
+        async with batch_client as client:
+            response = await client.post(
+                "/api/v1/batch",
+                json={"operations": [{"method": "POST", "path": "/batch", "body": {"operations": []}}]},
+            )
+
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_unhandled_error_fails_only_its_operation(self, batch_client):
+        with (
+            patch.object(AsyncSession, "in_transaction", return_value=True),
+            patch.object(AsyncSession, "commit", AsyncMock()) as commit,
+            patch.object(AsyncSession, "rollback", AsyncMock()) as rollback,
+        ):
+            async with batch_client as client:
+                response = await client.post(
+                    "/api/v1/batch",
+                    json={
+                        "operations": [
+                            {"id": "w1", "method": "PUT", "path": "/items/1", "body": {"name": "a"}},
+                            {"id": "w2", "method": "POST", "path": "/items", "body": {"name": "b"}},
+                        ]
+                    },
+                )
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"id": "w1", "status": 500, "body": {"detail": "Internal Server Error"}},
+            {"id": "w2", "status": 201, "body": {"name": "b"}},
+        ]
+        rollback.assert_awaited_once()
+        commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_compressed_cache_entries_decoded(self, batch_client):
+        details = {"id": 1, "description": "x" * 2048}
+        # Large enough to be stored compressed
+        client = Mock(get=AsyncMock(return_value=b"\x01" + gzip.compress(json.dumps(details).encode())))
+
+        with patch.object(cache, "client", client):
+            async with batch_client as http:
+                response = await http.post(
+                    "/api/v1/batch",
+                    json={"operations": [{"id": "r1", "method": "GET", "path": "/items/1/details"}]},
+                    headers={"Accept-Encoding": "gzip"},
+                )
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [{"id": "r1", "status": 200, "body": details}]
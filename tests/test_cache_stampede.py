@@ -0,0 +1,84 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.core.utils import cache
+
+
+@pytest.fixture
+def cache_client():
+    client = Mock()
+    client.get = AsyncMock(return_value=None)
+    client.set = AsyncMock(return_value=True)
+    client.register_script = Mock(return_value=AsyncMock())
+    client.pipeline = Mock(return_value=Mock(execute=AsyncMock(return_value=[None, -2])))
+    with patch.object(cache, "client", client):
+        yield client
+
+
+class TestCacheStampede:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, cache_client):
+        calls = 0
+
+        @cache.cache(key_prefix="shipment", resource_id_name="shipment_id")
+        async def read(request, shipment_id: int) -> dict:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"id": shipment_id}
+
+        responses = await asyncio.gather(*(read(Mock(method="GET", headers={}), shipment_id=5) for _ in range(5)))
+
+        assert calls == 1
+        assert [json.loads(response.body) for response in responses] == [{"id": 5}] * 5
+        assert cache._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_another_request_refreshes_it(self, cache_client):
+        pipe = cache_client.pipeline.return_value
+        # 5 seconds left of the 30 second stale window
+        pipe.execute = AsyncMock(return_value=[b"\x00" + json.dumps({"id": 5, "v": 1}).encode(), 5_000])
+        cache_client.set = AsyncMock(return_value=None)  # the refresh lock is taken
+        read_db = AsyncMock(return_value={"id": 5, "v": 2})
+
+        @cache.cache(key_prefix="shipment", resource_id_name="shipment_id", stale_while_revalidate=30)
+        async def read(request, shipment_id: int) -> dict:
+            return await read_db()
+
+        response = await read(Mock(method="GET", headers={}), shipment_id=5)
+        assert json.loads(response.body) == {"id": 5, "v": 1}
+        read_db.assert_not_awaited()
+
+        cache_client.set = AsyncMock(return_value=True)
+        response = await read(Mock(method="GET", headers={}), shipment_id=5)
+        assert json.loads(response.body) == {"id": 5, "v": 2}
+        read_db.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lock_waiter_uses_the_holders_entry(self, cache_client):
+        cache_client.set = AsyncMock(return_value=None)
+        cache_client.get = AsyncMock(side_effect=[None, None, b"\x00" + json.dumps({"id": 5}).encode()])
+        read_db = AsyncMock()
+
+        @cache.cache(key_prefix="shipment", resource_id_name="shipment_id", lock_timeout=1)
+        async def read(request, shipment_id: int) -> dict:
+            return await read_db()
+
+        response = await read(Mock(method="GET", headers={}), shipment_id=5)
+        assert json.loads(response.body) == {"id": 5}
+        read_db.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_expiration_jittered(self, cache_client):
+        @cache.cache(key_prefix="shipment", resource_id_name="shipment_id", expiration=100, jitter=0.2)
+        async def read(request, shipment_id: int) -> dict:
+            return {"id": shipment_id}
+
+        with patch("src.app.core.utils.cache.random.uniform", return_value=20.0) as uniform:
+            await read(Mock(method="GET", headers={}), shipment_id=5)
+
+        uniform.assert_called_once_with(0, 20.0)
+        cache_client.set.assert_awaited_once_with("shipment:5", b'\x00{"id":5}', ex=120)
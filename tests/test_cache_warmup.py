@@ -0,0 +1,101 @@
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.app.services.service_cache_warmup import service_cache_warmup
+
+MODULE = "src.app.services.service_cache_warmup"
+ADDRESS = {
+    "name": "Margie McMiller",
+    "address_line1": "3800 North Lamar",
+    "city_locality": "Austin",
+    "state_province": "TX",
+    "postal_code": 78652,
+}
+WAREHOUSE_ROW = {"name": "Main", "origin_address_id": 1, "return_address_id": 2, "created_at": "2026-10-19T00:00:00Z"}
+VERSION = datetime(2026, 10, 19, tzinfo=UTC)
+WAREHOUSE = {
+    "name": "Main",
+    "created_at": "2026-10-19T00:00:00Z",
+    "origin_address": ADDRESS,
+    "return_address": ADDRESS,
+}
+
+
+@pytest.fixture
+def session():
+    db = MagicMock()
+    with patch(f"{MODULE}.local_session", return_value=db):
+        yield db.__aenter__.return_value
+
+
+class TestCacheWarmup:
+    @pytest.mark.asyncio
+    async def test_hot_sets_loaded_skipping_entries_already_cached(self, session):
+        with (
+            patch(f"{MODULE}.crud_warehouses") as mock_warehouses,
+            patch(f"{MODULE}.crud_shipments") as mock_shipments,
+            patch(f"{MODULE}.cache") as mock_cache,
+            patch(f"{MODULE}.service_shipments") as mock_service,
+            patch(f"{MODULE}.service_shipment_status") as mock_statuses,
+            patch(f"{MODULE}.settings.CACHE_WARMUP_CHUNK_SIZE", 2),
+        ):
+            rows = [{**WAREHOUSE_ROW, "id": warehouse_id} for warehouse_id in (1, 2, 3)]
+            mock_warehouses.get_multi = AsyncMock(return_value={"data": rows})
+            # Warehouse 2 was deleted in the meantime
+            mock_warehouses.get_version = AsyncMock(side_effect=[VERSION, None])
+            mock_warehouses.get_detailed = AsyncMock(side_effect=[WAREHOUSE, None])
+            mock_shipments.get_recent_ids = AsyncMock(return_value=[9, 8, 7])
+            # Warehouse 3 and shipment 9 are already cached
+            cached = {("warehouse", 3): b"{}", ("shipment", 9): b"{}"}
+            mock_cache.get_many = AsyncMock(
+                side_effect=lambda prefix, ids: [cached.get((prefix, resource_id)) for resource_id in ids]
+            )
+            mock_cache.set_many = AsyncMock()
+            mock_service.cache_detailed = AsyncMock()
+            mock_statuses.get_statuses = AsyncMock(side_effect=lambda db, shipment_ids: shipment_ids)
+
+            await service_cache_warmup.warm_up(
+                ["warehouses", "recent_shipments", "shipment_statuses"], concurrency=2, budget_seconds=5
+            )
+
+        prefix, bodies = mock_cache.set_many.await_args.args
+        assert prefix == "warehouse"
+        assert list(bodies) == [1]
+        assert mock_cache.set_many.await_args.kwargs["versions"] == {1: VERSION}
+        assert mock_warehouses.get_detailed.await_count == 2
+        loaded = [call.kwargs["shipment_ids"] for call in mock_service.cache_detailed.await_args_list]
+        assert loaded == [[8], [7]]
+        statuses = [call.kwargs["shipment_ids"] for call in mock_statuses.get_statuses.await_args_list]
+        assert statuses == [[9, 8], [7]]
+
+    @pytest.mark.asyncio
+    async def test_failed_set_does_not_stop_the_others(self, session):
+        with (
+            patch(f"{MODULE}.crud_warehouses") as mock_warehouses,
+            patch(f"{MODULE}.crud_shipments") as mock_shipments,
+            patch(f"{MODULE}.service_shipment_status") as mock_statuses,
+        ):
+            mock_warehouses.get_multi = AsyncMock(side_effect=ConnectionError("db down"))
+            mock_shipments.get_recent_ids = AsyncMock(return_value=[1])
+            mock_statuses.get_statuses = AsyncMock(return_value=[])
+
+            await service_cache_warmup.warm_up(
+                ["warehouses", "shipment_statuses", "unknown"], concurrency=1, budget_seconds=5
+            )
+
+        mock_statuses.get_statuses.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_the_budget(self, session):
+        async def slow(**kwargs):
+            await asyncio.sleep(10)
+
+        with patch(f"{MODULE}.crud_warehouses") as mock_warehouses:
+            mock_warehouses.get_multi = slow
+
+            await asyncio.wait_for(
+                service_cache_warmup.warm_up(["warehouses"], concurrency=1, budget_seconds=0.05), timeout=1
+            )
@@ -0,0 +1,146 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1.carrier_webhooks import receive_tracking_events
+from src.app.core.exceptions.http_exceptions import ServiceUnavailableException, UnauthorizedException
+from src.app.core.worker.carrier_events import _latest_event_per_tracking_number, apply_carrier_events
+from src.app.crud.crud_shipments import crud_shipments
+from src.app.schemas.shipment import ShipmentStatus
+from src.app.schemas.tracking_event import CarrierTrackingEvent, CarrierTrackingEventBatch
+
+
+def _batch(*tracking_numbers: str) -> CarrierTrackingEventBatch:
+    return CarrierTrackingEventBatch(
+        events=[
+            CarrierTrackingEvent(
+                tracking_number=tracking_number,
+                status=ShipmentStatus.IN_TRANSIT,
+                occurred_at=datetime(2026, 1, 22, 13, 0, tzinfo=UTC),
+            )
+            for tracking_number in tracking_numbers
+        ]
+    )
+
+
+def _entry(tracking_number: str, status: str, occurred_at: str) -> tuple[bytes, dict[bytes, bytes]]:
+    return (
+        b"1-0",
+        {
+            b"tracking_number": tracking_number.encode(),
+            b"status": status.encode(),
+            b"occurred_at": occurred_at.encode(),
+        },
+    )
+
+
+class TestReceiveTrackingEvents:
+    @pytest.mark.asyncio
+    async def test_events_appended_in_one_pipeline(self):
+        with patch("src.app.api.v1.carrier_webhooks.queue") as mock_queue:
+            mock_pipe = Mock()
+            mock_pipe.execute = AsyncMock(return_value=[])
+            mock_queue.pool.pipeline = Mock(return_value=mock_pipe)
+
+            result = await receive_tracking_events(_batch("TRACK1", "TRACK2"))
+
+            assert result.accepted == 2
+            assert mock_pipe.xadd.call_count == 2
+            mock_pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_queue_unavailable(self):
+        with patch("src.app.api.v1.carrier_webhooks.queue") as mock_queue:
+            mock_queue.pool = None
+
+            with pytest.raises(ServiceUnavailableException):
+                await receive_tracking_events(_batch("TRACK1"))
+
+    @pytest.mark.asyncio
+    async def test_invalid_token_rejected(self):
+        with patch("src.app.api.v1.carrier_webhooks.settings") as mock_settings:
+            mock_settings.CARRIER_WEBHOOK_TOKEN.get_secret_value.return_value = "secret"
+
+            with pytest.raises(UnauthorizedException):
+                await receive_tracking_events(_batch("TRACK1"), x_webhook_token="wrong")
+
+
+class TestApplyCarrierEvents:
+    def test_latest_event_wins_per_tracking_number(self):
+        events = _latest_event_per_tracking_number(
+            [
+                _entry("TRACK1", "in_transit", "2026-01-22T13:00:00+00:00"),
+                _entry("TRACK1", "shipped", "2026-01-22T12:00:00+00:00"),
+                _entry("TRACK2", "shipped", "2026-01-22T12:00:00"),
+                _entry("TRACK2", "delivered", "2026-01-22T14:00:00+00:00"),
+            ]
+        )
+
+        assert events == {
+            "TRACK1": (datetime(2026, 1, 22, 13, 0, tzinfo=UTC), ShipmentStatus.IN_TRANSIT),
+            "TRACK2": (datetime(2026, 1, 22, 14, 0, tzinfo=UTC), ShipmentStatus.DELIVERED),
+        }
+
+    def test_malformed_events_skipped(self):
+        events = _latest_event_per_tracking_number(
+            [
+                _entry("TRACK1", "teleported", "2026-01-22T13:00:00+00:00"),
+                (b"2-0", {b"status": b"shipped"}),
+            ]
+        )
+
+        assert events == {}
+
+    @pytest.mark.asyncio
+    async def test_batch_applied_in_one_update(self, mock_db):
+        mock_db.commit = AsyncMock()
+
+        with patch("src.app.core.worker.carrier_events.crud_shipments") as mock_crud:
+            mock_crud.update_status_by_tracking_number = AsyncMock(return_value=[])
+
+            with patch("src.app.core.worker.carrier_events.local_session") as mock_session:
+                mock_session.return_value.__aenter__.return_value = mock_db
+                mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+                await apply_carrier_events(
+                    [
+                        _entry("TRACK1", "shipped", "2026-01-22T12:00:00+00:00"),
+                        _entry("TRACK2", "in_transit", "2026-01-22T12:00:00+00:00"),
+                    ]
+                )
+
+                mock_crud.update_status_by_tracking_number.assert_awaited_once_with(
+                    db=mock_db,
+                    events={
+                        "TRACK1": (datetime(2026, 1, 22, 12, 0, tzinfo=UTC), ShipmentStatus.SHIPPED),
+                        "TRACK2": (datetime(2026, 1, 22, 12, 0, tzinfo=UTC), ShipmentStatus.IN_TRANSIT),
+                    },
+                )
+                mock_db.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_events_older_than_the_last_applied_dropped(self, mock_db):
+        # One row's status changed; the other only had its event time moved forward
+        mock_db.execute = AsyncMock(
+            return_value=Mock(
+                all=Mock(
+                    return_value=[
+                        Mock(id=1, status=ShipmentStatus.SHIPPED, old_status=ShipmentStatus.PROCESSING),
+                        Mock(id=2, status=ShipmentStatus.SHIPPED, old_status=ShipmentStatus.SHIPPED),
+                    ]
+                )
+            )
+        )
+        occurred_at = datetime(2026, 1, 22, 12, 0, tzinfo=UTC)
+
+        changed = await crud_shipments.update_status_by_tracking_number(
+            db=mock_db,
+            events={"TRACK1": (occurred_at, ShipmentStatus.SHIPPED), "TRACK2": (occurred_at, ShipmentStatus.SHIPPED)},
+        )
+
+        assert [row.id for row in changed] == [1]
+        sql = str(mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "(shipment.carrier_event_at IS NULL OR shipment.carrier_event_at < changes.occurred_at)" in sql
+        assert "carrier_event_at=changes.occurred_at" in sql
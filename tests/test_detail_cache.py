@@ -0,0 +1,153 @@
+import gzip
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.api.v1.shipments import read_shipment
+from src.app.core.exceptions.http_exceptions import NotFoundException
+from src.app.core.utils import cache
+from src.app.services.service_warehouses import service_warehouses
+
+ADDRESS = {
+    "name": "Margie McMiller",
+    "address_line1": "3800 North Lamar",
+    "city_locality": "Austin",
+    "state_province": "TX",
+    "postal_code": 78652,
+}
+CREATED_AT = datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def _detailed_shipment() -> dict:
+    return {
+        "id": 5,
+        "warehouse_id": 7,
+        "ship_to_id": 1,
+        "ship_from_id": 2,
+        "created_at": CREATED_AT,
+        # Long enough to be stored compressed
+        "warehouse": {"name": "Warehouse 1" * 100, "created_at": CREATED_AT},
+        "ship_to": ADDRESS,
+        "ship_from": ADDRESS,
+        "internal_note": "not part of the response model",
+    }
+
+
+@pytest.fixture
+def cache_client():
+    client = Mock()
+    client.get = AsyncMock(return_value=None)
+    client.set = AsyncMock(return_value=True)
+    client.delete = AsyncMock()
+    client.pipeline = Mock(return_value=Mock(execute=AsyncMock(return_value=[None, -2])))
+    with patch.object(cache, "client", client):
+        yield client
+
+
+@pytest.fixture
+def versioned_db(mock_db):
+    # A miss looks the version up before loading, to store it with the entry
+    mock_db.execute = AsyncMock(return_value=Mock(scalar_one_or_none=Mock(return_value=CREATED_AT)))
+    return mock_db
+
+
+class TestDetailCache:
+    @pytest.mark.asyncio
+    async def test_detail_read_served_from_cache(self, cache_client, versioned_db):
+        pipe = cache_client.pipeline.return_value
+        pipe.execute = AsyncMock(return_value=[b"\x00" + json.dumps({"id": 5}).encode(), 200_000])
+
+        with patch("src.app.api.v1.shipments.crud_shipments") as mock_crud:
+            mock_crud.get_detailed = AsyncMock()
+
+            response = await read_shipment(Mock(method="GET", headers={}), shipment_id=5, db=versioned_db)
+
+            mock_crud.get_detailed.assert_not_awaited()
+        pipe.get.assert_called_once_with("shipment:5")
+        assert json.loads(response.body) == {"id": 5}
+
+    @pytest.mark.asyncio
+    async def test_detail_read_rendered_once_and_filed_under_its_warehouse_tag(self, cache_client, versioned_db):
+        script = AsyncMock()
+        cache_client.register_script = Mock(return_value=script)
+
+        with (
+            patch("src.app.api.v1.shipments.crud_shipments") as mock_crud,
+            patch("src.app.core.utils.cache.random.uniform", return_value=0),
+        ):
+            mock_crud.get_detailed = AsyncMock(return_value=_detailed_shipment())
+
+            response = await read_shipment(
+                Mock(method="GET", headers={"accept-encoding": "gzip"}), shipment_id=5, db=versioned_db
+            )
+
+        # Stored with its version and gzipped, for expiration plus the stale window
+        keys, (entry, ttl) = script.await_args_list[0].kwargs.values()
+        assert keys == ["shipment:5", "warehouse_shipments:7"]
+        version, entry = entry[:9], entry[9:]
+        assert version == b"\x03" + int(CREATED_AT.timestamp() * 1_000_000).to_bytes(8, "big")
+        assert (entry[:1], ttl) == (b"\x01", 330)
+        body = json.loads(gzip.decompress(entry[1:]))
+        assert body["warehouse"]["name"] == "Warehouse 1" * 100
+        assert "internal_note" not in body
+        # Sent without decompressing it, since the client accepts gzip
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.body == entry[1:]
+        assert response.headers["etag"].endswith('-gzip"')
+        assert cache.VERSION_HEADER not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_absent_shipment_cached_as_not_found(self, cache_client, mock_db):
+        # The version lookup finds no shipment either
+        mock_db.execute = AsyncMock(return_value=Mock(scalar_one_or_none=Mock(return_value=None)))
+        cache_client.register_script = Mock(return_value=AsyncMock())
+
+        with patch("src.app.api.v1.shipments.crud_shipments") as mock_crud:
+            mock_crud.get_detailed = AsyncMock(return_value=None)
+
+            with pytest.raises(NotFoundException):
+                await read_shipment(Mock(method="GET", headers={}), shipment_id=404, db=mock_db)
+
+        key, entry = cache_client.set.await_args.args
+        assert (key, entry) == ("shipment:404", b"\x02Shipment not found")
+        assert cache_client.set.await_args.kwargs == {"ex": 30}
+
+    @pytest.mark.asyncio
+    async def test_cached_not_found_skips_the_database(self, cache_client, mock_db):
+        cache_client.get = AsyncMock(return_value=b"\x02Shipment not found")
+        mock_db.execute = AsyncMock()
+
+        with patch("src.app.api.v1.shipments.crud_shipments") as mock_crud:
+            mock_crud.get_detailed = AsyncMock()
+
+            with pytest.raises(NotFoundException, match="Shipment not found"):
+                await read_shipment(Mock(method="GET", headers={}), shipment_id=404, db=mock_db)
+
+            mock_crud.get_detailed.assert_not_awaited()
+        mock_db.execute.assert_not_awaited()
+        cache_client.get.assert_awaited_once_with("shipment:404")
+
+    @pytest.mark.asyncio
+    async def test_invalidate_deletes_in_chunks_and_tolerates_errors(self, cache_client):
+        with patch.object(cache, "_INVALIDATE_CHUNK_SIZE", 2):
+            await cache.invalidate("shipment", [1, 2, 3])
+
+        assert [call.args for call in cache_client.delete.await_args_list] == [
+            ("shipment:1", "shipment:2"),
+            ("shipment:3",),
+        ]
+
+        cache_client.delete = AsyncMock(side_effect=ConnectionError)
+        await cache.invalidate("shipment", [1])
+
+    @pytest.mark.asyncio
+    async def test_warehouse_change_invalidates_its_shipments(self, cache_client):
+        script = AsyncMock(return_value=[b"shipment:10", b"shipment:11"])
+        cache_client.register_script = Mock(return_value=script)
+
+        await service_warehouses.invalidate_cache(warehouse_id=7)
+
+        cache_client.delete.assert_awaited_once_with("warehouse:7")
+        script.assert_awaited_once_with(keys=["warehouse_shipments:7"])
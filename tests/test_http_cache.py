@@ -0,0 +1,127 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from fastapi import Response
+
+from src.app.core.utils import cache, http_cache
+
+VERSION = datetime(2026, 10, 19, 12, 30, 15, 250_000, tzinfo=UTC)
+ETAG = f'"shipment-5-{int(VERSION.timestamp() * 1_000_000)}"'
+
+
+def _cached(version: datetime = VERSION, headers: dict[str, str] | None = None) -> Response:
+    """A body as `cache` returns it, with the version it was stored with."""
+    headers = {**(headers or {}), cache.VERSION_HEADER: version.isoformat()}
+    return Response(content=b'{"id":5}', media_type="application/json", headers=headers)
+
+
+def _endpoint(version: datetime | None = VERSION, response: Response | None = None):
+    load = AsyncMock(return_value=response or _cached())
+    lookup = AsyncMock(return_value=version)
+
+    async def read_shipment(request, shipment_id: int, db):
+        return await load(request, shipment_id=shipment_id, db=db)
+
+    decorated = http_cache.conditional(
+        key_prefix="shipment",
+        version=lookup,
+        resource_id_name="shipment_id",
+        cache_control="public, max-age=60",
+    )(read_shipment)
+    return decorated, load, lookup
+
+
+class TestConditionalGet:
+    @pytest.mark.asyncio
+    async def test_plain_get_takes_validators_from_the_cached_version(self, mock_db):
+        endpoint, load, lookup = _endpoint()
+
+        response = await endpoint(Mock(method="GET", headers={}), shipment_id=5, db=mock_db)
+
+        lookup.assert_not_awaited()
+        load.assert_awaited_once()
+        assert response.status_code == 200
+        assert response.headers["etag"] == ETAG
+        assert response.headers["last-modified"] == "Mon, 19 Oct 2026 12:30:15 GMT"
+        assert response.headers["cache-control"] == "public, max-age=60"
+        assert cache.VERSION_HEADER not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_stale_cached_body_keeps_its_own_etag(self, mock_db):
+        """The resource changed, but the new version has not reached the cache yet."""
+        endpoint, _, lookup = _endpoint(version=datetime(2026, 10, 19, 13, tzinfo=UTC))
+
+        response = await endpoint(Mock(method="GET", headers={"if-none-match": ETAG}), shipment_id=5, db=mock_db)
+
+        lookup.assert_awaited_once_with(mock_db, 5)
+        assert response.status_code == 200
+        assert response.headers["etag"] == ETAG
+
+    @pytest.mark.asyncio
+    async def test_body_without_version_sent_without_validators(self, mock_db):
+        uncached = Response(content=b'{"id":5}', media_type="application/json")
+        endpoint, _, lookup = _endpoint(response=uncached)
+
+        response = await endpoint(Mock(method="GET", headers={}), shipment_id=5, db=mock_db)
+
+        lookup.assert_not_awaited()
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "public, max-age=60"
+
+    @pytest.mark.asyncio
+    async def test_matching_etag_answered_without_loading(self, mock_db):
+        endpoint, load, _ = _endpoint()
+
+        response = await endpoint(
+            Mock(method="GET", headers={"if-none-match": f'"other", W/{ETAG}'}), shipment_id=5, db=mock_db
+        )
+
+        load.assert_not_awaited()
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == ETAG
+
+    @pytest.mark.asyncio
+    async def test_if_modified_since_ignored_when_if_none_match_is_sent(self, mock_db):
+        endpoint, load, _ = _endpoint()
+
+        not_modified = await endpoint(
+            Mock(method="GET", headers={"if-modified-since": "Mon, 19 Oct 2026 12:30:15 GMT"}),
+            shipment_id=5,
+            db=mock_db,
+        )
+        modified = await endpoint(
+            Mock(
+                method="GET",
+                headers={"if-none-match": '"shipment-5-1"', "if-modified-since": "Mon, 19 Oct 2026 12:30:15 GMT"},
+            ),
+            shipment_id=5,
+            db=mock_db,
+        )
+
+        assert not_modified.status_code == 304
+        assert modified.status_code == 200
+        load.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_gzipped_body_gets_its_own_etag(self, mock_db):
+        endpoint, _, _ = _endpoint(response=_cached(headers={"Content-Encoding": "gzip"}))
+
+        response = await endpoint(Mock(method="GET", headers={}), shipment_id=5, db=mock_db)
+        revalidated = await endpoint(
+            Mock(method="GET", headers={"if-none-match": response.headers["etag"]}), shipment_id=5, db=mock_db
+        )
+
+        assert response.headers["etag"] == ETAG[:-1] + '-gzip"'
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == response.headers["etag"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_resource_left_to_the_endpoint(self, mock_db):
+        endpoint, load, _ = _endpoint(version=None)
+
+        response = await endpoint(Mock(method="GET", headers={"if-none-match": "*"}), shipment_id=5, db=mock_db)
+
+        load.assert_awaited_once()
+        assert "etag" not in response.headers
@@ -0,0 +1,70 @@
+import pickle
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from arq.jobs import deserialize_job as arq_deserialize_job
+from arq.jobs import serialize_job as arq_serialize_job
+from arq.jobs import serialize_result
+
+from src.app.core.worker.metrics import JobOutcomeCounter
+from src.app.core.worker.serialization import deserialize_job, serialize_job
+from src.app.schemas.shipment import ShipmentStatus, TrackingUpdateStatus, TrackingUpdateStatusType
+
+
+def test_job_round_trip_is_smaller_than_pickle():
+    args = (1, ShipmentStatus.SHIPPED)
+    payload = arq_serialize_job("update_shipment_tracking_status", args, {}, None, 1, serializer=serialize_job)
+
+    job = arq_deserialize_job(payload, deserializer=deserialize_job)
+
+    assert job.function == "update_shipment_tracking_status"
+    assert list(job.args) == [1, "shipped"]
+    assert len(payload) < len(arq_serialize_job("update_shipment_tracking_status", args, {}, None, 1))
+
+
+def test_result_is_stored_as_plain_data():
+    result = TrackingUpdateStatus(status=TrackingUpdateStatusType.UPDATED, shipment_id=1, new_status="shipped")
+    payload = serialize_result(
+        "update_shipment_tracking_status",
+        (1,),
+        {},
+        1,
+        0,
+        True,
+        result,
+        0,
+        0,
+        "ref",
+        "arq:queue",
+        "job-1",
+        serializer=serialize_job,
+    )
+
+    assert deserialize_job(payload)["r"]["status"] == "updated"
+
+
+def test_reads_jobs_pickled_before_the_switch():
+    data = {"f": "update_shipment_tracking_status", "a": (1,), "k": {}, "t": None, "et": 1}
+
+    assert deserialize_job(pickle.dumps(data)) == data
+
+
+@pytest.mark.asyncio
+async def test_outcome_counts_are_flushed_as_hash_increments():
+    counter = JobOutcomeCounter(key_prefix="metrics:jobs:")
+    for outcome in ("updated", "updated", "terminal"):
+        counter.record("update_shipment_tracking_status", outcome)
+
+    pipe = Mock()
+    pipe.execute = AsyncMock()
+    redis = Mock()
+    redis.pipeline.return_value = pipe
+
+    await counter.flush(redis)
+    await counter.flush(redis)
+
+    assert sorted(call.args for call in pipe.hincrby.call_args_list) == [
+        ("metrics:jobs:update_shipment_tracking_status", "terminal", 1),
+        ("metrics:jobs:update_shipment_tracking_status", "updated", 2),
+    ]
+    pipe.execute.assert_awaited_once()
@@ -0,0 +1,72 @@
+import json
+from collections import Counter
+from unittest.mock import AsyncMock, Mock, PropertyMock, patch
+
+import pytest
+
+from src.app.core.utils import cache
+from src.app.core.utils.local_cache import MISSING, LocalCache
+
+
+@pytest.fixture
+def local():
+    local = LocalCache(max_entries=2, ttl_seconds=10)
+    with (
+        patch.object(cache, "local_cache", local),
+        patch.object(LocalCache, "running", new_callable=PropertyMock, return_value=True),
+    ):
+        yield local
+
+
+@pytest.fixture
+def cache_client():
+    client = Mock()
+    client.get = AsyncMock(return_value=b"\x00" + json.dumps({"id": 5}).encode())
+    client.delete = AsyncMock()
+    client.publish = AsyncMock()
+    with patch.object(cache, "client", client), patch.object(cache, "stats", Counter()):
+        yield client
+
+
+class TestLocalCache:
+    def test_least_recently_used_entry_evicted(self, local):
+        local.set("a", 1, 60)
+        local.set("b", 2, 60)
+        assert local.get("a") == 1
+        local.set("c", 3, 60)
+
+        assert local.get("b") is MISSING
+        assert (local.get("a"), local.get("c")) == (1, 3)
+
+    def test_entries_expire_after_the_shorter_ttl(self, local):
+        with patch("src.app.core.utils.local_cache.time.monotonic", return_value=100.0):
+            local.set("a", 1, 60)
+            local.set("b", 2, 5)
+        with patch("src.app.core.utils.local_cache.time.monotonic", return_value=107.0):
+            assert (local.get("a"), local.get("b")) == (1, MISSING)
+        with patch("src.app.core.utils.local_cache.time.monotonic", return_value=111.0):
+            assert local.get("a") is MISSING
+
+    @pytest.mark.asyncio
+    async def test_second_read_served_in_process(self, local, cache_client):
+        @cache.cache(key_prefix="shipment", resource_id_name="shipment_id")
+        async def read(request, shipment_id: int) -> dict:
+            raise AssertionError("cached")
+
+        request = Mock(method="GET", headers={})
+        first, second = await read(request, shipment_id=5), await read(request, shipment_id=5)
+
+        assert json.loads(first.body) == json.loads(second.body) == {"id": 5}
+
+        cache_client.get.assert_awaited_once()
+        assert cache.stats == {"l1_misses": 1, "l2_hits": 1, "l1_hits": 1}
+
+    @pytest.mark.asyncio
+    async def test_invalidation_dropped_locally_and_announced(self, local, cache_client):
+        local.set("shipment:5", {"id": 5}, 60)
+
+        with patch.object(cache.settings, "LOCAL_CACHE_ENABLED", True):
+            await cache.invalidate("shipment", [5])
+
+        assert local.get("shipment:5") is MISSING
+        cache_client.publish.assert_awaited_once_with("cache:invalidations", '["shipment:5"]')
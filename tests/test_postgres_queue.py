@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.core.utils.pg_queue import PostgresJobQueue
+from src.app.core.worker.postgres_worker import PostgresWorker
+
+
+def _queue(mock_db, inserted_job_id):
+    mock_db.execute = AsyncMock(return_value=Mock(scalar_one_or_none=Mock(return_value=inserted_job_id)))
+    session_factory = Mock()
+    session_factory.return_value.__aenter__ = AsyncMock(return_value=mock_db)
+    session_factory.return_value.__aexit__ = AsyncMock(return_value=None)
+    return PostgresJobQueue(default_queue_name="arq:queue", session_factory=session_factory)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_notifies_workers_for_due_jobs(mock_db):
+    queue = _queue(mock_db, inserted_job_id="job-1")
+
+    job_id = await queue.enqueue_job("update_shipment_tracking_status", 1, _job_id="job-1")
+
+    assert job_id == "job-1"
+    insert, notify = (call.args[0] for call in mock_db.execute.await_args_list)
+    assert "INSERT INTO job" in str(insert)
+    assert "pg_notify" in str(notify)
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_deferred_or_duplicate_job_sends_no_notification(mock_db):
+    deferred = _queue(mock_db, inserted_job_id="job-1")
+    await deferred.enqueue_job("update_shipment_tracking_status", 1, _defer_by=300)
+    assert mock_db.execute.await_count == 1
+
+    duplicate = _queue(mock_db, inserted_job_id=None)
+    assert await duplicate.enqueue_job("update_shipment_tracking_status", 1, _job_id="job-1") is None
+    assert mock_db.execute.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_job_with_its_arguments():
+    async def update_shipment_tracking_status(ctx, shipment_id, expected_status=None):
+        calls.append((ctx["job_id"], ctx["job_try"], shipment_id, expected_status))
+
+    calls = []
+    worker = PostgresWorker(functions=[update_shipment_tracking_status], queue_name="arq:queue")
+    job = SimpleNamespace(
+        id=7,
+        job_id="job-7",
+        function="update_shipment_tracking_status",
+        args=[1, "shipped"],
+        kwargs={},
+        attempts=1,
+        created_at=None,
+    )
+
+    await worker._run_job(job)
+
+    assert calls == [("job-7", 1, 1, "shipped")]
+    assert worker._finished == [7]
+
+
+@pytest.mark.asyncio
+async def test_failed_claim_keeps_finished_jobs_for_the_next_one(monkeypatch):
+    session = Mock()
+    session.return_value.__aenter__ = AsyncMock(side_effect=ConnectionError("db down"))
+    session.return_value.__aexit__ = AsyncMock(return_value=None)
+    monkeypatch.setattr("src.app.core.worker.postgres_worker.local_session", session)
+    worker = PostgresWorker(functions=[], queue_name="arq:queue")
+    worker._finished = [1, 2]
+
+    with pytest.raises(ConnectionError):
+        await worker._claim(10)
+
+    assert worker._finished == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_running_when_claiming_fails(monkeypatch):
+    worker = PostgresWorker(functions=[], queue_name="arq:queue", burst=True)
+    monkeypatch.setattr(worker, "_listen", AsyncMock(return_value=Mock(close=AsyncMock())))
+    monkeypatch.setattr(worker, "_driver_connection", AsyncMock(return_value=Mock(remove_listener=AsyncMock())))
+    monkeypatch.setattr(worker, "_claim", AsyncMock(side_effect=[ConnectionError("db down"), []]))
+    monkeypatch.setattr(worker, "_next_due_in", AsyncMock(return_value=0))
+
+    with patch("src.app.core.worker.postgres_worker.settings.PG_QUEUE_CLAIM_BATCH_SIZE", 5):
+        await asyncio.wait_for(worker.run(), timeout=5)
+
+    assert worker._claim.await_count == 2
@@ -0,0 +1,38 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.core.utils.pubsub import consume_channel
+
+
+class FakePubSub:
+    def __init__(self, messages: list) -> None:
+        self.messages = messages
+        self.subscribe = AsyncMock()
+        self.aclose = AsyncMock()
+
+    async def listen(self):
+        for message in self.messages:
+            if isinstance(message, BaseException):
+                raise message
+            yield {"data": message}
+
+
+class TestConsumeChannel:
+    @pytest.mark.asyncio
+    async def test_resubscribed_after_a_failure(self):
+        # The first subscription drops after one message, the second is stopped
+        pubsubs = [FakePubSub([b"1", ConnectionError("reset")]), FakePubSub([b"2", asyncio.CancelledError()])]
+        client = Mock(pubsub=Mock(side_effect=pubsubs))
+        handler, on_subscribe, on_error = AsyncMock(), AsyncMock(), Mock()
+
+        with patch("src.app.core.utils.pubsub.asyncio.sleep", AsyncMock()), pytest.raises(asyncio.CancelledError):
+            await consume_channel(client, "changes", handler, on_subscribe=on_subscribe, on_error=on_error)
+
+        assert [call.args for call in handler.await_args_list] == [(b"1",), (b"2",)]
+        assert on_subscribe.await_count == 2
+        on_error.assert_called_once_with()
+        for pubsub in pubsubs:
+            pubsub.subscribe.assert_awaited_once_with("changes")
+            pubsub.aclose.assert_awaited_once()
@@ -0,0 +1,112 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import APIRouter, Depends, FastAPI, Response
+from fastapi.testclient import TestClient
+
+from src.app.core.utils.rate_limit import RateLimitStatus, rate_limit, rate_limiter
+from src.app.middleware.rate_limit_headers_middleware import RateLimitHeadersMiddleware
+
+MODULE = "src.app.core.utils.rate_limit"
+
+
+@pytest.fixture
+def script():
+    script = AsyncMock(return_value=[1, 7, 42_300, 0])
+    client = Mock(register_script=Mock(return_value=script))
+    with patch.object(rate_limiter, "client", client):
+        yield script
+
+
+@pytest.fixture
+def clock():
+    """Seconds returned by Redis' `TIME`, for running the script against a fake Redis."""
+    clock = Mock(time=Mock(return_value=1_000.0))
+    with (
+        patch.object(rate_limiter, "client", FakeAsyncRedis()),
+        patch("fakeredis.commands_mixins.server_mixin.time", clock),
+    ):
+        yield clock
+
+
+@pytest.fixture
+def api():
+    router = APIRouter()
+
+    @router.get("/shipments/{shipment_id}")
+    async def read_shipment(shipment_id: int) -> Response:
+        return Response(content=b"{}", media_type="application/json")
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1", dependencies=[Depends(rate_limit)])
+    app.add_middleware(RateLimitHeadersMiddleware)
+    return TestClient(app)
+
+
+class TestRateLimit:
+    @pytest.mark.asyncio
+    async def test_hit_checked_in_one_script_call(self, script):
+        status = await rate_limiter.hit("1.2.3.4", "get/api/v1/shipments/{shipment_id}", limit=10, period=60)
+
+        script.assert_awaited_once_with(
+            keys=["ratelimit:1.2.3.4:get_api_v1_shipments_{shipment_id}"], args=[10, 60_000]
+        )
+        assert status == RateLimitStatus(allowed=True, limit=10, remaining=7, reset_seconds=43, retry_after_seconds=0)
+        assert "Retry-After" not in status.headers
+
+    def test_headers_sent_on_responses_returned_by_endpoints(self, script, api):
+        with patch(f"{MODULE}.settings.RATE_LIMIT_ROUTES", {"GET /api/v1/shipments/{shipment_id}": (10, 60)}):
+            response = api.get("/api/v1/shipments/5")
+
+        assert response.status_code == 200
+        assert response.headers["ratelimit-limit"] == "10"
+        assert response.headers["ratelimit-remaining"] == "7"
+        assert response.headers["ratelimit-reset"] == "43"
+        # Every shipment shares the route's limit
+        assert script.await_args.kwargs["keys"] == ["ratelimit:testclient:get_api_v1_shipments_{shipment_id}"]
+
+    def test_client_over_the_limit_rejected(self, script, api):
+        script.return_value = [0, 0, 42_300, 1_500]
+
+        response = api.get("/api/v1/shipments/5")
+
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "2"
+        assert response.headers["ratelimit-remaining"] == "0"
+
+    def test_requests_let_through_when_redis_fails(self, script, api):
+        script.side_effect = ConnectionError("redis down")
+
+        response = api.get("/api/v1/shipments/5")
+
+        assert response.status_code == 200
+        assert "ratelimit-limit" not in response.headers
+
+
+class TestSlidingWindowScript:
+    @staticmethod
+    async def _hits(count: int) -> list[RateLimitStatus]:
+        return [await rate_limiter.hit("1.2.3.4", "get/api/v1/shipments", limit=4, period=10) for _ in range(count)]
+
+    @pytest.mark.asyncio
+    async def test_hits_over_the_limit_rejected_until_the_window_slides(self, clock):
+        statuses = await self._hits(5)
+
+        assert [status.remaining for status in statuses[:4]] == [3, 2, 1, 0]
+        assert all(status.allowed and status.reset_seconds == 10 for status in statuses[:4])
+        # Rejected hits are not counted, and the client waits for a quarter of the next window to slide past
+        assert statuses[4] == RateLimitStatus(
+            allowed=False, limit=4, remaining=0, reset_seconds=10, retry_after_seconds=13
+        )
+
+        # Halfway through the next window, half of the previous window's hits still count
+        clock.time.return_value = 1_015.0
+        statuses = await self._hits(3)
+
+        assert [(status.allowed, status.remaining) for status in statuses] == [(True, 1), (True, 0), (False, 0)]
+        assert statuses[2].retry_after_seconds == 3
+
+        # Hits older than the previous window are forgotten
+        clock.time.return_value = 1_040.0
+        assert (await self._hits(1))[0].remaining == 3
@@ -0,0 +1,59 @@
+import argparse
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from arq.constants import job_key_prefix
+from arq.jobs import deserialize_job
+
+from src.app.core.worker.settings import WorkerSettings
+from src.scripts.reconcile_tracking_jobs import FUNCTION_NAME, spread_offset_ms, write_batch
+
+NOW_MS = 1_700_000_000_000
+
+
+def _args(reschedule: bool = False) -> argparse.Namespace:
+    return argparse.Namespace(queue_name="arq:background", spread_seconds=300, reschedule=reschedule)
+
+
+@pytest.fixture
+def redis():
+    pipe = Mock(execute=AsyncMock())
+    return Mock(pipeline=Mock(return_value=pipe), pipe=pipe)
+
+
+def test_offsets_stable_and_within_the_spread():
+    offsets = [spread_offset_ms(shipment_id, 300) for shipment_id in range(1, 1_000)]
+
+    assert offsets == [spread_offset_ms(shipment_id, 300) for shipment_id in range(1, 1_000)]
+    assert all(0 <= offset < 300_000 for offset in offsets)
+    assert spread_offset_ms(1, 0) == 0
+
+
+class TestWriteBatch:
+    @pytest.mark.asyncio
+    async def test_jobs_use_the_scheduled_update_ids(self, redis):
+        with patch("src.scripts.reconcile_tracking_jobs.time.time", return_value=NOW_MS / 1000):
+            await write_batch(redis, [(1, "shipped"), (2, None)], _args())
+
+        pipe = redis.pipe
+        redis.pipeline.assert_called_once_with(transaction=False)
+        pipe.execute.assert_awaited_once()
+        assert [call.args[0] for call in pipe.set.call_args_list] == [
+            job_key_prefix + "tracking:1:shipped",
+            job_key_prefix + "tracking:2:none",
+        ]
+        score = NOW_MS + spread_offset_ms(1, 300)
+        pipe.zadd.assert_any_call("arq:background", {"tracking:1:shipped": score}, nx=True)
+
+        job = deserialize_job(pipe.set.call_args_list[0].args[1], deserializer=WorkerSettings.job_deserializer)
+        assert job.function == FUNCTION_NAME
+        assert list(job.args) == [1, "shipped"]
+
+    @pytest.mark.asyncio
+    async def test_queued_jobs_left_alone_unless_rescheduling(self, redis):
+        await write_batch(redis, [(1, "shipped")], _args())
+        assert redis.pipe.set.call_args.kwargs["nx"] is True
+
+        await write_batch(redis, [(1, "shipped")], _args(reschedule=True))
+        assert redis.pipe.set.call_args.kwargs["nx"] is False
+        assert redis.pipe.zadd.call_args.kwargs["nx"] is False
@@ -0,0 +1,193 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.app.api.v1.shipments import queue_shipment
+from src.app.core.exceptions.http_exceptions import ServiceUnavailableException
+from src.app.core.worker.shipment_ingest import apply_shipment_ingest, fail_shipment_ingest
+from src.app.crud.crud_shipments import crud_shipments
+from src.app.schemas.address import AddressCreate
+from src.app.schemas.shipment import ShipmentCreate, ShipmentStatus
+
+
+def _address() -> AddressCreate:
+    return AddressCreate(
+        name="Margie McMiller",
+        address_line1="3800 North Lamar",
+        city_locality="Austin",
+        state_province="TX",
+        postal_code=78652,
+        email="email@example.com",
+        phone="1234567890",
+        country_code="US",
+    )
+
+
+def _shipment(warehouse_id: int = 1, external_reference: str | None = None) -> ShipmentCreate:
+    return ShipmentCreate(
+        warehouse_id=warehouse_id,
+        external_reference=external_reference,
+        tracking_number="TRACK1",
+        status=ShipmentStatus.PENDING,
+        ship_to=_address(),
+        ship_from=_address(),
+    )
+
+
+def _entry(pending_id: str, shipment: ShipmentCreate) -> tuple[bytes, dict[bytes, bytes]]:
+    return (b"1-0", {b"pending_id": pending_id.encode(), b"shipment": shipment.model_dump_json().encode()})
+
+
+@pytest.fixture
+def ingest_redis():
+    redis = Mock()
+    pipe = Mock()
+    pipe.execute = AsyncMock(return_value=[])
+    redis.pipeline = Mock(return_value=pipe)
+    return redis
+
+
+class TestQueueShipment:
+    @pytest.mark.asyncio
+    async def test_shipment_appended_with_pending_state(self, ingest_redis):
+        with patch("src.app.api.v1.shipments.queue") as mock_queue:
+            mock_queue.pool = ingest_redis
+
+            result = await queue_shipment(_shipment())
+
+        pipe = ingest_redis.pipeline.return_value
+        ingest_redis.pipeline.assert_called_once_with(transaction=True)
+        pipe.hset.assert_called_once_with(f"shipments:ingest:{result.pending_id}", mapping={"state": "queued"})
+        assert pipe.xadd.call_args.args[1]["pending_id"] == result.pending_id
+
+    @pytest.mark.asyncio
+    async def test_queue_unavailable(self):
+        with patch("src.app.api.v1.shipments.queue") as mock_queue:
+            mock_queue.pool = None
+
+            with pytest.raises(ServiceUnavailableException):
+                await queue_shipment(_shipment())
+
+
+class TestApplyShipmentIngest:
+    @pytest.mark.asyncio
+    async def test_batch_inserted_in_one_transaction(self, mock_db, ingest_redis):
+        pipe = ingest_redis.pipeline.return_value
+        mock_db.commit = AsyncMock()
+        # "c" was stored by an earlier delivery of this batch, so it is skipped by the insert
+        mock_db.execute = AsyncMock(return_value=[Mock(pending_id="c", id=9)])
+        row = Mock(pending_id="a", id=10, warehouse_id=1, status=ShipmentStatus.PENDING, tracking_number="TRACK1")
+        row.created_at = datetime(2026, 10, 19, tzinfo=UTC)
+
+        with (
+            patch("src.app.core.worker.shipment_ingest.crud_shipments") as mock_crud,
+            patch("src.app.core.worker.shipment_ingest.local_session") as mock_session,
+            patch("src.app.core.worker.shipment_ingest.queue") as mock_queue,
+            patch("src.app.core.worker.shipment_ingest.warehouse_registry") as mock_registry,
+        ):
+            mock_registry.exists = AsyncMock(side_effect=lambda db, warehouse_id: warehouse_id == 1)
+            mock_crud.create_many = AsyncMock(return_value=[row])
+            mock_session.return_value.__aenter__.return_value = mock_db
+            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_queue.pool.enqueue_job = AsyncMock()
+
+            await apply_shipment_ingest(
+                ingest_redis,
+                [_entry("a", _shipment()), _entry("b", _shipment(warehouse_id=2)), _entry("c", _shipment())],
+            )
+
+            mock_crud.create_many.assert_awaited_once_with(db=mock_db, shipments={"a": _shipment(), "c": _shipment()})
+            mock_db.commit.assert_awaited_once()
+            mock_queue.pool.enqueue_job.assert_awaited_once_with(
+                "update_shipment_tracking_status",
+                10,
+                ShipmentStatus.PENDING,
+                _defer_by=60,
+                _job_id="tracking:10:pending",
+            )
+
+        pipe.hset.assert_any_call("shipments:ingest:a", mapping={"state": "created", "shipment_id": 10})
+        pipe.hset.assert_any_call("shipments:ingest:b", mapping={"state": "failed", "error": "Warehouse not found"})
+        pipe.hset.assert_any_call("shipments:ingest:c", mapping={"state": "created", "shipment_id": 9})
+        assert pipe.hset.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_taken_external_references_fail(self, mock_db, ingest_redis):
+        pipe = ingest_redis.pipeline.return_value
+        mock_db.commit = AsyncMock()
+        # "ORDER-1" is already stored and "c" repeats "b"'s reference, so only "b" is inserted
+        mock_db.execute = AsyncMock(return_value=[])
+        row = Mock(pending_id="b", id=10, warehouse_id=1, status=ShipmentStatus.PENDING, tracking_number=None)
+        row.created_at = datetime(2026, 10, 19, tzinfo=UTC)
+
+        with (
+            patch("src.app.core.worker.shipment_ingest.crud_shipments") as mock_crud,
+            patch("src.app.core.worker.shipment_ingest.local_session") as mock_session,
+            patch("src.app.core.worker.shipment_ingest.queue") as mock_queue,
+            patch("src.app.core.worker.shipment_ingest.warehouse_registry") as mock_registry,
+        ):
+            mock_registry.exists = AsyncMock(side_effect=lambda db, warehouse_id: warehouse_id == 1)
+            mock_crud.create_many = AsyncMock(return_value=[row])
+            mock_session.return_value.__aenter__.return_value = mock_db
+            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            mock_queue.pool.enqueue_job = AsyncMock()
+
+            await apply_shipment_ingest(
+                ingest_redis,
+                [
+                    _entry("a", _shipment(external_reference="ORDER-1")),
+                    _entry("b", _shipment(external_reference="ORDER-2")),
+                    _entry("c", _shipment(external_reference="ORDER-2")),
+                ],
+            )
+
+            assert list(mock_crud.create_many.await_args.kwargs["shipments"]) == ["a", "b", "c"]
+
+        error = "Shipment with this external reference already exists"
+        pipe.hset.assert_any_call("shipments:ingest:a", mapping={"state": "failed", "error": error})
+        pipe.hset.assert_any_call("shipments:ingest:b", mapping={"state": "created", "shipment_id": 10})
+        pipe.hset.assert_any_call("shipments:ingest:c", mapping={"state": "failed", "error": error})
+
+    @pytest.mark.asyncio
+    async def test_dead_lettered_shipments_marked_failed(self, ingest_redis):
+        await fail_shipment_ingest(ingest_redis, [_entry("a", _shipment()), (b"2-0", {b"shipment": b"{}"})])
+
+        pipe = ingest_redis.pipeline.return_value
+        pipe.hset.assert_called_once_with(
+            "shipments:ingest:a", mapping={"state": "failed", "error": "Shipment could not be processed"}
+        )
+        pipe.execute.assert_awaited_once()
+
+
+class TestCreateMany:
+    @pytest.mark.asyncio
+    async def test_conflicting_shipments_skipped(self, mock_db):
+        mock_db.scalars = AsyncMock(return_value=Mock(all=Mock(return_value=[1, 2])))
+        mock_db.execute = AsyncMock(return_value=Mock(all=Mock(return_value=[Mock(pending_id="a")])))
+
+        await crud_shipments.create_many(db=mock_db, shipments={"a": _shipment(external_reference="ORDER-1")})
+
+        stmt, params = mock_db.execute.await_args.args
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT DO NOTHING RETURNING shipment.pending_id" in sql
+        assert params[0]["pending_id"] == "a"
+        assert params[0]["external_reference"] == "ORDER-1"
+
+    @pytest.mark.asyncio
+    async def test_addresses_of_skipped_shipments_deleted(self, mock_db):
+        mock_db.scalars = AsyncMock(return_value=Mock(all=Mock(return_value=[1, 2, 3, 4, 5, 6])))
+        mock_db.execute = AsyncMock(
+            side_effect=[Mock(all=Mock(return_value=[Mock(pending_id="a"), Mock(pending_id="c")])), Mock()]
+        )
+
+        created = await crud_shipments.create_many(
+            db=mock_db, shipments={"a": _shipment(), "b": _shipment(), "c": _shipment()}
+        )
+
+        assert [row.pending_id for row in created] == ["a", "c"]
+        assert mock_db.execute.await_count == 2
+        compiled = mock_db.execute.await_args.args[0].compile(dialect=postgresql.dialect())
+        assert str(compiled).startswith("DELETE FROM address WHERE address.id IN")
+        assert compiled.params == {"id_1": [3, 4]}
@@ -0,0 +1,114 @@
+import gzip
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.core.utils import cache
+from src.app.services.service_shipments import service_shipments
+
+ADDRESS = {
+    "name": "Margie McMiller",
+    "address_line1": "3800 North Lamar",
+    "city_locality": "Austin",
+    "state_province": "TX",
+    "postal_code": 78652,
+}
+CREATED_AT = datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def _detailed_shipment(shipment_id: int) -> dict:
+    return {
+        "id": shipment_id,
+        "warehouse_id": 7,
+        "ship_to_id": 1,
+        "ship_from_id": 2,
+        "created_at": CREATED_AT,
+        "warehouse": {"name": "Warehouse 1", "created_at": CREATED_AT},
+        "ship_to": ADDRESS,
+        "ship_from": ADDRESS,
+    }
+
+
+@pytest.fixture
+def cache_client():
+    client = Mock()
+    client.mget = AsyncMock(return_value=[])
+    client.pipeline = Mock(return_value=Mock(execute=AsyncMock(return_value=[])))
+    with patch.object(cache, "client", client):
+        yield client
+
+
+class TestShipmentListCache:
+    @pytest.mark.asyncio
+    async def test_page_composed_from_cached_entries_and_loaded_misses(self, cache_client, mock_db):
+        cache_client.mget = AsyncMock(
+            return_value=[
+                b"\x00" + json.dumps({"id": 3}).encode(),
+                None,
+                b"\x01" + gzip.compress(json.dumps({"id": 1}).encode()),
+            ]
+        )
+        pipe = cache_client.pipeline.return_value
+
+        with patch("src.app.services.service_shipments.crud_shipments") as mock_crud:
+            mock_crud.get_page_ids = AsyncMock(return_value=([3, 2, 1], 13))
+            mock_crud.get_versions = AsyncMock(return_value={2: CREATED_AT})
+            mock_crud.get_multi_detailed = AsyncMock(return_value={"data": [_detailed_shipment(2)]})
+
+            body = await service_shipments.list_shipments_cached(db=mock_db, page=2, items_per_page=3)
+
+            mock_crud.get_page_ids.assert_awaited_once_with(db=mock_db, offset=3, limit=3)
+            # Only the miss is loaded, in one query
+            assert mock_crud.get_multi_detailed.await_args.kwargs["id__in"] == [2]
+
+        cache_client.mget.assert_awaited_once_with(["shipment:3", "shipment:2", "shipment:1"])
+        response = json.loads(body)
+        assert [shipment["id"] for shipment in response["data"]] == [3, 2, 1]
+        assert response["data"][1]["warehouse"]["name"] == "Warehouse 1"
+        assert {key: value for key, value in response.items() if key != "data"} == {
+            "total_count": 13,
+            "has_more": True,
+            "page": 2,
+            "items_per_page": 3,
+        }
+
+        # The loaded shipment is cached as the detail read caches it, under its warehouse tag
+        args = pipe.eval.call_args.args
+        assert args[1:4] == (2, "shipment:2", "warehouse_shipments:7")
+        # Stored with its version, so the detail read can answer conditional requests from it
+        micros = int(CREATED_AT.timestamp() * 1_000_000)
+        assert args[4][:9] == b"\x03" + micros.to_bytes(8, "big")
+        assert json.loads(args[4][10:])["id"] == 2
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_fully_cached_page_reads_only_ids_from_the_database(self, cache_client, mock_db):
+        cache_client.mget = AsyncMock(return_value=[b"\x00" + json.dumps({"id": 1}).encode()])
+
+        with patch("src.app.services.service_shipments.crud_shipments") as mock_crud:
+            mock_crud.get_page_ids = AsyncMock(return_value=([1], 1))
+            mock_crud.get_multi_detailed = AsyncMock()
+
+            body = await service_shipments.list_shipments_cached(db=mock_db, page=1, items_per_page=10)
+
+            mock_crud.get_multi_detailed.assert_not_awaited()
+        cache_client.pipeline.assert_not_called()
+        assert json.loads(body)["data"] == [{"id": 1}]
+        assert json.loads(body)["has_more"] is False
+
+    @pytest.mark.asyncio
+    async def test_cache_errors_fall_back_to_the_database(self, cache_client, mock_db):
+        cache_client.mget = AsyncMock(side_effect=ConnectionError("redis down"))
+        cache_client.pipeline.return_value.execute = AsyncMock(side_effect=ConnectionError("redis down"))
+
+        with patch("src.app.services.service_shipments.crud_shipments") as mock_crud:
+            mock_crud.get_page_ids = AsyncMock(return_value=([4, 5], 2))
+            # Shipment 5 was deleted after its ID was read
+            mock_crud.get_versions = AsyncMock(return_value={4: CREATED_AT})
+            mock_crud.get_multi_detailed = AsyncMock(return_value={"data": [_detailed_shipment(4)]})
+
+            body = await service_shipments.list_shipments_cached(db=mock_db, page=1, items_per_page=10)
+
+        assert [shipment["id"] for shipment in json.loads(body)["data"]] == [4]
@@ -1,8 +1,11 @@
+from datetime import UTC, datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
+from sqlalchemy import Row
 
 from src.app.api.v1.shipments import update_shipment_tracking
+from src.app.core.config import settings
 from src.app.core.exceptions.http_exceptions import BadRequestException, NotFoundException, ServiceUnavailableException
 from src.app.core.worker.functions import update_shipment_tracking_status
 from src.app.schemas.shipment import (
@@ -40,7 +43,12 @@ class TestUpdateShipmentTrackingAPI:
                     id=shipment_id,
                     schema_to_select=Shipment,
                 )
-                mock_pool.enqueue_job.assert_called_once_with("update_shipment_tracking_status", shipment_id)
+                mock_pool.enqueue_job.assert_called_once_with(
+                    "update_shipment_tracking_status",
+                    shipment_id,
+                    ShipmentStatus.PENDING,
+                    _queue_name=settings.REDIS_QUEUE_INTERACTIVE_NAME,
+                )
 
     @pytest.mark.asyncio
     async def test_update_shipment_tracking_not_found(self, mock_db):
@@ -92,9 +100,17 @@ class TestUpdateShipmentTrackingAPI:
                     await update_shipment_tracking(shipment_id, mock_db)
 
 
+@pytest.fixture
+def mock_status_writes():
+    with patch("src.app.core.worker.functions.status_write_buffer") as mock_buffer:
+        updated = Mock(spec=Row, warehouse_id=1, updated_at=datetime(2026, 1, 22, 13, 0, tzinfo=UTC))
+        mock_buffer.submit = AsyncMock(return_value=updated)
+        yield mock_buffer
+
+
 class TestUpdateShipmentTrackingStatusWorker:
     @pytest.mark.asyncio
-    async def test_status_progression_pending_to_processing(self, mock_db):
+    async def test_status_progression_pending_to_processing(self, mock_db, mock_status_writes):
         """Test status progression from PENDING to PROCESSING."""
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
@@ -109,7 +125,6 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(return_value=None)
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -126,12 +141,14 @@ class TestUpdateShipmentTrackingStatusWorker:
                     assert result.shipment_id == shipment_id
                     assert result.old_status == ShipmentStatus.PENDING.value
                     assert result.new_status == ShipmentStatus.PROCESSING.value
-                    mock_crud.update.assert_called_once()
+                    mock_status_writes.submit.assert_awaited_once_with(
+                        shipment_id, ShipmentStatus.PENDING, ShipmentStatus.PROCESSING
+                    )
                     # Should schedule next update since PROCESSING is not terminal
                     mock_pool.enqueue_job.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_status_progression_processing_to_shipped(self, mock_db):
+    async def test_status_progression_processing_to_shipped(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -145,7 +162,6 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(return_value=None)
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -164,7 +180,7 @@ class TestUpdateShipmentTrackingStatusWorker:
                     mock_pool.enqueue_job.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_status_progression_shipped_to_in_transit(self, mock_db):
+    async def test_status_progression_shipped_to_in_transit(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -178,7 +194,6 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(return_value=None)
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -197,7 +212,7 @@ class TestUpdateShipmentTrackingStatusWorker:
                     mock_pool.enqueue_job.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_status_progression_in_transit_to_delivered(self, mock_db):
+    async def test_status_progression_in_transit_to_delivered(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -211,7 +226,6 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(return_value=None)
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -231,7 +245,7 @@ class TestUpdateShipmentTrackingStatusWorker:
                     mock_pool.enqueue_job.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_status_terminal_delivered(self, mock_db):
+    async def test_status_terminal_delivered(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -260,11 +274,11 @@ class TestUpdateShipmentTrackingStatusWorker:
                     assert result.status == TrackingUpdateStatusType.TERMINAL
                     assert result.shipment_id == shipment_id
                     assert result.current_status == ShipmentStatus.DELIVERED.value
-                    mock_crud.update.assert_not_called()
+                    mock_status_writes.submit.assert_not_called()
                     mock_pool.enqueue_job.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_status_terminal_cancelled(self, mock_db):
+    async def test_status_terminal_cancelled(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -287,10 +301,10 @@ class TestUpdateShipmentTrackingStatusWorker:
 
                 assert result.status == TrackingUpdateStatusType.TERMINAL
                 assert result.current_status == ShipmentStatus.CANCELLED.value
-                mock_crud.update.assert_not_called()
+                mock_status_writes.submit.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_status_terminal_failed(self, mock_db):
+    async def test_status_terminal_failed(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -313,10 +327,10 @@ class TestUpdateShipmentTrackingStatusWorker:
 
                 assert result.status == TrackingUpdateStatusType.TERMINAL
                 assert result.current_status == ShipmentStatus.FAILED.value
-                mock_crud.update.assert_not_called()
+                mock_status_writes.submit.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_shipment_not_found(self, mock_db):
+    async def test_shipment_not_found(self, mock_db, mock_status_writes):
         shipment_id = 999
         ctx = {"job_id": "test_job_123"}
 
@@ -333,7 +347,7 @@ class TestUpdateShipmentTrackingStatusWorker:
                 assert result.shipment_id == shipment_id
 
     @pytest.mark.asyncio
-    async def test_no_tracking_number(self, mock_db):
+    async def test_no_tracking_number(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -356,10 +370,10 @@ class TestUpdateShipmentTrackingStatusWorker:
 
                 assert result.status == TrackingUpdateStatusType.NO_TRACKING
                 assert result.shipment_id == shipment_id
-                mock_crud.update.assert_not_called()
+                mock_status_writes.submit.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_status_none_defaults_to_pending(self, mock_db):
+    async def test_status_none_defaults_to_pending(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -373,7 +387,6 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(return_value=None)
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -390,7 +403,7 @@ class TestUpdateShipmentTrackingStatusWorker:
                     assert result.new_status == ShipmentStatus.PENDING.value
 
     @pytest.mark.asyncio
-    async def test_error_handling(self, mock_db):
+    async def test_error_handling(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -404,7 +417,7 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(side_effect=Exception("Database error"))
+            mock_status_writes.submit.side_effect = Exception("Database error")
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -417,7 +430,7 @@ class TestUpdateShipmentTrackingStatusWorker:
                 assert result.error == "Database error"
 
     @pytest.mark.asyncio
-    async def test_queue_pool_none_no_scheduling(self, mock_db):
+    async def test_queue_pool_none_no_scheduling(self, mock_db, mock_status_writes):
         shipment_id = 1
         ctx = {"job_id": "test_job_123"}
         mock_shipment = Shipment(
@@ -431,7 +444,6 @@ class TestUpdateShipmentTrackingStatusWorker:
 
         with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
             mock_crud.get = AsyncMock(return_value=mock_shipment)
-            mock_crud.update = AsyncMock(return_value=None)
 
             with patch("src.app.core.worker.functions.local_session") as mock_session:
                 mock_session.return_value.__aenter__.return_value = mock_db
@@ -443,4 +455,102 @@ class TestUpdateShipmentTrackingStatusWorker:
                     result = await update_shipment_tracking_status(ctx, shipment_id)
 
                     assert result.status == TrackingUpdateStatusType.UPDATED
-                    mock_crud.update.assert_called_once()
+                    mock_status_writes.submit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_expected_status_skips_read(self, mock_db, mock_status_writes):
+        shipment_id = 1
+        ctx = {"job_id": "test_job_123"}
+
+        with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
+            mock_crud.get = AsyncMock()
+
+            with patch("src.app.core.worker.functions.queue") as mock_queue:
+                mock_pool = Mock()
+                mock_pool.enqueue_job = AsyncMock()
+                mock_queue.pool = mock_pool
+
+                result = await update_shipment_tracking_status(ctx, shipment_id, ShipmentStatus.SHIPPED)
+
+                assert result.status == TrackingUpdateStatusType.UPDATED
+                assert result.old_status == ShipmentStatus.SHIPPED.value
+                assert result.new_status == ShipmentStatus.IN_TRANSIT.value
+                mock_crud.get.assert_not_called()
+                mock_status_writes.submit.assert_awaited_once_with(
+                    shipment_id, ShipmentStatus.SHIPPED, ShipmentStatus.IN_TRANSIT
+                )
+                mock_pool.enqueue_job.assert_called_once_with(
+                    "update_shipment_tracking_status",
+                    shipment_id,
+                    ShipmentStatus.IN_TRANSIT,
+                    _defer_by=300,
+                    _queue_name=settings.REDIS_QUEUE_BACKGROUND_NAME,
+                    _job_id="tracking:1:in_transit",
+                )
+
+    @pytest.mark.asyncio
+    async def test_stale_expected_status_falls_back_to_read(self, mock_db, mock_status_writes):
+        """The shipment was cancelled through the API after the job was enqueued."""
+        shipment_id = 1
+        ctx = {"job_id": "test_job_123"}
+        mock_shipment = Shipment(
+            id=shipment_id,
+            warehouse_id=1,
+            ship_to_id=1,
+            ship_from_id=2,
+            tracking_number="TRACK123",
+            status=ShipmentStatus.CANCELLED,
+        )
+        mock_status_writes.submit.return_value = None
+
+        with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
+            mock_crud.get = AsyncMock(return_value=mock_shipment)
+
+            with patch("src.app.core.worker.functions.local_session") as mock_session:
+                mock_session.return_value.__aenter__.return_value = mock_db
+                mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+                result = await update_shipment_tracking_status(ctx, shipment_id, ShipmentStatus.SHIPPED)
+
+                assert result.status == TrackingUpdateStatusType.TERMINAL
+                assert result.current_status == ShipmentStatus.CANCELLED.value
+                mock_status_writes.submit.assert_awaited_once()
+                mock_crud.get.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_expected_status_leaves_shipment_to_its_current_update(self, mock_db, mock_status_writes):
+        """A second chain for the shipment converges on the update already scheduled for its current status."""
+        shipment_id = 1
+        ctx = {"job_id": "test_job_123"}
+        mock_shipment = Shipment(
+            id=shipment_id,
+            warehouse_id=1,
+            ship_to_id=1,
+            ship_from_id=2,
+            tracking_number="TRACK123",
+            status=ShipmentStatus.IN_TRANSIT,
+        )
+        mock_status_writes.submit.return_value = None
+
+        with patch("src.app.core.worker.functions.crud_shipments") as mock_crud:
+            mock_crud.get = AsyncMock(return_value=mock_shipment)
+
+            with patch("src.app.core.worker.functions.local_session") as mock_session:
+                mock_session.return_value.__aenter__.return_value = mock_db
+                mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+
+                with patch("src.app.core.worker.functions.queue") as mock_queue:
+                    mock_queue.pool.enqueue_job = AsyncMock(return_value=None)
+
+                    result = await update_shipment_tracking_status(ctx, shipment_id, ShipmentStatus.SHIPPED)
+
+                    assert result.status == TrackingUpdateStatusType.CONFLICT
+                    mock_status_writes.submit.assert_awaited_once()
+                    mock_queue.pool.enqueue_job.assert_awaited_once_with(
+                        "update_shipment_tracking_status",
+                        shipment_id,
+                        ShipmentStatus.IN_TRANSIT,
+                        _defer_by=300,
+                        _queue_name=settings.REDIS_QUEUE_BACKGROUND_NAME,
+                        _job_id="tracking:1:in_transit",
+                    )
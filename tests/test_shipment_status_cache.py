@@ -0,0 +1,81 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.schemas.shipment import ShipmentStatus, ShipmentStatusChange, ShipmentStatusRead
+from src.app.services.service_shipment_status import service_shipment_status
+
+UPDATED_AT = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def status_redis():
+    client = Mock()
+    client.hset = AsyncMock()
+    client.hmget = AsyncMock()
+    pipe = Mock()
+    pipe.execute = AsyncMock()
+    client.pipeline = Mock(return_value=pipe)
+    with patch("src.app.services.service_shipment_status.cache.client", client):
+        yield client
+
+
+class TestShipmentStatusCache:
+    @pytest.mark.asyncio
+    async def test_record_stores_compact_entries_and_publishes_changes(self, status_redis):
+        await service_shipment_status.record(
+            [
+                ShipmentStatusChange(
+                    shipment_id=7,
+                    warehouse_id=1,
+                    old_status=ShipmentStatus.PROCESSING,
+                    new_status=ShipmentStatus.SHIPPED,
+                    changed_at=UPDATED_AT,
+                ),
+                ShipmentStatusChange(
+                    shipment_id=8,
+                    warehouse_id=1,
+                    old_status=ShipmentStatus.PENDING,
+                    new_status=ShipmentStatus.PENDING,
+                    changed_at=UPDATED_AT,
+                ),
+            ]
+        )
+
+        pipe = status_redis.pipeline.return_value
+        _, kwargs = pipe.hset.call_args
+        assert kwargs["mapping"] == {"7": f"shipped|{UPDATED_AT.isoformat()}", "8": f"pending|{UPDATED_AT.isoformat()}"}
+        pipe.publish.assert_called_once()
+        assert '"shipment_id":7' in pipe.publish.call_args.args[1]
+
+    @pytest.mark.asyncio
+    async def test_hits_do_not_touch_the_database(self, mock_db, status_redis):
+        status_redis.hmget.return_value = [
+            f"in_transit|{UPDATED_AT.isoformat()}".encode(),
+            f"|{UPDATED_AT.isoformat()}".encode(),
+        ]
+
+        with patch("src.app.services.service_shipment_status.crud_shipments") as mock_crud:
+            statuses = await service_shipment_status.get_statuses(db=mock_db, shipment_ids=[1, 2])
+
+        mock_crud.get_statuses.assert_not_called()
+        assert statuses == [
+            ShipmentStatusRead(id=1, status=ShipmentStatus.IN_TRANSIT, updated_at=UPDATED_AT),
+            ShipmentStatusRead(id=2, status=None, updated_at=UPDATED_AT),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_misses_fall_back_to_the_database_and_backfill(self, mock_db, status_redis):
+        status_redis.hmget.return_value = [f"pending|{UPDATED_AT.isoformat()}".encode(), None, None]
+        row = Mock(id=2, status=ShipmentStatus.DELIVERED, updated_at=UPDATED_AT)
+
+        with patch("src.app.services.service_shipment_status.crud_shipments") as mock_crud:
+            mock_crud.get_statuses = AsyncMock(return_value=[row])
+            statuses = await service_shipment_status.get_statuses(db=mock_db, shipment_ids=[1, 2, 3])
+
+        mock_crud.get_statuses.assert_called_once_with(db=mock_db, shipment_ids=[2, 3])
+        assert [status.id for status in statuses] == [1, 2]
+        status_redis.pipeline.return_value.hsetnx.assert_called_once_with(
+            "shipments:status", "2", f"delivered|{UPDATED_AT.isoformat()}"
+        )
@@ -0,0 +1,162 @@
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from src.app.core.exceptions.http_exceptions import ConflictException, NotFoundException
+from src.app.crud.crud_shipments import crud_shipments
+from src.app.schemas.address import AddressCreate
+from src.app.schemas.shipment import ShipmentCreate, ShipmentRead, ShipmentStatus
+from src.app.services.service_shipments import service_shipments
+
+CHANGED_AT = datetime(2026, 10, 19, 12, 0, tzinfo=UTC)
+
+
+def _shipment(status: ShipmentStatus = ShipmentStatus.PENDING) -> ShipmentCreate:
+    address = AddressCreate(
+        name="Margie McMiller",
+        address_line1="3800 North Lamar",
+        city_locality="Austin",
+        state_province="TX",
+        postal_code=78652,
+        email="email@example.com",
+        phone="1234567890",
+        country_code="US",
+    )
+    return ShipmentCreate(
+        warehouse_id=1,
+        tracking_number="TRACK1",
+        status=status,
+        external_reference="ORDER-10042",
+        ship_to=address,
+        ship_from=address,
+    )
+
+
+def _row(created: bool, old_status: ShipmentStatus | None) -> Mock:
+    return Mock(
+        id=10,
+        warehouse_id=1,
+        ship_to_id=1,
+        ship_from_id=2,
+        carrier=None,
+        service_code=None,
+        tracking_number="TRACK1",
+        status=ShipmentStatus.PROCESSING,
+        external_reference="ORDER-10042",
+        created_at=CHANGED_AT,
+        changed_at=CHANGED_AT,
+        old_status=old_status,
+        created=created,
+    )
+
+
+@pytest.fixture
+def upsert_db(mock_db):
+    mock_db.begin = Mock(return_value=Mock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=None)))
+    return mock_db
+
+
+class TestUpsertByReference:
+    @pytest.mark.asyncio
+    async def test_single_conditional_upsert_statement(self, mock_db):
+        mock_db.execute = AsyncMock(return_value=Mock())
+
+        await crud_shipments.upsert_by_reference(db=mock_db, shipment=_shipment())
+
+        sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        mock_db.execute.assert_awaited_once()
+        assert "ON CONFLICT (external_reference) WHERE external_reference IS NOT NULL DO UPDATE" in sql
+        assert "IS DISTINCT FROM" in sql
+        assert sql.count("INSERT INTO address") == 2
+
+    @pytest.mark.asyncio
+    async def test_resend_keeps_the_stored_status(self, mock_db):
+        mock_db.execute = AsyncMock(return_value=Mock())
+
+        # The shipment was delivered since the partner first sent it as pending
+        await crud_shipments.upsert_by_reference(db=mock_db, shipment=_shipment(ShipmentStatus.PENDING))
+
+        sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        update = sql.split("DO UPDATE SET", 1)[1]
+        assert "status = coalesce(shipment.status, excluded.status)" in update
+        # Only the status of a shipment without one counts as a change
+        assert (
+            "(shipment.warehouse_id, shipment.carrier, shipment.service_code, shipment.tracking_number, "
+            "shipment.is_deleted) IS DISTINCT FROM" in update
+        )
+        assert "shipment.status IS NULL AND excluded.status IS NOT NULL" in update
+
+
+class TestUpsertShipment:
+    @pytest.mark.asyncio
+    async def test_status_change_recorded_and_tracked(self, upsert_db):
+        with (
+            patch("src.app.services.service_shipments.crud_shipments") as mock_crud,
+            patch("src.app.services.service_shipments.service_shipment_status") as mock_status,
+            patch("src.app.services.service_shipments.queue") as mock_queue,
+        ):
+            # The stored shipment had no status yet
+            mock_crud.upsert_by_reference = AsyncMock(return_value=_row(created=False, old_status=None))
+            mock_status.record = AsyncMock()
+            mock_queue.pool.enqueue_job = AsyncMock()
+
+            result, created = await service_shipments.upsert_shipment(db=upsert_db, shipment=_shipment())
+
+            assert created is False
+            assert result.status == ShipmentStatus.PROCESSING
+            change = mock_status.record.call_args.args[0][0]
+            assert (change.old_status, change.new_status) == (None, ShipmentStatus.PROCESSING)
+            mock_queue.pool.enqueue_job.assert_awaited_once_with(
+                "update_shipment_tracking_status",
+                10,
+                ShipmentStatus.PROCESSING,
+                _defer_by=60,
+                _job_id="tracking:10:processing",
+            )
+
+    @pytest.mark.asyncio
+    async def test_unchanged_resend_writes_nothing(self, upsert_db):
+        existing = ShipmentRead.model_validate(_row(created=False, old_status=None), from_attributes=True)
+        with (
+            patch("src.app.services.service_shipments.crud_shipments") as mock_crud,
+            patch("src.app.services.service_shipments.service_shipment_status") as mock_status,
+        ):
+            mock_crud.upsert_by_reference = AsyncMock(return_value=None)
+            mock_crud.get = AsyncMock(return_value=existing)
+            mock_status.record = AsyncMock()
+
+            result, created = await service_shipments.upsert_shipment(db=upsert_db, shipment=_shipment())
+
+            assert (result, created) == (existing, False)
+            mock_status.record.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_warehouse(self, upsert_db):
+        error = IntegrityError("INSERT", {}, Mock(sqlstate="23503"))
+        with patch("src.app.services.service_shipments.crud_shipments") as mock_crud:
+            mock_crud.upsert_by_reference = AsyncMock(side_effect=error)
+
+            with pytest.raises(NotFoundException):
+                await service_shipments.upsert_shipment(db=upsert_db, shipment=_shipment())
+
+
+class TestCreateShipment:
+    @pytest.mark.asyncio
+    async def test_taken_external_reference_conflicts(self, upsert_db):
+        error = IntegrityError("INSERT", {}, Mock(sqlstate="23505"))
+        with (
+            patch("src.app.services.service_shipments.warehouse_registry") as mock_registry,
+            patch("src.app.services.service_shipments.crud_addresses") as mock_addresses,
+            patch("src.app.services.service_shipments.crud_shipments") as mock_crud,
+        ):
+            mock_registry.exists = AsyncMock(return_value=True)
+            mock_addresses.create = AsyncMock(return_value=Mock(id=1))
+            mock_crud.create = AsyncMock(side_effect=error)
+
+            with pytest.raises(ConflictException) as exc_info:
+                await service_shipments.create_shipment(db=upsert_db, shipment=_shipment())
+
+        assert exc_info.value.status_code == 409
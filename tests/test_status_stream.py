@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+import pytest
+
+from src.app.core.utils.status_stream import StatusBroadcaster
+
+
+def _change(shipment_id: int, warehouse_id: int) -> bytes:
+    return json.dumps({"shipment_id": shipment_id, "warehouse_id": warehouse_id, "new_status": "shipped"}).encode()
+
+
+class TestStatusBroadcaster:
+    @pytest.mark.asyncio
+    async def test_routes_changes_by_shipment_and_warehouse(self):
+        broadcaster = StatusBroadcaster(buffer_size=10)
+        by_shipment = broadcaster.subscribe([1, 2])
+        by_warehouse = broadcaster.subscribe([], warehouse_id=5)
+
+        broadcaster.deliver(_change(1, 9))
+        broadcaster.deliver(_change(3, 5))
+        broadcaster.deliver(_change(4, 6))
+
+        assert by_shipment.events.qsize() == 1
+        assert by_warehouse.events.qsize() == 1
+        assert by_shipment.events.get_nowait() == b"event: status\ndata: " + _change(1, 9) + b"\n\n"
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_is_dropped(self):
+        broadcaster = StatusBroadcaster(buffer_size=2)
+        slow = broadcaster.subscribe([1])
+
+        for _ in range(3):
+            broadcaster.deliver(_change(1, 1))
+
+        assert slow.overflowed
+        assert broadcaster._by_shipment == {}
+        events = [event async for event in broadcaster.stream(slow, heartbeat_seconds=1)]
+        assert events == [b": connected\n\n", b"event: overflow\ndata: {}\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_heartbeats_and_unsubscribes_on_disconnect(self):
+        broadcaster = StatusBroadcaster(buffer_size=10)
+        subscription = broadcaster.subscribe([1])
+        stream = broadcaster.stream(subscription, heartbeat_seconds=0.01)
+
+        assert await anext(stream) == b": connected\n\n"
+        assert await anext(stream) == b": keep-alive\n\n"
+        broadcaster.deliver(_change(1, 1))
+        assert (await anext(stream)).startswith(b"event: status\n")
+
+        await stream.aclose()
+        await asyncio.sleep(0)
+        assert broadcaster._by_shipment == {}
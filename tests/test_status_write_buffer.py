@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.app.core.worker.status_writes import StatusWriteBuffer
+from src.app.schemas.shipment import ShipmentStatus
+
+
+def _rows(transitions):
+    """Pretend every shipment except 404 still has its expected status."""
+    return [SimpleNamespace(id=id, status=status) for id, (_, status) in transitions.items() if id != 404]
+
+
+@pytest.fixture
+def mock_writes(mock_db):
+    with patch("src.app.core.worker.status_writes.crud_shipments") as mock_crud:
+        mock_crud.compare_and_set_status = AsyncMock(side_effect=lambda db, transitions: _rows(transitions))
+        with patch("src.app.core.worker.status_writes.local_session") as mock_session:
+            mock_session.return_value.__aenter__.return_value = mock_db
+            mock_session.return_value.__aexit__ = AsyncMock(return_value=None)
+            yield mock_crud.compare_and_set_status
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_one_statement(mock_writes, mock_db):
+    buffer = StatusWriteBuffer(flush_interval_ms=5, max_rows=100)
+
+    results = await asyncio.gather(
+        buffer.submit(1, ShipmentStatus.PENDING, ShipmentStatus.PROCESSING),
+        buffer.submit(2, ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+        buffer.submit(404, ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+    )
+
+    mock_writes.assert_awaited_once()
+    assert mock_writes.await_args.kwargs["transitions"] == {
+        1: (ShipmentStatus.PENDING, ShipmentStatus.PROCESSING),
+        2: (ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+        404: (ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+    }
+    mock_db.commit.assert_awaited_once()
+    assert [row.status if row else None for row in results] == [ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED, None]
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting_for_the_interval(mock_writes):
+    buffer = StatusWriteBuffer(flush_interval_ms=60_000, max_rows=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            buffer.submit(1, ShipmentStatus.PENDING, ShipmentStatus.PROCESSING),
+            buffer.submit(2, ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+        ),
+        timeout=1,
+    )
+
+    assert [row.id for row in results] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_repeated_shipment_goes_into_the_next_statement(mock_writes):
+    buffer = StatusWriteBuffer(flush_interval_ms=5, max_rows=100)
+
+    await asyncio.gather(
+        buffer.submit(1, ShipmentStatus.PENDING, ShipmentStatus.PROCESSING),
+        buffer.submit(1, ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+    )
+
+    assert [call.kwargs["transitions"] for call in mock_writes.await_args_list] == [
+        {1: (ShipmentStatus.PENDING, ShipmentStatus.PROCESSING)},
+        {1: (ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED)},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_reported_to_every_job(mock_writes):
+    mock_writes.side_effect = Exception("Database error")
+    buffer = StatusWriteBuffer(flush_interval_ms=5, max_rows=100)
+
+    results = await asyncio.gather(
+        buffer.submit(1, ShipmentStatus.PENDING, ShipmentStatus.PROCESSING),
+        buffer.submit(2, ShipmentStatus.PROCESSING, ShipmentStatus.SHIPPED),
+        return_exceptions=True,
+    )
+
+    assert [str(result) for result in results] == ["Database error", "Database error"]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_pending_statuses(mock_writes):
+    buffer = StatusWriteBuffer(flush_interval_ms=60_000, max_rows=100)
+
+    job = asyncio.create_task(buffer.submit(1, ShipmentStatus.PENDING, ShipmentStatus.PROCESSING))
+    await asyncio.sleep(0)
+    await buffer.flush()
+
+    assert (await job).status == ShipmentStatus.PROCESSING
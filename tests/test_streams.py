@@ -0,0 +1,64 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.core.utils.streams import consume_stream
+
+ENTRIES = [(b"1-0", {b"data": b"a"}), (b"2-0", {b"data": b"b"})]
+
+
+@pytest.fixture
+def stream_client():
+    client = Mock()
+    client.xgroup_create = AsyncMock()
+    client.xautoclaim = AsyncMock(return_value=[b"0-0", [], []])
+    # One batch, then the consumer is stopped
+    client.xreadgroup = AsyncMock(side_effect=[[[b"events", ENTRIES]], asyncio.CancelledError()])
+    client.xack = AsyncMock()
+    pending = Mock(execute=AsyncMock())
+    dead_letter = Mock(execute=AsyncMock())
+    client.pipeline = Mock(side_effect=[pending, dead_letter])
+    client.pending, client.dead_letter = pending, dead_letter
+    return client
+
+
+async def _consume(client: Mock, handler: AsyncMock, on_dead_letter: AsyncMock | None = None) -> None:
+    with patch("src.app.core.utils.streams.asyncio.sleep", AsyncMock()), pytest.raises(asyncio.CancelledError):
+        await consume_stream(
+            client, "events", "group", "consumer", handler, max_deliveries=3, on_dead_letter=on_dead_letter
+        )
+
+
+class TestConsumeStream:
+    @pytest.mark.asyncio
+    async def test_batch_acknowledged_once_handled(self, stream_client):
+        handler = AsyncMock()
+
+        await _consume(stream_client, handler)
+
+        handler.assert_awaited_once_with(ENTRIES)
+        stream_client.xack.assert_awaited_once_with("events", "group", b"1-0", b"2-0")
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_left_pending_until_its_last_delivery(self, stream_client):
+        stream_client.pending.execute.return_value = [[{"times_delivered": 3}], [{"times_delivered": 1}]]
+        on_dead_letter = AsyncMock()
+
+        await _consume(stream_client, AsyncMock(side_effect=ValueError("poison")), on_dead_letter)
+
+        stream_client.xack.assert_not_awaited()
+        on_dead_letter.assert_awaited_once_with(ENTRIES[:1])
+        dead_letter = stream_client.dead_letter
+        dead_letter.xadd.assert_called_once_with("events:dead-letter", {b"data": b"a", b"source_id": b"1-0"})
+        dead_letter.xack.assert_called_once_with("events", "group", b"1-0")
+        dead_letter.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_nothing_dead_lettered_before_the_limit(self, stream_client):
+        stream_client.pending.execute.return_value = [[{"times_delivered": 1}], [{"times_delivered": 2}]]
+
+        await _consume(stream_client, AsyncMock(side_effect=ValueError("db down")))
+
+        assert stream_client.pipeline.call_count == 1
+        stream_client.xack.assert_not_awaited()
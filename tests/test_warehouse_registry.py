@@ -0,0 +1,118 @@
+import asyncio
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from src.app.services.service_warehouse_registry import WarehouseRegistry
+
+MODULE = "src.app.services.service_warehouse_registry"
+CREATED_AT = datetime(2026, 10, 19, tzinfo=UTC)
+
+
+def _warehouse(warehouse_id: int) -> dict:
+    return {
+        "id": warehouse_id,
+        "name": f"Warehouse {warehouse_id}",
+        "is_default": False,
+        "origin_address_id": 1,
+        "return_address_id": 1,
+        "created_at": CREATED_AT,
+    }
+
+
+class FakePubSub:
+    def __init__(self, messages: asyncio.Queue) -> None:
+        self.messages = messages
+        self.subscribe = AsyncMock()
+        self.aclose = AsyncMock()
+
+    async def listen(self):
+        while True:
+            yield {"data": await self.messages.get()}
+
+
+@pytest.fixture
+def registry():
+    return WarehouseRegistry()
+
+
+@pytest.fixture
+def redis_client():
+    messages: asyncio.Queue = asyncio.Queue()
+    client = Mock()
+    client.pubsub = Mock(return_value=FakePubSub(messages))
+    client.get = AsyncMock(return_value=b"3")
+    client.messages = messages
+    return client
+
+
+class TestWarehouseRegistry:
+    @pytest.mark.asyncio
+    async def test_existence_answered_from_memory_once_loaded(self, registry, redis_client, mock_db):
+        with (
+            patch(f"{MODULE}.local_session", return_value=MagicMock()),
+            patch(f"{MODULE}.crud_warehouses") as mock_crud,
+        ):
+            mock_crud.get_multi = AsyncMock(return_value={"data": [_warehouse(1), _warehouse(2)]})
+            mock_crud.exists = AsyncMock(return_value=False)
+
+            registry.start(redis_client, "warehouses:changes", "warehouses:version")
+            assert await registry.wait_loaded(timeout=1)
+
+            assert await registry.exists(db=mock_db, warehouse_id=1)
+            mock_crud.exists.assert_not_awaited()
+            # Unknown warehouses are checked in the database, in case one was just created elsewhere
+            assert not await registry.exists(db=mock_db, warehouse_id=9)
+            mock_crud.exists.assert_awaited_once_with(db=mock_db, id=9, is_deleted=False)
+
+            await registry.stop()
+
+        assert registry.version == 3
+        assert not registry.loaded  # not trusted once stopped
+
+    @pytest.mark.asyncio
+    async def test_reloaded_on_new_versions_only(self, registry, redis_client, mock_db):
+        with (
+            patch(f"{MODULE}.local_session", return_value=MagicMock()),
+            patch(f"{MODULE}.crud_warehouses") as mock_crud,
+        ):
+            mock_crud.get_multi = AsyncMock(
+                side_effect=[{"data": [_warehouse(1)]}, {"data": [_warehouse(1), _warehouse(2)]}]
+            )
+            mock_crud.exists = AsyncMock(return_value=False)
+
+            registry.start(redis_client, "warehouses:changes", "warehouses:version")
+            await registry.wait_loaded(timeout=1)
+
+            # Already loaded
+            await redis_client.messages.put(b"3")
+            redis_client.get = AsyncMock(return_value=b"4")
+            await redis_client.messages.put(b"4")
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+            assert mock_crud.get_multi.await_count == 2
+            assert registry.version == 4
+            assert await registry.exists(db=mock_db, warehouse_id=2)
+            mock_crud.exists.assert_not_awaited()
+            await registry.stop()
+
+    @pytest.mark.asyncio
+    async def test_database_used_until_loaded(self, registry, mock_db):
+        with patch(f"{MODULE}.crud_warehouses") as mock_crud:
+            mock_crud.exists = AsyncMock(return_value=True)
+
+            assert await registry.exists(db=mock_db, warehouse_id=1)
+
+            mock_crud.exists.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_publish_change_bumps_the_version(self):
+        client = Mock(incr=AsyncMock(return_value=5), publish=AsyncMock())
+
+        with patch(f"{MODULE}.cache.client", client):
+            await WarehouseRegistry.publish_change()
+
+        client.incr.assert_awaited_once_with("warehouses:version")
+        client.publish.assert_awaited_once_with("warehouses:changes", "5")
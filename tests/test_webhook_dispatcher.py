@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.app.core.worker.webhook_dispatcher import (
+    DeliveryResult,
+    WebhookDispatcher,
+    _retry_later,
+    run_webhook_retries,
+)
+from src.app.schemas.shipment import ShipmentStatus, ShipmentStatusChange
+from src.app.schemas.webhook_subscription import WebhookSubscription
+
+MODULE = "src.app.core.worker.webhook_dispatcher"
+SUBSCRIPTION = WebhookSubscription(id=1, url="http://receiver.local/hook")
+
+
+class LocalReceiver:
+    """In-process webhook receiver that records deliveries and fails the first `failures` requests, and every request
+    to `/down`."""
+
+    def __init__(self, failures: int = 0, status_code: int = 503) -> None:
+        self.failures = failures
+        self.status_code = status_code
+        self.requests: list[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if len(self.requests) <= self.failures or request.url.path == "/down":
+            return httpx.Response(self.status_code)
+        return httpx.Response(204)
+
+
+def _change(shipment_id: int, warehouse_id: int) -> ShipmentStatusChange:
+    return ShipmentStatusChange(
+        shipment_id=shipment_id,
+        warehouse_id=warehouse_id,
+        old_status=ShipmentStatus.PENDING,
+        new_status=ShipmentStatus.PROCESSING,
+        changed_at=datetime(2026, 1, 22, 13, 0, tzinfo=UTC),
+    )
+
+
+def _dispatcher(receiver: LocalReceiver) -> WebhookDispatcher:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(receiver))
+    return WebhookDispatcher(client=client, max_attempts=3, backoff_base_seconds=0)
+
+
+class TestWebhookDispatcher:
+    @pytest.mark.asyncio
+    async def test_changes_batched_into_one_request_per_subscriber(self):
+        receiver = LocalReceiver()
+        dispatcher = _dispatcher(receiver)
+        subscriptions = [
+            WebhookSubscription(id=1, url="http://receiver.local/all"),
+            WebhookSubscription(id=2, url="http://receiver.local/warehouse-2", warehouse_id=2),
+        ]
+
+        failed = await dispatcher.dispatch(subscriptions, [_change(1, 1), _change(2, 2), _change(3, 2)])
+
+        assert failed == []
+        bodies = {request.url.path: json.loads(request.content) for request in receiver.requests}
+        assert [event["shipment_id"] for event in bodies["/all"]["events"]] == [1, 2, 3]
+        assert [event["shipment_id"] for event in bodies["/warehouse-2"]["events"]] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_delivery_signed_with_subscription_secret(self):
+        receiver = LocalReceiver()
+        dispatcher = _dispatcher(receiver)
+        subscription = WebhookSubscription(id=1, url="http://receiver.local/hook", secret="s3cret")
+
+        await dispatcher.dispatch([subscription], [_change(1, 1)])
+
+        request = receiver.requests[0]
+        expected = hmac.new(b"s3cret", request.content, hashlib.sha256).hexdigest()
+        assert request.headers["X-Webhook-Signature"] == f"sha256={expected}"
+
+    @pytest.mark.asyncio
+    async def test_failing_endpoint_tried_once_without_holding_up_others(self):
+        receiver = LocalReceiver()
+        dispatcher = _dispatcher(receiver)
+        failing = WebhookSubscription(id=2, url="http://receiver.local/down")
+        subscriptions = [WebhookSubscription(id=1, url="http://receiver.local/hook"), failing]
+
+        failed = await dispatcher.dispatch(subscriptions, [_change(1, 1)])
+
+        assert failed == [(failing, [_change(1, 1)], DeliveryResult.RETRY)]
+        assert sorted(request.url.path for request in receiver.requests) == ["/down", "/hook"]
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self):
+        receiver = LocalReceiver(failures=10, status_code=410)
+        dispatcher = _dispatcher(receiver)
+        subscription = WebhookSubscription(id=1, url="http://receiver.local/hook")
+
+        failed = await dispatcher.dispatch([subscription], [_change(1, 1)])
+
+        assert [result for _, _, result in failed] == [DeliveryResult.FAILED]
+        assert len(receiver.requests) == 1
+
+
+class TestWebhookRetries:
+    @staticmethod
+    async def _retry_until(redis: FakeAsyncRedis, dispatcher: WebhookDispatcher, done) -> None:
+        subscriptions = Mock(get=AsyncMock(return_value=[SUBSCRIPTION]))
+        with patch(f"{MODULE}.settings.WEBHOOK_RETRY_POLL_SECONDS", 0.001):
+            task = asyncio.create_task(run_webhook_retries(redis, dispatcher, subscriptions))
+            for _ in range(500):
+                if await done():
+                    break
+                await asyncio.sleep(0.001)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_retried_later_until_delivered(self):
+        receiver = LocalReceiver(failures=2)
+        dispatcher = _dispatcher(receiver)
+        redis = FakeAsyncRedis()
+
+        [(subscription, batch, result)] = await dispatcher.dispatch([SUBSCRIPTION], [_change(1, 1)])
+        await _retry_later(redis, dispatcher, subscription, batch, 1, result)
+
+        async def delivered() -> bool:
+            return len(receiver.requests) == 3
+
+        await self._retry_until(redis, dispatcher, delivered)
+
+        assert len(receiver.requests) == 3
+        assert json.loads(receiver.requests[2].content)["events"][0]["shipment_id"] == 1
+        assert await redis.zcard("webhooks:retries") == 0
+        assert await redis.xlen("webhooks:dead-letter") == 0
+
+    @pytest.mark.asyncio
+    async def test_dead_lettered_after_max_attempts(self):
+        receiver = LocalReceiver(failures=10)
+        dispatcher = _dispatcher(receiver)
+        redis = FakeAsyncRedis()
+
+        [(subscription, batch, result)] = await dispatcher.dispatch([SUBSCRIPTION], [_change(1, 1)])
+        await _retry_later(redis, dispatcher, subscription, batch, 1, result)
+
+        async def dead_lettered() -> bool:
+            return await redis.xlen("webhooks:dead-letter") == 1
+
+        await self._retry_until(redis, dispatcher, dead_lettered)
+
+        assert len(receiver.requests) == 3
+        [(_, fields)] = await redis.xrange("webhooks:dead-letter")
+        assert fields[b"subscription_id"] == b"1"
+        assert json.loads(fields[b"data"])[0]["shipment_id"] == 1
@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.app.core.config import settings
+from src.app.core.worker.settings import run_lanes
+from src.app.core.worker.supervisor import QueueStats, WorkerSupervisor
+
+
+def _supervisor(processes: int) -> WorkerSupervisor:
+    supervisor = WorkerSupervisor(processes=processes, autoscale=True)
+    supervisor.min_processes = 1
+    supervisor.max_processes = 4
+    supervisor.target = processes
+    return supervisor
+
+
+def test_scales_up_on_backlog_or_latency():
+    supervisor = _supervisor(processes=2)
+    backlog = 2 * settings.WORKER_SCALE_UP_BACKLOG_PER_PROCESS + 1
+
+    assert supervisor.desired_processes(QueueStats(backlog=backlog, oldest_ready_seconds=0)) == 3
+
+    slow = QueueStats(backlog=1, oldest_ready_seconds=settings.WORKER_SCALE_UP_LATENCY_SECONDS + 1)
+    assert supervisor.desired_processes(slow) == 3
+
+
+def test_never_scales_past_max_processes():
+    supervisor = _supervisor(processes=4)
+
+    assert supervisor.desired_processes(QueueStats(backlog=10**9, oldest_ready_seconds=60)) == 4
+
+
+def test_scales_down_only_after_consecutive_idle_checks():
+    supervisor = _supervisor(processes=2)
+    idle = QueueStats(backlog=0, oldest_ready_seconds=0)
+
+    for _ in range(settings.WORKER_SCALE_DOWN_IDLE_CHECKS - 1):
+        assert supervisor.desired_processes(idle) == 2
+    assert supervisor.desired_processes(QueueStats(backlog=1, oldest_ready_seconds=0)) == 2
+
+    for _ in range(settings.WORKER_SCALE_DOWN_IDLE_CHECKS - 1):
+        assert supervisor.desired_processes(idle) == 2
+    assert supervisor.desired_processes(idle) == 1
+
+
+def _worker(run) -> Mock:
+    return Mock(async_run=run, close=AsyncMock(), queue_name="queue")
+
+
+@pytest.mark.asyncio
+async def test_failed_lane_stops_the_others_and_is_raised():
+    other_stopped = asyncio.Event()
+
+    async def fail() -> None:
+        raise ConnectionError("redis down")
+
+    async def run_forever() -> None:
+        try:
+            await asyncio.sleep(60)
+        finally:
+            other_stopped.set()
+
+    workers = [_worker(fail), _worker(run_forever)]
+    with (
+        patch("src.app.core.worker.settings.create_worker", side_effect=workers),
+        pytest.raises(ConnectionError),
+    ):
+        await asyncio.wait_for(run_lanes([Mock(), Mock()]), timeout=1)
+
+    assert other_stopped.is_set()
+    for worker in workers:
+        worker.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lanes_stopped_by_a_signal_end_cleanly():
+    async def stopped() -> None:
+        raise asyncio.CancelledError
+
+    async def finished() -> None:
+        return None
+
+    with patch("src.app.core.worker.settings.create_worker", side_effect=[_worker(stopped), _worker(finished)]):
+        await asyncio.wait_for(run_lanes([Mock(), Mock()]), timeout=1)